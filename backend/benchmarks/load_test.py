@@ -0,0 +1,383 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pandas as pd
+
+root = Path(__file__).parent
+backend_dir = root.parent
+results_dir = backend_dir.parent / "results" / "loadtest"
+jobs_path = backend_dir / "Processed" / "jobs_sample.parquet"
+
+# Share of each operation in the request mix
+DEFAULT_MIX = {"recommend": 0.5, "swipe": 0.3, "liked": 0.1, "login": 0.1}
+PERCENTILES = (50, 90, 95, 99)
+EMAIL_PREFIX = "loadtest-"
+PASSWORD = "loadtest-password"
+STAGE_METRIC = "fairmatch_stage_duration_seconds"
+
+
+# -------------------------
+# Database seeding
+# -------------------------
+def seed_database(db_url, n_users=200, interactions_per_user=20, embedded_fraction=1.0, dim=384, seed=0):
+    """
+    Create the tables and insert synthetic users and swipes. Users from a
+    previous run (email starting with EMAIL_PREFIX) are replaced.
+    A fraction `embedded_fraction` of users get a stored profile embedding;
+    the others go through the text encoder on their first recommendation.
+    Returns the user ids and the job ids swipes are drawn from.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    # lib.database needs a URL at import; the seeding uses its own engine
+    os.environ.setdefault("DATABASE_URL", db_url)
+    sys.path.append(str(backend_dir))
+    from lib.database import Base
+    from lib.models import Interaction, User
+
+    engine = create_engine(db_url)
+
+    rng = np.random.default_rng(seed)
+    job_ids = pd.read_parquet(jobs_path, columns=["job id"])["job id"].astype(str).to_numpy()
+
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        old = [uid for (uid,) in db.query(User.id).filter(User.email.like(f"{EMAIL_PREFIX}%"))]
+        if old:
+            db.query(Interaction).filter(Interaction.user_id.in_(old)).delete(synchronize_session=False)
+            db.query(User).filter(User.id.in_(old)).delete(synchronize_session=False)
+            db.commit()
+
+        users = []
+        for i in range(n_users):
+            embedding = None
+            if rng.random() < embedded_fraction:
+                v = rng.standard_normal(dim)
+                embedding = (v / np.linalg.norm(v)).round(6).tolist()
+            users.append(User(
+                email=f"{EMAIL_PREFIX}{i}@example.com",
+                password=PASSWORD,
+                role="jobseeker",
+                name=f"Load Test {i}",
+                gender=str(rng.choice(["Male", "Female"])),
+                interested_domain=str(rng.choice(["Data Science", "Web Development", "Cloud Computing"])),
+                age=int(rng.integers(20, 50)),
+                projects=["Project A", "Project B"],
+                python_level=str(rng.choice(["Strong", "Average", "Weak"])),
+                sql_level=str(rng.choice(["Strong", "Average", "Weak"])),
+                java_level=str(rng.choice(["Strong", "Average", "Weak"])),
+                profile_embedding=embedding,
+            ))
+        db.add_all(users)
+        db.commit()
+        user_ids = [u.id for u in users]
+
+        now = datetime.now(timezone.utc).isoformat()
+        db.add_all([
+            Interaction(user_id=uid, item_id=str(job), type="job",
+                        action="like" if rng.random() < 0.3 else "pass", timestamp=now)
+            for uid in user_ids
+            for job in rng.choice(job_ids, size=min(interactions_per_user, len(job_ids)), replace=False)
+        ])
+        db.commit()
+    finally:
+        db.close()
+        engine.dispose()
+    return user_ids, job_ids
+
+
+# -------------------------
+# Server
+# -------------------------
+def start_server(db_url, port, workers=1, env=None):
+    """uvicorn serving main:app in a subprocess, against `db_url`."""
+    server_env = {
+        **os.environ,
+        "DATABASE_URL": db_url,
+        "HF_HUB_OFFLINE": "1",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+        **(env or {}),
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=backend_dir, env=server_env,
+    )
+
+
+def wait_until_ready(base_url, process=None, timeout=180.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/", timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} not ready after {timeout:.0f}s")
+
+
+# -------------------------
+# Server-side metrics
+# -------------------------
+_SAMPLE = re.compile(r'^(\w+)(?:\{(.*)\})?\s+(\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(text):
+    """Prometheus text -> {(name, ((label, value), ...)): float}."""
+    samples = {}
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if match is None:
+            continue
+        name, labels, value = match.groups()
+        key = (name, tuple(sorted(_LABEL.findall(labels or ""))))
+        samples[key] = float(value)
+    return samples
+
+
+def _histogram_quantile(q, buckets):
+    """Quantile from cumulative (upper bound, count) pairs, interpolated within the bucket."""
+    total = buckets[-1][1]
+    if total <= 0:
+        return None
+    rank = q * total
+    prev_bound, prev_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if bound == float("inf"):
+                return prev_bound
+            share = (rank - prev_count) / (count - prev_count) if count > prev_count else 0.0
+            return prev_bound + (bound - prev_bound) * share
+        prev_bound, prev_count = bound, count
+    return prev_bound
+
+
+def stage_timings(before, after, metric=STAGE_METRIC):
+    """Per-stage count, mean and p50/p99 (ms) of the requests made between two /metrics scrapes."""
+    stages = {}
+    for (name, labels), value in after.items():
+        if name != f"{metric}_count":
+            continue
+        count = value - before.get((name, labels), 0.0)
+        if count <= 0:
+            continue
+        stage = dict(labels)["stage"]
+        total = after[(f"{metric}_sum", labels)] - before.get((f"{metric}_sum", labels), 0.0)
+        buckets = sorted(
+            (float(dict(l)["le"]), v - before.get((n, l), 0.0))
+            for (n, l), v in after.items()
+            if n == f"{metric}_bucket" and dict(l).get("stage") == stage
+        )
+        stages[stage] = {
+            "count": int(count),
+            "mean_ms": total / count * 1000,
+            "p50_ms": _histogram_quantile(0.50, buckets) * 1000,
+            "p99_ms": _histogram_quantile(0.99, buckets) * 1000,
+        }
+    return dict(sorted(stages.items(), key=lambda item: -item[1]["mean_ms"]))
+
+
+# -------------------------
+# Load generation
+# -------------------------
+def _percentiles(latencies):
+    if not latencies:
+        return {f"p{p}_ms": None for p in PERCENTILES}
+    values = np.percentile(np.asarray(latencies), PERCENTILES)
+    return {f"p{p}_ms": float(v) for p, v in zip(PERCENTILES, values)}
+
+
+async def _request(client, op, user_id, user_index, job_ids, rng):
+    if op == "recommend":
+        return await client.get(f"/recommend/{user_id}")
+    if op == "swipe":
+        return await client.post("/api/interactions", json={
+            "user_id": user_id,
+            "item_id": str(job_ids[rng.randrange(len(job_ids))]),
+            "type": "job",
+            "action": "like" if rng.random() < 0.3 else "pass",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        })
+    if op == "liked":
+        return await client.get(f"/api/liked-jobs/{user_id}")
+    if op == "login":
+        return await client.post("/auth/login", json={"email": f"{EMAIL_PREFIX}{user_index}@example.com",
+                                                      "password": PASSWORD})
+    raise ValueError(f"Unknown operation {op}")
+
+
+async def drive_load(base_url, user_ids, job_ids, mix=DEFAULT_MIX, concurrency=16, duration=30.0, timeout=30.0,
+                     seed=0):
+    """
+    `concurrency` clients send requests back to back (closed loop) for
+    `duration` seconds, each picking the next operation from `mix`.
+    Returns (operation, latency ms, error or None) records.
+    """
+    ops, weights = list(mix), list(mix.values())
+    records = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        stop_at = time.perf_counter() + duration
+
+        async def worker(worker_id):
+            rng = random.Random(seed * 1000 + worker_id)
+            while True:
+                now = time.perf_counter()
+                if now >= stop_at:
+                    return
+                op = rng.choices(ops, weights)[0]
+                user_index = rng.randrange(len(user_ids))
+                error = None
+                try:
+                    response = await _request(client, op, user_ids[user_index], user_index, job_ids, rng)
+                    if response.status_code >= 400:
+                        error = f"HTTP {response.status_code}"
+                except httpx.HTTPError as e:
+                    error = type(e).__name__
+                records.append((op, (time.perf_counter() - now) * 1000, error))
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return records
+
+
+def summarize(records, duration):
+    """Throughput, error rate and latency percentiles, overall and per operation."""
+    def block(rows):
+        latencies = [ms for _, ms, _ in rows]
+        errors = [e for _, _, e in rows if e is not None]
+        by_error = {}
+        for e in errors:
+            by_error[e] = by_error.get(e, 0) + 1
+        return {
+            "requests": len(rows),
+            "rps": len(rows) / duration if duration > 0 else 0.0,
+            "error_rate": len(errors) / len(rows) if rows else 0.0,
+            "errors": by_error,
+            "mean_ms": float(np.mean(latencies)) if latencies else None,
+            **_percentiles(latencies),
+            "max_ms": max(latencies) if latencies else None,
+        }
+
+    per_op = {}
+    for op in sorted({r[0] for r in records}):
+        per_op[op] = block([r for r in records if r[0] == op])
+    return {"total": block(records), "operations": per_op}
+
+
+def run_load_test(db_url=None, base_url=None, n_users=200, interactions_per_user=20, embedded_fraction=1.0,
+                  concurrency=16, duration=30.0, warmup=3.0, mix=DEFAULT_MIX, workers=1, port=8765, seed=0):
+    """
+    Seed the database, start the API (unless `base_url` points to a running
+    one; it must use the same database), drive the request mix and return
+    the report. Without db_url a temporary SQLite file is used.
+    """
+    tmp_dir = None
+    if db_url is None:
+        tmp_dir = tempfile.TemporaryDirectory(prefix="fairmatch-load-")
+        db_url = f"sqlite:///{Path(tmp_dir.name) / 'load.db'}"
+
+    print(f"Seeding {n_users} users x {interactions_per_user} swipes into {db_url.split('@')[-1]}")
+    user_ids, job_ids = seed_database(db_url, n_users, interactions_per_user, embedded_fraction, seed=seed)
+
+    process = None
+    if base_url is None:
+        base_url = f"http://127.0.0.1:{port}"
+        process = start_server(db_url, port, workers)
+    try:
+        wait_until_ready(base_url, process)
+        if warmup > 0:
+            asyncio.run(drive_load(base_url, user_ids, job_ids, mix, concurrency, warmup, seed=seed + 1))
+        before = parse_metrics(httpx.get(f"{base_url}/metrics").text)
+        print(f"Driving {concurrency} clients for {duration:.0f}s against {base_url}")
+        start = time.perf_counter()
+        records = asyncio.run(drive_load(base_url, user_ids, job_ids, mix, concurrency, duration, seed=seed))
+        measured = time.perf_counter() - start
+        after = parse_metrics(httpx.get(f"{base_url}/metrics").text)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    report = summarize(records, measured)
+    report["server_stages"] = stage_timings(before, after)
+    report["config"] = {
+        "database": db_url.split("://")[0], "users": n_users, "interactions_per_user": interactions_per_user,
+        "embedded_fraction": embedded_fraction, "concurrency": concurrency, "duration_s": duration,
+        "warmup_s": warmup, "mix": mix, "workers": workers,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    return report
+
+
+def print_report(report):
+    print(f"\n{'operation':<12}{'requests':>10}{'rps':>9}{'errors':>9}"
+          + "".join(f"{'p' + str(p):>10}" for p in PERCENTILES) + f"{'max':>10}")
+    for name, row in [*report["operations"].items(), ("total", report["total"])]:
+        cells = "".join(f"{row[f'p{p}_ms']:>10.1f}" if row[f"p{p}_ms"] is not None else f"{'-':>10}"
+                        for p in PERCENTILES)
+        print(f"{name:<12}{row['requests']:>10}{row['rps']:>9.1f}{row['error_rate']:>9.2%}{cells}"
+              f"{row['max_ms'] or 0:>10.1f}")
+    if report["server_stages"]:
+        print(f"\n{'server stage':<20}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for stage, row in report["server_stages"].items():
+            print(f"{stage:<20}{row['count']:>8}{row['mean_ms']:>10.2f}{row['p50_ms']:>10.2f}{row['p99_ms']:>10.2f}")
+
+
+def _parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        op, weight = part.split("=")
+        if op not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown operation {op} (expected {', '.join(DEFAULT_MIX)})")
+        mix[op] = float(weight)
+    return mix
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test of the API against a seeded local database")
+    parser.add_argument("--db-url", default=None, help="SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--base-url", default=None, help="Use a running server instead of starting one")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--interactions-per-user", type=int, default=20)
+    parser.add_argument("--embedded-fraction", type=float, default=1.0,
+                        help="Share of users with a stored profile embedding")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX,
+                        help="e.g. recommend=0.5,swipe=0.3,liked=0.1,login=0.1")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=None, help="Report file (default results/loadtest/<time>.json)")
+    args = parser.parse_args()
+
+    report = run_load_test(args.db_url, args.base_url, args.users, args.interactions_per_user,
+                           args.embedded_fraction, args.concurrency, args.duration, args.warmup, args.mix,
+                           args.workers, args.port, args.seed)
+    print_report(report)
+    out = args.out or results_dir / f"{int(time.time())}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {out}")
@@ -0,0 +1,367 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# The replay never downloads the SentenceTransformer model
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+# Add parent directory to path to allow imports if needed
+sys.path.append(str(Path(__file__).parent.parent))
+
+root = Path(__file__).parent
+backend_dir = root.parent
+results_dir = backend_dir.parent / "results" / "replay"
+default_interactions = backend_dir / "Processed" / "interactions_export.csv"
+
+# Rows read from the interaction log at a time
+READ_CHUNK = 200_000
+# Coverage boost of the reranker, as in routers/recommendations.py
+COVERAGE_WEIGHT = 5.0
+# Learning rate of update_user_profile_vector, as in routers/interactions.py
+ALPHA = 0.1
+
+# Per-process state, set by _init_worker
+_bundle = None
+_user_emb = None
+
+
+# -------------------------
+# Event log
+# -------------------------
+def split_events(interactions_path, shard_dir, n_shards, sample_users=1.0):
+    """
+    Stream the interaction log (interactions_export.csv format) and write
+    the job swipes of each shard (user_id % n_shards) to its own parquet
+    file: user_id, item_id, action, ts (ms since epoch). Users are kept
+    whole when sampling (user_id % 1000 < sample_users * 1000), so every
+    replayed history is complete. Returns the shard paths and the number
+    of events written.
+    """
+    shard_dir = Path(shard_dir)
+    paths = [shard_dir / f"shard-{i}.parquet" for i in range(n_shards)]
+    writers = [None] * n_shards
+    schema = pa.schema([("user_id", pa.int64()), ("item_id", pa.string()), ("action", pa.string()),
+                        ("ts", pa.int64())])
+    n_events = 0
+    try:
+        reader = pd.read_csv(interactions_path, usecols=["user_id", "item_id", "type", "action", "timestamp"],
+                             dtype={"item_id": str}, chunksize=READ_CHUNK, encoding_errors="replace")
+        for chunk in reader:
+            chunk = chunk[chunk["type"] == "job"]
+            chunk = chunk[chunk["user_id"] % 1000 < sample_users * 1000]
+            ts = pd.to_datetime(chunk["timestamp"], utc=True, format="ISO8601")
+            events = pd.DataFrame({
+                "user_id": chunk["user_id"].astype(np.int64),
+                "item_id": chunk["item_id"],
+                "action": chunk["action"],
+                "ts": ts.astype("int64") // 1_000_000,
+            })
+            for shard, part in events.groupby(events["user_id"] % n_shards):
+                if writers[shard] is None:
+                    writers[shard] = pq.ParquetWriter(paths[shard], schema)
+                writers[shard].write_table(pa.Table.from_pandas(part, schema=schema, preserve_index=False))
+            n_events += len(events)
+    finally:
+        for writer in writers:
+            if writer is not None:
+                writer.close()
+    return [p if w is not None else None for p, w in zip(paths, writers)], n_events
+
+
+def _resolve_rows(bundle, items):
+    """Catalog row of each logged item id: a job id, or else a row index (as in the export)."""
+    unique, inverse = np.unique(np.asarray(items, dtype=str), return_inverse=True)
+    rows = bundle.id_index.get_indexer_for(unique)
+    for i in np.flatnonzero(rows < 0):
+        if unique[i].isdigit() and int(unique[i]) < len(bundle):
+            rows[i] = int(unique[i])
+    return rows[inverse]
+
+
+# -------------------------
+# Replay of one shard
+# -------------------------
+def load_replay_bundle(jobs_file=None, job_emb_file=None):
+    """
+    The serving bundle (Processed/ artifacts and active classifier), or a
+    catalog given as jobs parquet + .pt/.npy embeddings (cosine only, e.g.
+    the output of synthetic_data.py).
+    """
+    import torch
+    from models.artifacts import ArtifactBundle, get_bundle
+
+    if jobs_file is None:
+        bundle = get_bundle()
+        if bundle is None:
+            raise RuntimeError("Model artifacts could not be loaded")
+        return bundle
+    jobs = pd.read_parquet(jobs_file)
+    job_emb_file = Path(job_emb_file)
+    if job_emb_file.suffix == ".npy":
+        job_emb = torch.from_numpy(np.load(job_emb_file))
+    else:
+        job_emb = torch.load(job_emb_file)
+    return ArtifactBundle(jobs, job_emb)
+
+
+def _load_user_embeddings(path):
+    import torch
+
+    if path is None:
+        return None
+    path = Path(path)
+    return np.load(path, mmap_mode="r") if path.suffix == ".npy" else torch.load(path).numpy()
+
+
+def _init_worker(jobs_file, job_emb_file, user_emb_file, threads=None):
+    global _bundle, _user_emb
+    import torch
+
+    if threads:
+        torch.set_num_threads(threads)
+    _bundle = load_replay_bundle(jobs_file, job_emb_file)
+    _user_emb = _load_user_embeddings(user_emb_file)
+
+
+def _initial_vector(user_id, bundle, user_emb, default):
+    """Row user_id - 1 of the user embeddings if given (synthetic_data.py layout), else the catalog mean."""
+    import torch
+
+    if user_emb is not None and 0 < user_id <= len(user_emb):
+        return torch.from_numpy(np.array(user_emb[user_id - 1], dtype=np.float32))
+    return default
+
+
+def replay_shard(shard_path, n_shards=1, fetch_k=50, final_k=10, candidate_k=200, hybrid_weight=0.2,
+                 bundle=None, user_emb=None):
+    """
+    Replay one shard's events in timestamp order. For each event the user's
+    current vector goes through recommend_from_embedding (their swiped jobs
+    excluded) and the fairness reranker, with exposure counts kept in
+    memory; the list is scored against the logged job, then the swipe is
+    applied: job marked seen, exposure count incremented and, for a like,
+    the vector moved with update_user_profile_vector.
+
+    User vectors and seen sets only depend on the user's own events, so
+    shards are independent. Exposure counts are global in the live system:
+    here each shard counts its own swipes, multiplied by n_shards.
+    """
+    import torch
+    from models.base_model import recommend_from_embedding, update_user_profile_vector
+    from models.fairness_reranker import rerank_conditional_demographic_parity
+
+    bundle = bundle if bundle is not None else _bundle
+    user_emb = user_emb if user_emb is not None else _user_emb
+
+    events = pd.read_parquet(shard_path)
+    events = events.iloc[np.argsort(events["ts"].to_numpy(), kind="stable")]
+    rows = _resolve_rows(bundle, events["item_id"].to_numpy())
+    known = rows >= 0
+
+    default = torch.nn.functional.normalize(bundle.job_emb.float().mean(dim=0), p=2, dim=0)
+    vectors, seen = {}, {}
+    swipes = np.zeros(len(bundle), dtype=np.int64)
+    impressions = np.zeros(len(bundle), dtype=np.int64)
+    stats = {"events": 0, "likes": 0, "unknown_items": int((~known).sum()), "hits": 0, "ndcg": 0.0,
+             "candidate_hits": 0, "rr": 0.0, "empty": 0}
+
+    start = time.perf_counter()
+    for user_id, row, action in zip(events["user_id"].to_numpy()[known], rows[known],
+                                    events["action"].to_numpy()[known]):
+        user_id, row = int(user_id), int(row)
+        if user_id not in vectors:
+            vectors[user_id] = _initial_vector(user_id, bundle, user_emb, default)
+            seen[user_id] = set()
+        job_id = bundle.job_ids[row]
+
+        # 1. What the user would be shown now
+        candidates = recommend_from_embedding(vectors[user_id], top_k=fetch_k, exclude_ids=seen[user_id],
+                                              hybrid_weight=hybrid_weight, bundle=bundle, candidate_k=candidate_k)
+        candidate_rows = bundle.rows_for_ids([c["job_id"] for c in candidates])
+        for c, r in zip(candidates, candidate_rows):
+            c["exposure_count"] = int(swipes[r]) * n_shards
+            c["qualified"] = True
+            c.setdefault("company_bucket", "unknown")
+        shown = rerank_conditional_demographic_parity(candidates, k=final_k, protected_attr="company_bucket",
+                                                      coverage_weight=COVERAGE_WEIGHT)
+        shown_ids = [c["job_id"] for c in shown]
+        impressions[bundle.rows_for_ids(shown_ids)] += 1
+        stats["events"] += 1
+        stats["empty"] += not shown
+
+        # 2. Ranking metrics against the liked job
+        if action == "like":
+            stats["likes"] += 1
+            if job_id in shown_ids:
+                rank = shown_ids.index(job_id)
+                stats["hits"] += 1
+                stats["ndcg"] += 1.0 / np.log2(rank + 2)
+            candidate_ids = [c["job_id"] for c in candidates]
+            if job_id in candidate_ids:
+                stats["candidate_hits"] += 1
+                stats["rr"] += 1.0 / (candidate_ids.index(job_id) + 1)
+
+        # 3. Apply the swipe
+        seen[user_id].add(job_id)
+        swipes[row] += 1
+        if action == "like":
+            vectors[user_id] = update_user_profile_vector(vectors[user_id], job_id, alpha=ALPHA, bundle=bundle)
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["users"] = len(vectors)
+    return {"stats": stats, "impressions": impressions}
+
+
+# -------------------------
+# Report
+# -------------------------
+def gini(values):
+    """Gini coefficient of non-negative values (0 = equal exposure, close to 1 = all on one item)."""
+    values = np.sort(np.asarray(values, dtype=np.float64))
+    n, total = len(values), values.sum()
+    if n == 0 or total == 0:
+        return 0.0
+    return float(2 * np.sum(np.arange(1, n + 1) * values) / (n * total) - (n + 1) / n)
+
+
+def summarize(shard_results, buckets, final_k=10, fetch_k=50, wall_seconds=None):
+    """Merge the shard results: ranking metrics, exposure by company bucket and throughput."""
+    totals = {}
+    for result in shard_results:
+        for key, value in result["stats"].items():
+            totals[key] = totals.get(key, 0) + value
+    impressions = np.sum([r["impressions"] for r in shard_results], axis=0)
+    likes = totals.get("likes", 0)
+    events = totals.get("events", 0)
+
+    buckets = np.asarray(buckets, dtype=object)
+    total_impressions = int(impressions.sum())
+    exposure = {}
+    for bucket in sorted(set(buckets)):
+        mask = buckets == bucket
+        exposure[bucket] = {
+            "jobs": int(mask.sum()),
+            "catalog_share": float(mask.mean()),
+            "impression_share": float(impressions[mask].sum() / total_impressions) if total_impressions else 0.0,
+            "gini": gini(impressions[mask]),
+            "coverage": float((impressions[mask] > 0).mean()),
+        }
+    shard_seconds = [r["stats"]["seconds"] for r in shard_results]
+    return {
+        "events": events,
+        "users": totals.get("users", 0),
+        "likes": likes,
+        "unknown_items": totals.get("unknown_items", 0),
+        "empty_lists": totals.get("empty", 0),
+        "ranking": {
+            f"HitRate@{final_k}": totals["hits"] / likes if likes else 0.0,
+            f"NDCG@{final_k}": totals["ndcg"] / likes if likes else 0.0,
+            f"Recall@{fetch_k}": totals["candidate_hits"] / likes if likes else 0.0,
+            f"MRR@{fetch_k}": totals["rr"] / likes if likes else 0.0,
+        },
+        "exposure": {
+            "gini": gini(impressions),
+            "coverage": float((impressions > 0).mean()) if len(impressions) else 0.0,
+            "by_company_bucket": exposure,
+        },
+        "throughput": {
+            "shards": len(shard_results),
+            "wall_seconds": wall_seconds,
+            "events_per_second": events / wall_seconds if wall_seconds else None,
+            "events_per_second_per_shard": events / sum(shard_seconds) if sum(shard_seconds) else None,
+        },
+    }
+
+
+def run_replay(interactions_path=default_interactions, workers=1, shards=None, jobs_file=None, job_emb_file=None,
+               user_emb_file=None, sample_users=1.0, fetch_k=50, final_k=10, candidate_k=200, hybrid_weight=0.2):
+    """
+    Split the log into `shards` (default: workers) by user and replay them
+    on `workers` processes. With one worker the shards run in this process.
+    """
+    shards = shards or workers
+    options = {"n_shards": shards, "fetch_k": fetch_k, "final_k": final_k, "candidate_k": candidate_k,
+               "hybrid_weight": hybrid_weight}
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        paths, n_events = split_events(interactions_path, tmp, shards, sample_users)
+        paths = [p for p in paths if p is not None]
+        print(f"Replaying {n_events} events in {len(paths)} shards on {workers} process(es)")
+
+        if workers == 1:
+            _init_worker(jobs_file, job_emb_file, user_emb_file)
+            results = [replay_shard(p, **options) for p in paths]
+            bundle = _bundle
+        else:
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                                     initargs=(jobs_file, job_emb_file, user_emb_file, 1)) as pool:
+                results = list(pool.map(partial(replay_shard, **options), paths))
+            bundle = load_replay_bundle(jobs_file, job_emb_file)
+
+    buckets = bundle.jobs["companybucket"].fillna("unknown") if "companybucket" in bundle.jobs else \
+        ["unknown"] * len(bundle)
+    report = summarize(results, buckets, final_k, fetch_k, time.perf_counter() - start)
+    report["params"] = {"interactions": str(interactions_path), "sample_users": sample_users, **options,
+                        "workers": workers}
+    return report
+
+
+def print_report(report):
+    print(f"\n{report['events']} events, {report['users']} users, {report['likes']} likes "
+          f"({report['unknown_items']} events on unknown jobs skipped)")
+    for name, value in report["ranking"].items():
+        print(f"  {name:<14}{value:.4f}")
+    exposure = report["exposure"]
+    print(f"\nExposure Gini {exposure['gini']:.3f}, catalog coverage {exposure['coverage']:.1%}")
+    print(f"{'bucket':<12}{'jobs':>8}{'catalog':>10}{'shown':>10}{'gini':>8}{'coverage':>10}")
+    for bucket, row in exposure["by_company_bucket"].items():
+        print(f"{bucket:<12}{row['jobs']:>8}{row['catalog_share']:>10.1%}{row['impression_share']:>10.1%}"
+              f"{row['gini']:>8.3f}{row['coverage']:>10.1%}")
+    throughput = report["throughput"]
+    print(f"\n{throughput['events_per_second']:.1f} events/s over {throughput['shards']} shard(s) "
+          f"({throughput['events_per_second_per_shard']:.1f} per shard)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chronological replay of an interaction log through the "
+                                                 "recommend -> swipe -> profile update -> rerank loop")
+    parser.add_argument("--interactions", type=Path, default=default_interactions,
+                        help="Log in interactions_export.csv format (e.g. from synthetic_data.py)")
+    parser.add_argument("--jobs", type=Path, default=None, help="Catalog parquet (default: serving artifacts)")
+    parser.add_argument("--job-embeddings", type=Path, default=None, help=".pt or .npy, row-aligned with --jobs")
+    parser.add_argument("--user-embeddings", type=Path, default=None,
+                        help="Initial user vectors, row = user_id - 1 (default: catalog mean)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--shards", type=int, default=None, help="Default: one per worker")
+    parser.add_argument("--sample-users", type=float, default=1.0, help="Fraction of users replayed")
+    parser.add_argument("--fetch-k", type=int, default=50)
+    parser.add_argument("--final-k", type=int, default=10)
+    parser.add_argument("--candidate-k", type=int, default=200)
+    parser.add_argument("--hybrid-weight", type=float, default=0.2)
+    parser.add_argument("--out", type=Path, default=None, help="Report file (default results/replay/<time>.json)")
+    args = parser.parse_args()
+    if (args.jobs is None) != (args.job_embeddings is None):
+        parser.error("--jobs and --job-embeddings go together")
+
+    report = run_replay(args.interactions, args.workers, args.shards, args.jobs, args.job_embeddings,
+                        args.user_embeddings, args.sample_users, args.fetch_k, args.final_k, args.candidate_k,
+                        args.hybrid_weight)
+    print_report(report)
+    out = args.out or results_dir / f"{int(time.time())}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {out}")
@@ -0,0 +1,291 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+
+# Benchmarks never download the SentenceTransformer model
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+# Add parent directory to path to allow imports if needed
+sys.path.append(str(Path(__file__).parent.parent))
+from evaluation import EvaluationHarness, csr_from_lists
+from models.artifacts import ArtifactBundle
+from models.classifier import ClassifierScorer, RecSysClassifier
+from models.fairness_reranker import rerank_conditional_demographic_parity
+
+root = Path(__file__).parent
+results_dir = root.parent.parent / "results" / "benchmarks"
+
+SIZES = [1_000, 20_000, 200_000, 1_000_000]
+RERANK_SIZES = [50, 200, 1000]
+DIM = 384
+# Each case runs for at least MIN_TIME seconds (and MIN_ROUNDS rounds)
+MIN_TIME = 0.5
+MIN_ROUNDS = 5
+
+# Vocabularies of the synthetic catalog
+SKILLS = ["Python", "SQL", "Java", "Machine Learning (ML)", "Data Analysis", "Cloud Computing (AWS, GCP)",
+          "Project Management", "Communication skills", "React", "Statistics"]
+WORK_TYPES = ["Full-Time", "Part-Time", "Intern", "Contract", "Temporary"]
+COUNTRIES = ["France", "Spain", "Germany", "United States", "India", "Brazil", "Japan", "Nigeria"]
+BUCKETS = ["small", "mid", "large"]
+
+
+# -------------------------
+# Synthetic data
+# -------------------------
+def synthetic_jobs(n_jobs, seed=0):
+    """Catalog with the serving columns, values drawn from small vocabularies."""
+    rng = np.random.default_rng(seed)
+
+    def pick(values, size=n_jobs):
+        return np.asarray(values, dtype=object)[rng.integers(0, len(values), size)]
+
+    skills = [", ".join(SKILLS[i] for i in rng.choice(len(SKILLS), 4, replace=False)) for _ in range(256)]
+    return pd.DataFrame({
+        "job id": rng.permutation(np.arange(10**9, 10**9 + n_jobs)),
+        "job title": pick([f"Title {i}" for i in range(500)]),
+        "role": pick([f"Role {i}" for i in range(200)]),
+        "company": pick([f"Company {i}" for i in range(5000)]),
+        "location": pick([f"City {i}" for i in range(1000)]),
+        "country": pick(COUNTRIES),
+        "skills": pick(skills),
+        "salary range": pick(["$50K-$80K", "$60K-$100K", "$90K-$130K"]),
+        "experience": pick(["0 to 2 Years", "2 to 5 Years", "5 to 10 Years"]),
+        "qualifications": pick(["B.Tech", "M.Tech", "BBA", "MBA", "PhD"]),
+        "work type": pick(WORK_TYPES),
+        "companybucket": pick(BUCKETS),
+        "benefits": pick(["{'Health Insurance'}", "{'Remote Work'}", "{'Stock Options'}"]),
+        "company profile": pick(['{"Sector":"Tech"}', '{"Sector":"Finance"}']),
+        "job description": pick([f"Description {i} " * 20 for i in range(100)]),
+    })
+
+
+def synthetic_embeddings(n_rows, dim=DIM, seed=0):
+    """Float32 (n_rows, dim) L2-normalized random embeddings, built in place."""
+    rng = np.random.default_rng(seed)
+    emb = rng.standard_normal((n_rows, dim), dtype=np.float32)
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+    return torch.from_numpy(emb)
+
+
+def synthetic_bundle(n_jobs, dim=DIM, seed=0):
+    """ArtifactBundle over a synthetic catalog, served with an untrained classifier (eager backend)."""
+    torch.manual_seed(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "classifier.pt"
+        torch.save(RecSysClassifier(input_dim=2 * dim).state_dict(), path)
+        classifier = ClassifierScorer(path)
+    return ArtifactBundle(synthetic_jobs(n_jobs, seed), synthetic_embeddings(n_jobs, dim, seed), classifier=classifier)
+
+
+def synthetic_candidates(n, seed=0):
+    """Candidate dicts as passed by the recommend route to the fairness reranker."""
+    rng = np.random.default_rng(seed)
+    scores = np.sort(rng.random(n))[::-1]
+    return [
+        {"job_id": str(i), "score": float(s), "exposure_count": int(e), "qualified": True, "company_bucket": b}
+        for i, (s, e, b) in enumerate(zip(scores, rng.poisson(3, n), rng.choice(BUCKETS, n)))
+    ]
+
+
+# -------------------------
+# Timing
+# -------------------------
+def measure(fn, min_time=MIN_TIME, min_rounds=MIN_ROUNDS):
+    """Run fn repeatedly (after one warm-up call); latency statistics in ms."""
+    fn()
+    times = []
+    deadline = time.perf_counter() + min_time
+    while len(times) < min_rounds or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {
+        "rounds": len(times),
+        "min_ms": times[0],
+        "median_ms": statistics.median(times),
+        "p90_ms": times[min(len(times) - 1, int(len(times) * 0.9))],
+        "mean_ms": statistics.fmean(times),
+    }
+
+
+def _record(results, name, fn, min_time, **params):
+    stats = measure(fn, min_time)
+    results.append({"name": name, "params": params, **stats})
+    label = ", ".join(f"{k}={v}" for k, v in params.items())
+    print(f"{name:<40}{label:<36}{stats['median_ms']:>12.4f} ms  ({stats['rounds']} rounds)")
+
+
+# -------------------------
+# Cases
+# -------------------------
+def bench_catalog_independent(results, min_time=MIN_TIME, rerank_sizes=RERANK_SIZES, seed=0):
+    from models.base_model import split_skills
+
+    skills = "Python, SQL (PostgreSQL, MySQL) Machine Learning Data Analysis Cloud Computing (AWS, GCP), React"
+    _record(results, "split_skills", lambda: split_skills(skills), min_time)
+
+    for n in rerank_sizes:
+        candidates = synthetic_candidates(n, seed)
+        _record(results, "rerank_conditional_demographic_parity",
+                lambda: rerank_conditional_demographic_parity([dict(c) for c in candidates], k=10,
+                                                              protected_attr="company_bucket"),
+                min_time, n_candidates=n)
+
+
+def bench_catalog(results, n_jobs, dim=DIM, min_time=MIN_TIME, seed=0):
+    from models.base_model import (
+        _get_jobs_from_indices,
+        get_job_details,
+        recommend_from_embedding,
+        update_user_profile_vector,
+    )
+
+    start = time.perf_counter()
+    bundle = synthetic_bundle(n_jobs, dim, seed)
+    print(f"-- {n_jobs:,} jobs x {dim} (synthetic bundle built in {time.perf_counter() - start:.1f}s)")
+
+    rng = np.random.default_rng(seed + 1)
+    u_emb = synthetic_embeddings(1, dim, seed + 1)[0]
+    ids = bundle.job_ids
+    seen = [str(x) for x in rng.choice(ids, size=min(50, n_jobs), replace=False)]
+    liked = ids[rng.integers(n_jobs)]
+    rows = rng.choice(n_jobs, size=min(50, n_jobs), replace=False).tolist()
+    detail_ids = [str(x) for x in rng.choice(ids, size=min(20, n_jobs), replace=False)]
+
+    _record(results, "update_user_profile_vector",
+            lambda: update_user_profile_vector(u_emb, liked, alpha=0.1, bundle=bundle), min_time, n_jobs=n_jobs)
+    for mode, weight in (("cosine", 0.0), ("hybrid", 0.2)):
+        _record(results, f"recommend_from_embedding[{mode}]",
+                lambda: recommend_from_embedding(u_emb, top_k=50, exclude_ids=seen, hybrid_weight=weight,
+                                                 bundle=bundle, candidate_k=200),
+                min_time, n_jobs=n_jobs)
+    _record(results, "_get_jobs_from_indices",
+            lambda: _get_jobs_from_indices(rows, [0.5] * len(rows), bundle=bundle), min_time, n_jobs=n_jobs)
+    _record(results, "get_job_details", lambda: get_job_details(detail_ids, bundle=bundle), min_time, n_jobs=n_jobs)
+
+    # Evaluation over 1000 users, 10 recommendations each
+    harness = EvaluationHarness(k=10)
+    predictions = {u: [str(x) for x in rng.choice(ids, 10, replace=False)] for u in range(1000)}
+    truth = {u: [str(x) for x in rng.choice(ids, 3, replace=False)] for u in range(1000)}
+    attributes = {str(i): {"gender": g} for i, g in zip(ids, rng.choice(["Female", "Male"], n_jobs))}
+    _record(results, "EvaluationHarness.run_benchmark",
+            lambda: harness.run_benchmark(predictions, truth, attributes), min_time, n_jobs=n_jobs, n_users=1000)
+    # Same evaluation as index arrays, plus 100k users
+    for n_users in (1000, 100_000):
+        pred_rows = rng.integers(0, n_jobs, (n_users, 10))
+        truth_csr = csr_from_lists(rng.integers(0, n_jobs, (n_users, 3)), n_jobs)
+        female = rng.random(n_jobs) < 0.5
+        _record(results, "EvaluationHarness.evaluate_arrays",
+                lambda: harness.evaluate_arrays(pred_rows, truth_csr, target_items=female), min_time,
+                n_jobs=n_jobs, n_users=n_users)
+    del bundle, attributes
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=root, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_suite(sizes=SIZES, dim=DIM, min_time=MIN_TIME, rerank_sizes=RERANK_SIZES, seed=0):
+    """Run every case; returns {"meta": ..., "results": [...]}."""
+    results = []
+    bench_catalog_independent(results, min_time, rerank_sizes, seed)
+    for n_jobs in sizes:
+        bench_catalog(results, n_jobs, dim, min_time, seed)
+
+    meta = {
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "torch": torch.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "torch_threads": torch.get_num_threads(),
+        "dim": dim,
+        "sizes": list(sizes),
+        "seed": seed,
+    }
+    return {"meta": meta, "results": results}
+
+
+def _key(result):
+    return (result["name"], json.dumps(result["params"], sort_keys=True))
+
+
+def compare(baseline, current, threshold=0.10):
+    """
+    Median-latency ratio current/baseline per case present in both runs.
+    Returns (rows, regressions); a regression is a ratio above 1 + threshold.
+    """
+    base = {_key(r): r for r in baseline["results"]}
+    rows, regressions = [], []
+    for result in current["results"]:
+        old = base.get(_key(result))
+        if old is None:
+            continue
+        ratio = result["median_ms"] / old["median_ms"] if old["median_ms"] > 0 else float("inf")
+        row = {"name": result["name"], "params": result["params"], "baseline_ms": old["median_ms"],
+               "current_ms": result["median_ms"], "ratio": ratio}
+        rows.append(row)
+        if ratio > 1.0 + threshold:
+            regressions.append(row)
+    return rows, regressions
+
+
+def _load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks of the models/ hot functions on synthetic catalogs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="Run the suite and write a JSON result file")
+    run.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    run.add_argument("--dim", type=int, default=DIM)
+    run.add_argument("--min-time", type=float, default=MIN_TIME, help="Seconds per case")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--out", type=Path, default=None, help="Result file (default results/benchmarks/<commit>.json)")
+    cmp = sub.add_parser("compare", help="Compare two result files")
+    cmp.add_argument("baseline", type=Path)
+    cmp.add_argument("current", type=Path)
+    cmp.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run_suite(args.sizes, args.dim, args.min_time, seed=args.seed)
+        out = args.out or results_dir / f"{report['meta']['commit'] or 'local'}-{int(time.time())}.json"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {out}")
+    else:
+        rows, regressions = compare(_load(args.baseline), _load(args.current), args.threshold)
+        print(f"{'case':<40}{'params':<36}{'baseline ms':>12}{'current ms':>12}{'ratio':>8}")
+        for row in rows:
+            label = ", ".join(f"{k}={v}" for k, v in row["params"].items())
+            flag = "  <-- slower" if row in regressions else ""
+            print(f"{row['name']:<40}{label:<36}{row['baseline_ms']:>12.4f}{row['current_ms']:>12.4f}"
+                  f"{row['ratio']:>8.2f}{flag}")
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
@@ -0,0 +1,439 @@
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+root = Path(__file__).parent
+backend_dir = root.parent
+default_out_dir = backend_dir.parent / "data" / "synthetic"
+
+# Rows generated at scale 1.0; --scale 10 gives 10M interactions
+BASE_USERS = 10_000
+BASE_JOBS = 20_000
+BASE_INTERACTIONS = 1_000_000
+DIM = 384
+MAX_MEMORY_MB = 256
+
+# Same columns, in the same order, as Processed/jobs_sample.parquet,
+# users_export.csv and interactions_export.csv
+JOB_COLUMNS = ["job id", "experience", "qualifications", "salary range", "location", "country", "latitude",
+               "longitude", "work type", "company size", "job posting date", "preference", "contact person",
+               "contact", "job title", "role", "job portal", "job description", "benefits", "skills",
+               "responsibilities", "company", "company profile", "companybucket", "JobText"]
+USER_COLUMNS = ["id", "email", "password", "role", "name", "gender", "interested_domain", "age", "projects",
+                "future_career", "python_level", "sql_level", "java_level", "resume_content"]
+INTERACTION_COLUMNS = ["id", "user_id", "item_id", "type", "action", "timestamp"]
+
+# Estimated peak bytes per generated row (pandas object strings, temporaries),
+# used to size chunks from the memory ceiling
+JOB_ROW_BYTES = 8000
+USER_ROW_BYTES = 3000
+INTERACTION_ROW_BYTES = 1000
+# Per-row arrays kept for the whole run: popularity CDF (float64) and cluster (int8)
+RESIDENT_ROW_BYTES = 9
+MIN_CHUNK = 1000
+
+# Popularity skew (Zipf exponent) of jobs and of user activity
+JOB_ZIPF = 1.0
+USER_ZIPF = 0.6
+# Probability of a like when the job is in the user's domain, and otherwise
+LIKE_RATE_MATCH = 0.7
+LIKE_RATE_OTHER = 0.25
+# Noise around the domain centroid for clustered embeddings
+CLUSTER_SPREAD = 0.8
+
+JOB_ID_BASE = 10**14
+INTERACTIONS_START = np.datetime64("2025-01-01T00:00:00", "ms")
+INTERACTIONS_SPAN_DAYS = 365
+
+# Domains tie users to jobs: a user's domain sets their interested_domain
+# and future_career, a job's domain its title, role and skills
+DOMAINS = [
+    ("Data Science", "Data Scientist", ["Data Scientist", "Data Analyst", "Data Engineer"],
+     ["Python", "SQL", "Statistics", "Data Analysis", "Machine Learning (ML)", "Data visualization (Tableau)"]),
+    ("Web Development", "Web Developer", ["Web Developer", "Front-End Developer", "Back-End Developer"],
+     ["HTML, CSS, JavaScript", "React", "Node.js", "REST APIs", "SQL", "UI/UX design principles"]),
+    ("Machine Learning", "AI Engineer", ["Machine Learning Engineer", "AI Researcher", "Deep Learning Engineer"],
+     ["Python", "PyTorch", "TensorFlow", "Machine Learning (ML)", "Deep learning", "Cloud Computing (AWS, GCP)"]),
+    ("Cybersecurity", "Information Security Analyst", ["Security Analyst", "Network Security Specialist"],
+     ["Network security", "Penetration testing", "Incident response", "Firewalls", "Linux", "Risk assessment"]),
+    ("Software Engineering", "Software Engineer", ["Software Engineer", "Java Developer", "QA Engineer"],
+     ["Java", "Python", "Git", "Agile methodologies", "Unit testing", "System design"]),
+    ("Marketing", "Marketing Manager", ["Marketing Manager", "SEO Specialist", "Social Media Manager"],
+     ["SEO", "Content marketing", "Google Analytics", "Communication skills", "Campaign management", "Copywriting"]),
+    ("Finance", "Financial Analyst", ["Financial Analyst", "Accountant", "Investment Analyst"],
+     ["Financial modeling", "Excel", "Accounting principles", "Budgeting", "Risk assessment", "SQL"]),
+    ("Design", "UX Designer", ["UX Designer", "UI Designer", "Graphic Designer"],
+     ["Figma", "User research", "Wireframing", "Prototyping", "Adobe Creative Suite", "UI/UX design principles"]),
+]
+ROLE_PREFIXES = ["Junior", "Senior", "Lead", "Associate"]
+WORK_TYPES = ["Full-Time", "Part-Time", "Intern", "Contract", "Temporary"]
+COUNTRIES = ["France", "Spain", "Germany", "United States", "India", "Brazil", "Japan", "Nigeria", "Canada",
+             "Australia"]
+QUALIFICATIONS = ["B.Tech", "M.Tech", "BBA", "MBA", "BCA", "MCA", "B.Com", "M.Com", "PhD"]
+PORTALS = ["FlexJobs", "Jobs2Careers", "Stack Overflow Jobs", "Snagajob", "The Muse", "Indeed", "LinkedIn",
+           "Idealist"]
+BENEFITS = ["Health Insurance", "Retirement Plans", "Paid Time Off (PTO)", "Flexible Work Arrangements",
+            "Remote Work Options", "Stock Options", "Tuition Reimbursement", "Life Insurance"]
+SECTORS = ["Technology", "Finance", "Energy", "Healthcare", "Retail", "Consulting", "Telecommunications"]
+BUCKETS = ["small", "mid", "large"]
+FIRST_NAMES = ["Alex", "Sam", "Camille", "Lina", "Hugo", "Maya", "Noah", "Ines", "Lucas", "Sara", "Yanis",
+               "Emma", "Omar", "Chloe", "Adam", "Jade", "Ravi", "Aiko", "Tomas", "Zoe"]
+LAST_NAMES = ["Martin", "Bernard", "Dubois", "Garcia", "Smith", "Kim", "Nguyen", "Rossi", "Silva", "Moreau",
+              "Khan", "Okafor", "Tanaka", "Muller", "Lopez"]
+PROJECTS = ["Movie recommendation system", "E-commerce website", "Chatbot for customer support",
+            "Sales dashboard", "Mobile fitness app", "Network intrusion detection", "Portfolio website",
+            "Stock price forecasting", "Inventory management API", "Image classification model"]
+GENDERS = (["Male", "Female", "Other"], [0.55, 0.4, 0.05])
+PREFERENCES = ["Male", "Female", "Both"]
+LEVELS = ["Weak", "Average", "Strong"]
+
+
+# -------------------------
+# Sizing
+# -------------------------
+def dataset_sizes(scale=1.0):
+    """Number of users, jobs and interactions at a given scale factor."""
+    return {
+        "users": max(1, round(BASE_USERS * scale)),
+        "jobs": max(1, round(BASE_JOBS * scale)),
+        "interactions": max(1, round(BASE_INTERACTIONS * scale)),
+    }
+
+
+def chunk_rows(row_bytes, max_memory_mb=MAX_MEMORY_MB, resident_bytes=0):
+    """
+    Rows per chunk so that one chunk (row_bytes each) plus the arrays kept
+    for the whole run (resident_bytes) stay under max_memory_mb.
+    """
+    budget = max_memory_mb * 1024 * 1024 - resident_bytes
+    if budget < MIN_CHUNK * row_bytes:
+        raise ValueError(f"max_memory_mb={max_memory_mb} is too small for this scale; "
+                         f"need at least {math.ceil((resident_bytes + MIN_CHUNK * row_bytes) / 2**20)} MB")
+    return budget // row_bytes
+
+
+def _chunks(n_rows, size):
+    for start in range(0, n_rows, size):
+        yield start, min(n_rows, start + size)
+
+
+# -------------------------
+# Sampling helpers
+# -------------------------
+def _pick(rng, values, size):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), size)]
+
+
+def _combos(rng, values, k, n=256):
+    """n strings, each joining k distinct values: drawn per row instead of joining per row."""
+    return [", ".join(values[i] for i in rng.choice(len(values), k, replace=False)) for _ in range(n)]
+
+
+def _zipf_cdf(n, exponent):
+    cdf = np.cumsum(1.0 / np.arange(1, n + 1, dtype=np.float64) ** exponent)
+    cdf /= cdf[-1]
+    return cdf
+
+
+def _scatter(n):
+    """Multiplier coprime with n: rank -> (rank * m) % n is a permutation without an index array."""
+    m = 2_654_435_761 % n or 1
+    while math.gcd(m, n) != 1:
+        m += 1
+    return m
+
+
+def _sample_zipf(rng, cdf, scatter, size):
+    ranks = np.minimum(np.searchsorted(cdf, rng.random(size)), len(cdf) - 1)
+    return (ranks * scatter) % len(cdf)
+
+
+def _concat(*parts):
+    """Element-wise string concatenation of literals and object arrays."""
+    out = None
+    for part in parts:
+        part = pd.Series(part, dtype=object) if not isinstance(part, str) else part
+        out = part if out is None else out + part
+    return out.to_numpy(dtype=object)
+
+
+# -------------------------
+# Generators (each yields DataFrame chunks)
+# -------------------------
+def job_chunks(n_jobs, clusters, chunk_size, seed=0):
+    """Catalog rows with every jobs_sample.parquet column; row i belongs to domain clusters[i]."""
+    rng = np.random.default_rng([seed, 1])
+    titles = [np.asarray(d[2], dtype=object) for d in DOMAINS]
+    skills = [np.asarray(_combos(rng, d[3], 3, n=32), dtype=object) for d in DOMAINS]
+    benefits = ["{'" + b + "'}" for b in _combos(rng, BENEFITS, 4)]
+    profiles = [json.dumps({"Sector": s, "Industry": s, "City": f"City {i}"}, separators=(",", ":"))
+                for i, s in enumerate(SECTORS * 4)]
+
+    for start, stop in _chunks(n_jobs, chunk_size):
+        n = stop - start
+        domain = clusters[start:stop]
+        title = np.empty(n, dtype=object)
+        skill = np.empty(n, dtype=object)
+        for d in range(len(DOMAINS)):
+            rows = np.flatnonzero(domain == d)
+            title[rows] = titles[d][rng.integers(0, len(titles[d]), len(rows))]
+            skill[rows] = skills[d][rng.integers(0, len(skills[d]), len(rows))]
+        role = _concat(_pick(rng, ROLE_PREFIXES, n), " ", title)
+        company = _concat("Company ", rng.integers(0, 50_000, n).astype(str))
+        company_profile = _pick(rng, profiles, n)
+        exp_low = rng.integers(0, 5, n)
+        salary_low = rng.integers(50, 90, n)
+        description = _concat(company, " is hiring a ", title, " to join its team. ",
+                              _pick(rng, [f"Team description {i}." for i in range(50)], n))
+        responsibilities = _concat("Work as a ", role, " using ", skill, ".")
+        posted = np.datetime64("2021-01-01") + rng.integers(0, 3 * 365, n).astype("timedelta64[D]")
+
+        chunk = pd.DataFrame({
+            "job id": np.arange(JOB_ID_BASE + start, JOB_ID_BASE + stop, dtype=np.int64),
+            "experience": _concat(exp_low.astype(str), " to ", (exp_low + rng.integers(2, 12, n)).astype(str),
+                                  " Years"),
+            "qualifications": _pick(rng, QUALIFICATIONS, n),
+            "salary range": _concat("$", salary_low.astype(str), "K-$",
+                                    (salary_low + rng.integers(10, 60, n)).astype(str), "K"),
+            "location": _concat("City ", rng.integers(0, 2000, n).astype(str)),
+            "country": _pick(rng, COUNTRIES, n),
+            "latitude": rng.uniform(-60, 70, n).round(4),
+            "longitude": rng.uniform(-180, 180, n).round(4),
+            "work type": _pick(rng, WORK_TYPES, n),
+            "company size": rng.integers(10_000, 140_000, n),
+            "job posting date": np.datetime_as_string(posted, unit="D").astype(object),
+            "preference": _pick(rng, PREFERENCES, n),
+            "contact person": _concat(_pick(rng, FIRST_NAMES, n), " ", _pick(rng, LAST_NAMES, n)),
+            "contact": _concat(rng.integers(200, 999, n).astype(str), "-", rng.integers(100, 999, n).astype(str),
+                               "-", rng.integers(1000, 9999, n).astype(str)),
+            "job title": title,
+            "role": role,
+            "job portal": _pick(rng, PORTALS, n),
+            "job description": description,
+            "benefits": _pick(rng, benefits, n),
+            "skills": skill,
+            "responsibilities": responsibilities,
+            "company": company,
+            "company profile": company_profile,
+            "companybucket": _pick(rng, BUCKETS, n),
+        })
+        chunk["JobText"] = _concat("title ", title, ". role ", role, ". skills ", skill, ". description ",
+                                   description, ". responsibilities ", responsibilities, ". about company ",
+                                   company_profile, ". ")
+        yield chunk
+
+
+def user_chunks(n_users, clusters, chunk_size, seed=0):
+    """Jobseeker rows with the users_export.csv columns; ids start at 1."""
+    rng = np.random.default_rng([seed, 2])
+    domains = np.asarray([d[0] for d in DOMAINS], dtype=object)
+    careers = np.asarray([d[1] for d in DOMAINS], dtype=object)
+    projects = [json.dumps(list(rng.choice(PROJECTS, k, replace=False))) for k in (1, 2, 3) for _ in range(64)]
+
+    for start, stop in _chunks(n_users, chunk_size):
+        n = stop - start
+        ids = np.arange(start + 1, stop + 1)
+        domain = clusters[start:stop]
+        first, last = _pick(rng, FIRST_NAMES, n), _pick(rng, LAST_NAMES, n)
+        yield pd.DataFrame({
+            "id": ids,
+            "email": _concat("user", ids.astype(str), "@example.com"),
+            "password": [f"{x:016x}" for x in rng.integers(0, 2**63, n)],
+            "role": "jobseeker",
+            "name": _concat(first, " ", last),
+            "gender": rng.choice(GENDERS[0], n, p=GENDERS[1]).astype(object),
+            "interested_domain": domains[domain],
+            "age": rng.integers(18, 31, n).astype(float),
+            "projects": _pick(rng, projects, n),
+            "future_career": careers[domain],
+            "python_level": _pick(rng, LEVELS, n),
+            "sql_level": _pick(rng, LEVELS, n),
+            "java_level": _pick(rng, LEVELS, n),
+            "resume_content": np.nan,
+        })
+
+
+def interaction_chunks(n_interactions, user_clusters, job_clusters, chunk_size, seed=0):
+    """
+    Swipes with the interactions_export.csv columns. Users and jobs are drawn
+    from Zipf distributions (a few very active users, a few very popular
+    jobs); a swipe is more likely a like when the job is in the user's
+    domain. item_id is the job's row in the catalog, as in the export.
+    Timestamps increase with the id.
+    """
+    rng = np.random.default_rng([seed, 3])
+    n_users, n_jobs = len(user_clusters), len(job_clusters)
+    user_cdf, job_cdf = _zipf_cdf(n_users, USER_ZIPF), _zipf_cdf(n_jobs, JOB_ZIPF)
+    user_scatter, job_scatter = _scatter(n_users), _scatter(n_jobs)
+    ms_per_row = INTERACTIONS_SPAN_DAYS * 86_400_000 / n_interactions
+
+    for start, stop in _chunks(n_interactions, chunk_size):
+        n = stop - start
+        users = _sample_zipf(rng, user_cdf, user_scatter, n)
+        items = _sample_zipf(rng, job_cdf, job_scatter, n)
+        like_rate = np.where(user_clusters[users] == job_clusters[items], LIKE_RATE_MATCH, LIKE_RATE_OTHER)
+        offsets = (np.arange(start, stop) * ms_per_row).astype(np.int64)
+        timestamps = INTERACTIONS_START + offsets.astype("timedelta64[ms]")
+        yield pd.DataFrame({
+            "id": np.arange(start + 1, stop + 1),
+            "user_id": users + 1,
+            "item_id": items,
+            "type": "job",
+            "action": np.where(rng.random(n) < like_rate, "like", "pass").astype(object),
+            "timestamp": np.char.add(np.datetime_as_string(timestamps, unit="ms"), "Z").astype(object),
+        })
+
+
+def write_embeddings(path, clusters, dim, chunk_size, kind="clustered", seed=0, stream=0):
+    """
+    L2-normalized float32 (len(clusters), dim) embeddings, written chunk by
+    chunk to a .npy file. "clustered" puts each row near its domain
+    centroid (so similarity follows the domains); "random" ignores them.
+    The centroids depend on the seed only, so user and job embeddings
+    generated with the same seed share them; `stream` separates the noise.
+    """
+    centroids = np.random.default_rng([seed, 4]).standard_normal((len(DOMAINS), dim), dtype=np.float32)
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+    rng = np.random.default_rng([seed, 4, stream])
+    header = {"descr": np.lib.format.dtype_to_descr(np.dtype(np.float32)), "fortran_order": False,
+              "shape": (len(clusters), dim)}
+    with open(path, "wb") as f:
+        np.lib.format.write_array_header_1_0(f, header)
+        for start, stop in _chunks(len(clusters), chunk_size):
+            emb = rng.standard_normal((stop - start, dim), dtype=np.float32)
+            if kind == "clustered":
+                emb *= CLUSTER_SPREAD / math.sqrt(dim)
+                emb += centroids[clusters[start:stop]]
+            emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+            emb.tofile(f)
+
+
+def _write_csv(path, chunks):
+    rows = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, header=i == 0, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def _write_parquet(path, chunks):
+    rows, writer = 0, None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _save_torch(npy_path, pt_path):
+    import torch
+
+    torch.save(torch.from_numpy(np.load(npy_path)), pt_path)
+
+
+# -------------------------
+# Dataset
+# -------------------------
+def generate(out_dir, scale=1.0, seed=0, dim=DIM, embeddings="clustered", max_memory_mb=MAX_MEMORY_MB,
+             sizes=None):
+    """
+    Write a synthetic dataset to out_dir and return its manifest:
+      jobs.parquet            catalog, same columns as Processed/jobs_sample.parquet
+      job_embeddings.npy      row-aligned with jobs.parquet
+      users.csv               same columns as Processed/users_export.csv
+      user_embeddings.npy     row i is the user with id i + 1
+      interactions.csv        same columns as Processed/interactions_export.csv
+    Every file is written in chunks sized from max_memory_mb, so peak
+    memory does not grow with the scale beyond the per-row resident
+    arrays (9 bytes per user and per job). The .pt versions of the
+    embeddings (loadable by the serving code) are only written when the
+    matrix fits in max_memory_mb. Same seed, scale and max_memory_mb
+    give the same files.
+    """
+    if embeddings not in ("clustered", "random"):
+        raise ValueError(f"Unknown embeddings kind: {embeddings}")
+    sizes = sizes or dataset_sizes(scale)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    resident = RESIDENT_ROW_BYTES * (sizes["users"] + sizes["jobs"])
+
+    rng = np.random.default_rng([seed, 0])
+    job_clusters = rng.integers(0, len(DOMAINS), sizes["jobs"], dtype=np.int8)
+    user_clusters = rng.integers(0, len(DOMAINS), sizes["users"], dtype=np.int8)
+
+    manifest = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "scale": scale,
+        "seed": seed,
+        "dim": dim,
+        "embeddings": embeddings,
+        "max_memory_mb": max_memory_mb,
+        "rows": {},
+        "files": [],
+    }
+    started = time.perf_counter()
+
+    def done(name, rows=None):
+        manifest["files"].append(name)
+        if rows is not None:
+            manifest["rows"][name] = rows
+        print(f"{name:<24}{rows if rows is not None else '':>12}  ({time.perf_counter() - started:.1f}s)")
+
+    size = chunk_rows(JOB_ROW_BYTES, max_memory_mb, resident)
+    done("jobs.parquet", _write_parquet(out_dir / "jobs.parquet",
+                                        job_chunks(sizes["jobs"], job_clusters, size, seed)))
+    size = chunk_rows(USER_ROW_BYTES, max_memory_mb, resident)
+    done("users.csv", _write_csv(out_dir / "users.csv", user_chunks(sizes["users"], user_clusters, size, seed)))
+    size = chunk_rows(INTERACTION_ROW_BYTES, max_memory_mb, resident)
+    done("interactions.csv", _write_csv(out_dir / "interactions.csv",
+                                        interaction_chunks(sizes["interactions"], user_clusters, job_clusters,
+                                                           size, seed)))
+
+    # The noise, centroid and norm temporaries take about four times the chunk itself
+    size = chunk_rows(4 * 4 * dim, max_memory_mb, resident)
+    for stream, (name, clusters) in enumerate((("job_embeddings", job_clusters), ("user_embeddings", user_clusters))):
+        write_embeddings(out_dir / f"{name}.npy", clusters, dim, size, embeddings, seed, stream)
+        done(f"{name}.npy", len(clusters))
+        if len(clusters) * dim * 4 + resident <= max_memory_mb * 1024 * 1024:
+            _save_torch(out_dir / f"{name}.npy", out_dir / f"{name}.pt")
+            done(f"{name}.pt")
+
+    with open(out_dir / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+# -------------------------
+# CLI
+# -------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic FairMatch dataset (users, jobs, interactions)")
+    parser.add_argument("--out", type=Path, default=default_out_dir)
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help=f"1.0 = {BASE_USERS} users, {BASE_JOBS} jobs, {BASE_INTERACTIONS} interactions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dim", type=int, default=DIM)
+    parser.add_argument("--embeddings", choices=["clustered", "random"], default="clustered")
+    parser.add_argument("--max-memory-mb", type=int, default=MAX_MEMORY_MB)
+    args = parser.parse_args()
+
+    try:
+        manifest = generate(args.out, args.scale, args.seed, args.dim, args.embeddings, args.max_memory_mb)
+    except ValueError as e:
+        sys.exit(str(e))
+    print(f"Dataset written to {args.out}")
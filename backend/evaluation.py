@@ -1,6 +1,26 @@
 import numpy as np
 from collections import Counter
 
+# Users evaluated per chunk by evaluate_arrays (bounds the temporary arrays)
+CHUNK_USERS = 65536
+
+
+def csr_from_lists(rows, n_items=None):
+    """
+    Builds the CSR ground truth used by EvaluationHarness.evaluate_arrays.
+    :param rows: Sequence (one entry per user, in prediction-matrix order) of lists of item indices.
+    :param n_items: Number of items; defaults to the largest index + 1.
+    :return: (indptr, indices, n_items) - row u holds indices[indptr[u]:indptr[u + 1]].
+    """
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.fromiter((i for r in rows for i in r), dtype=np.int64, count=int(indptr[-1]))
+    if n_items is None:
+        n_items = int(indices.max()) + 1 if len(indices) else 0
+    return indptr, indices, n_items
+
+
 class EvaluationHarness:
     def __init__(self, k=10):
         """
@@ -111,6 +131,110 @@ class EvaluationHarness:
         
         return results
 
+    def evaluate_arrays(self, predictions, ground_truth, target_items=None, n_items=None, ks=None,
+                        chunk_size=CHUNK_USERS):
+        """
+        Array version of run_benchmark for large evaluations: NDCG@k, Recall@k,
+        CDP@k and Coverage@k for several k in one pass, users processed in chunks.
+
+        :param predictions: Integer matrix (users x K) of recommended item indices, best first.
+                            Rows with fewer than K recommendations are padded with -1.
+        :param ground_truth: CSR ground truth aligned with the prediction rows: an
+                             (indptr, indices[, n_items]) tuple as returned by
+                             csr_from_lists, or any object with .indptr/.indices
+                             (e.g. a scipy.sparse CSR matrix).
+        :param target_items: Boolean array (n_items,), True for items of the protected
+                             group (e.g. Female); CDP@k is their share of the top-k.
+        :param n_items: Size of the candidate pool for Coverage; defaults to
+                        len(target_items), the CSR's n_items or the largest index + 1.
+        :param ks: Cut-offs (each <= K); defaults to [self.k].
+        :return: Dict {"NDCG@k", "Recall@k", "CDP@k", "Coverage@k" for each k, "users"}.
+
+        NDCG follows calculate_ndcg (the ideal ordering puts the recommended hits
+        first), so NDCG@k and CDP@k equal run_benchmark's Mean_NDCG and
+        Mean_CDP_Female_Ratio. Recall@k is averaged over users with a non-empty
+        ground truth.
+        """
+        predictions = np.asarray(predictions)
+        n_users, width = predictions.shape
+        ks = sorted(ks or [self.k])
+        if ks[-1] > width:
+            raise ValueError(f"k={ks[-1]} is larger than the {width} predictions per user")
+
+        if hasattr(ground_truth, "indptr"):
+            indptr, indices, csr_items = ground_truth.indptr, ground_truth.indices, ground_truth.shape[1]
+        else:
+            indptr, indices, *rest = ground_truth
+            csr_items = rest[0] if rest else None
+        indptr, indices = np.asarray(indptr, dtype=np.int64), np.asarray(indices, dtype=np.int64)
+        if len(indptr) != n_users + 1:
+            raise ValueError(f"Ground truth has {len(indptr) - 1} rows for {n_users} users")
+
+        if n_items is None:
+            if target_items is not None:
+                n_items = len(target_items)
+            elif csr_items is not None:
+                n_items = csr_items
+            else:
+                n_items = int(max(predictions.max(initial=-1), indices.max(initial=-1))) + 1
+        target_items = None if target_items is None else np.asarray(target_items, dtype=bool)
+
+        # discounts[r] = 1 / log2(r + 2); ideal[h] = DCG of h hits at the top
+        discounts = 1.0 / np.log2(np.arange(width) + 2)
+        ideal = np.concatenate([[0.0], np.cumsum(discounts)])
+        key_base = max(n_items, int(predictions.max(initial=0)) + 1, int(indices.max(initial=0)) + 1)
+
+        ndcg = np.zeros(len(ks))
+        recall = np.zeros(len(ks))
+        cdp = np.zeros(len(ks))
+        covered = [np.zeros(key_base, dtype=bool) for _ in ks]
+        users_with_truth = 0
+
+        for start in range(0, n_users, chunk_size):
+            stop = min(n_users, start + chunk_size)
+            preds = predictions[start:stop, :ks[-1]]
+            valid = preds >= 0
+            rows = np.arange(stop - start)
+
+            # 1. Hits: (row, item) keys of the predictions looked up in the sorted truth keys
+            lo, hi = indptr[start], indptr[stop]
+            truth_sizes = np.diff(indptr[start:stop + 1])
+            truth_keys = np.sort(np.repeat(rows, truth_sizes) * key_base + indices[lo:hi])
+            pred_keys = rows[:, None] * key_base + preds
+            if len(truth_keys):
+                pos = np.minimum(np.searchsorted(truth_keys, pred_keys), len(truth_keys) - 1)
+                hits = (truth_keys[pos] == pred_keys) & valid
+            else:
+                hits = np.zeros(preds.shape, dtype=bool)
+
+            # 2. Cumulative DCG, hit counts and protected-group counts over the ranks
+            dcg = np.cumsum(hits * discounts[:preds.shape[1]], axis=1)
+            n_hits = np.cumsum(hits, axis=1)
+            n_valid = np.cumsum(valid, axis=1)
+            if target_items is not None:
+                n_target = np.cumsum(valid & target_items[np.where(valid, preds, 0)], axis=1)
+            has_truth = truth_sizes > 0
+            users_with_truth += int(has_truth.sum())
+
+            for i, k in enumerate(ks):
+                h = n_hits[:, k - 1]
+                ndcg[i] += np.sum(np.divide(dcg[:, k - 1], ideal[h], out=np.zeros(len(h)), where=h > 0))
+                recall[i] += np.sum(h[has_truth] / truth_sizes[has_truth])
+                if target_items is not None:
+                    v = n_valid[:, k - 1]
+                    cdp[i] += np.sum(np.divide(n_target[:, k - 1], v, out=np.zeros(len(v)), where=v > 0))
+                top = preds[:, :k]
+                covered[i][top[valid[:, :k]]] = True
+
+        results = {"users": n_users}
+        for i, k in enumerate(ks):
+            results[f"NDCG@{k}"] = float(ndcg[i] / n_users) if n_users else 0.0
+            results[f"Recall@{k}"] = float(recall[i] / users_with_truth) if users_with_truth else 0.0
+            if target_items is not None:
+                results[f"CDP@{k}"] = float(cdp[i] / n_users) if n_users else 0.0
+            results[f"Coverage@{k}"] = float(covered[i][:n_items].sum() / n_items) if n_items else 0.0
+        return results
+
 # --- MOCK TEST FOR WEEK 2 REPORT (Q3) ---
 if __name__ == "__main__":
     print("Initializing Evaluation Harness...")
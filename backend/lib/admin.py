@@ -0,0 +1,26 @@
+import hmac
+import os
+
+from fastapi import Header, HTTPException, status
+
+# Shared secret for the /admin endpoints. Unset = admin endpoints disabled.
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+
+def is_admin_token(token):
+    """True if `token` matches ADMIN_TOKEN (always False when ADMIN_TOKEN is unset)."""
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def require_admin(x_admin_token: str = Header(None)):
+    """Dependency: the request must carry X-Admin-Token matching ADMIN_TOKEN."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)",
+        )
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin token",
+        )
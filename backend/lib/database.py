@@ -16,7 +16,10 @@ DATABASE_URL = os.environ.get("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set. Please configure it in your .env file.")
 
-engine = create_engine(DATABASE_URL)
+# SQLite (local tests, load harness): sessions are used from FastAPI's
+# threadpool, so allow cross-thread use and wait on locks instead of failing
+connect_args = {"check_same_thread": False, "timeout": 30} if DATABASE_URL.startswith("sqlite") else {}
+engine = create_engine(DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
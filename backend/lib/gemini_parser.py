@@ -4,8 +4,11 @@ from pydantic import BaseModel, Field
 from typing import List, Literal
 import os
 import json
+import logging
 from dotenv import load_dotenv
 
+log = logging.getLogger(__name__)
+
 # 1. Load environment variables
 load_dotenv()
 
@@ -74,6 +77,6 @@ def parse_resume_with_gemini(resume_text: str, interested_domain: str):
         return json.loads(response.text)
 
     except Exception as e:
-        # This will print the specific error if something else goes wrong
-        print(f"Gemini Parsing Error: {e}")
+        # This will log the specific error if something else goes wrong
+        log.error("Gemini parsing error: %s", e)
         return None
\ No newline at end of file
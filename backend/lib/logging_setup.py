@@ -0,0 +1,141 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+from lib.metrics import REGISTRY
+
+# LOG_LEVEL: minimum level written (DEBUG, INFO, WARNING, ...)
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# LOG_FORMAT: "json" (one object per line) or "text"
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json").lower()
+# Fraction of DEBUG records kept (a record can set its own with extra={"sample_rate": ...})
+LOG_DEBUG_SAMPLE = float(os.environ.get("LOG_DEBUG_SAMPLE", "1.0"))
+# Records waiting to be written; further records are dropped rather than blocking a request
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+
+DROPPED_RECORDS = REGISTRY.counter(
+    "fairmatch_log_records_dropped_total", "Log records dropped by sampling or a full queue", ("reason",))
+
+# Attributes every LogRecord has; anything else was passed with extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "sample_rate"}
+
+
+def _extra_fields(record):
+    return {k: v for k, v in vars(record).items() if k not in _RECORD_ATTRS}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, message and the extra= fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable line with the extra= fields appended as key=value."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class SamplingFilter(logging.Filter):
+    """Keep DEBUG records with probability `rate` (or the record's own sample_rate)."""
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = getattr(record, "sample_rate", self.rate)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        DROPPED_RECORDS.inc(reason="sampled")
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full instead of waiting."""
+
+    def prepare(self, record):
+        # Merge the arguments now (they may be mutated after the call) and
+        # keep the traceback as text, for JsonFormatter to put in "exc".
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DROPPED_RECORDS.inc(reason="queue_full")
+
+
+_listener = None
+
+
+def configure_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, debug_sample=LOG_DEBUG_SAMPLE, stream=None):
+    """
+    Route all logging through a bounded queue. The calling thread only
+    filters the record and puts it on the queue; a QueueListener thread
+    formats and writes it to `stream` (stdout by default). Idempotent:
+    a second call replaces the previous configuration.
+    """
+    global _listener
+    stop_logging()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(debug_sample))
+
+    root_logger = logging.getLogger()
+    for existing in [h for h in root_logger.handlers if isinstance(h, NonBlockingQueueHandler)]:
+        root_logger.removeHandler(existing)
+    root_logger.addHandler(handler)
+    root_logger.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+@atexit.register
+def stop_logging():
+    """Write out every queued record and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
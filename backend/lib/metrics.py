@@ -0,0 +1,185 @@
+import threading
+from bisect import bisect_left
+
+# Latency buckets in seconds (sub-millisecond to multi-second)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Buckets for sizes (candidates, batch sizes, ...)
+SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 50000)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, key)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        try:
+            if len(labels) == len(self.labelnames):
+                return tuple([labels[name] for name in self.labelnames])
+        except KeyError:
+            pass
+        raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count, e.g. requests or cache hits."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda item: [str(v) for v in item[0]])
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down, e.g. the catalog size."""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram. observe() is a bisect and three additions under
+    a lock, cheap enough to leave on in the request path.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def snapshot(self, **labels):
+        """(count, sum) for one label set."""
+        state = self._values.get(self._key(labels))
+        return (state[2], state[1]) if state else (0, 0.0)
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._values.items()]
+        items.sort(key=lambda item: [str(v) for v in item[0]])
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_format_number(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# -------------------------
+# Metrics of the API
+# -------------------------
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "fairmatch_http_request_duration_seconds", "HTTP request latency", ("method", "route", "status"))
+STAGE_SECONDS = REGISTRY.histogram(
+    "fairmatch_stage_duration_seconds", "Time spent in each recommendation stage", ("stage",))
+RECOMMENDATIONS = REGISTRY.counter(
+    "fairmatch_recommendations_total", "Recommendation requests served", ("outcome",))
+CANDIDATES = REGISTRY.histogram(
+    "fairmatch_candidates", "Jobs kept by candidate generation per request", buckets=SIZE_BUCKETS)
+EXCLUDED_JOBS = REGISTRY.histogram(
+    "fairmatch_excluded_jobs", "Seen jobs excluded per request", buckets=SIZE_BUCKETS)
+PROFILE_EMBEDDINGS = REGISTRY.counter(
+    "fairmatch_profile_embedding_total",
+    "User embeddings by source: stored (cache hit) or encoded from the profile text", ("source",))
+ENCODE_BATCH_SIZE = REGISTRY.histogram(
+    "fairmatch_encode_batch_size", "Texts per SentenceTransformer encode call", buckets=SIZE_BUCKETS)
+BUNDLE_RELOADS = REGISTRY.counter(
+    "fairmatch_artifact_reloads_total", "Artifact bundle reloads", ("outcome",))
+CATALOG_JOBS = REGISTRY.gauge(
+    "fairmatch_catalog_jobs", "Jobs in the artifact bundle being served")
@@ -0,0 +1,155 @@
+import cProfile
+import functools
+import inspect
+import io
+import logging
+import os
+import pstats
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+
+from lib.admin import is_admin_token
+
+log = logging.getLogger(__name__)
+
+# Where request profiles (.prof, readable with pstats or snakeviz) are written
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", Path(__file__).parent.parent / "profiles"))
+# Most recent profiles kept; older ones are deleted
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", "50"))
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+_PROFILE_NAME = re.compile(r"^[\w.-]+\.prof$")
+_TRUE = ("1", "true", "yes")
+# Sort orders accepted by profile_summary
+SORT_KEYS = tuple(key.value for key in pstats.SortKey)
+
+
+class ProfileRequest:
+    """Set for a request that asked to be profiled; receives the saved profile name."""
+
+    def __init__(self):
+        self.profile_id = None
+
+
+_requested = ContextVar("profile_requested", default=None)
+
+
+def wants_profile(request):
+    """
+    True if the request asks for a profile (X-Profile: 1 header or ?profile=1)
+    and carries a valid X-Admin-Token. Without the token the flag is ignored.
+    """
+    flag = request.headers.get(PROFILE_HEADER) or request.query_params.get("profile")
+    if flag is None or flag.lower() not in _TRUE:
+        return False
+    if not is_admin_token(request.headers.get("x-admin-token")):
+        log.warning("Profile requested without a valid admin token, ignored", extra={"path": request.url.path})
+        return False
+    return True
+
+
+async def profile_middleware(request, call_next):
+    """
+    HTTP middleware: mark the request as profiled if it asks for it, and
+    return the saved profile's id in the X-Profile-Id response header.
+    """
+    if not wants_profile(request):
+        return await call_next(request)
+    profile_request = ProfileRequest()
+    token = _requested.set(profile_request)
+    try:
+        response = await call_next(request)
+    finally:
+        _requested.reset(token)
+    if profile_request.profile_id:
+        response.headers[PROFILE_ID_HEADER] = profile_request.profile_id
+    return response
+
+
+def _save(profiler, name, elapsed):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{name}-{uuid.uuid4().hex[:8]}.prof"
+    profiler.dump_stats(PROFILE_DIR / profile_id)
+    log.info("Request profile saved", extra={"profile_id": profile_id, "elapsed_ms": round(elapsed * 1000, 2)})
+
+    for old in list_profiles()[PROFILE_KEEP:]:
+        (PROFILE_DIR / old["profile_id"]).unlink(missing_ok=True)
+    return profile_id
+
+
+def profiled(name):
+    """
+    Decorator for endpoints: when the request was marked by
+    profile_middleware, run the endpoint under cProfile and save the
+    profile. Otherwise the only cost is one ContextVar lookup.
+
+    cProfile follows the calling thread, so for a sync endpoint (run in
+    FastAPI's threadpool) the profile holds exactly that request. For an
+    async endpoint, other requests running on the event loop while it awaits
+    are included too.
+    """
+    def decorator(fn):
+        def finish(profiler, profile_request, start):
+            profiler.disable()
+            profile_request.profile_id = _save(profiler, name, time.perf_counter() - start)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                profile_request = _requested.get()
+                if profile_request is None:
+                    return await fn(*args, **kwargs)
+                profiler, start = cProfile.Profile(), time.perf_counter()
+                profiler.enable()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    finish(profiler, profile_request, start)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                profile_request = _requested.get()
+                if profile_request is None:
+                    return fn(*args, **kwargs)
+                profiler, start = cProfile.Profile(), time.perf_counter()
+                profiler.enable()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    finish(profiler, profile_request, start)
+        return wrapper
+    return decorator
+
+
+def list_profiles():
+    """Saved profiles, newest first."""
+    if not PROFILE_DIR.exists():
+        return []
+    entries = []
+    for path in PROFILE_DIR.glob("*.prof"):
+        stat = path.stat()
+        entries.append({"profile_id": path.name, "size": stat.st_size, "created_at": stat.st_mtime})
+    entries.sort(key=lambda e: (e["created_at"], e["profile_id"]), reverse=True)
+    return entries
+
+
+def profile_path(profile_id):
+    """Path of a saved profile, or None if the id is not a profile in PROFILE_DIR."""
+    if not _PROFILE_NAME.match(profile_id):
+        return None
+    path = PROFILE_DIR / profile_id
+    return path if path.is_file() else None
+
+
+def profile_summary(path, sort="cumulative", limit=40):
+    """pstats text report of a saved profile. Raises ValueError for a sort not in SORT_KEYS."""
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort {sort!r}, expected one of {', '.join(SORT_KEYS)}")
+    out = io.StringIO()
+    stats = pstats.Stats(str(path), stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
@@ -0,0 +1,20 @@
+import time
+from contextlib import contextmanager
+
+from lib.metrics import STAGE_SECONDS
+
+
+@contextmanager
+def timed(stage, timings=None):
+    """
+    Time a stage: observed in the fairmatch_stage_duration_seconds histogram
+    and, if `timings` is a dict, added to timings[stage] (milliseconds).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed * 1000
@@ -1,9 +1,19 @@
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from lib.logging_setup import configure_logging
+
+# Before the routers are imported: model loading logs through it too
+configure_logging()
+
 from lib.database import engine, Base
+from lib.metrics import HTTP_REQUEST_SECONDS
+from lib.profiling import profile_middleware
 
 # Import routers (recommendations moved to backend-ml service)
-from routers import resume, interactions, auth, recommendations
+from routers import resume, interactions, auth, recommendations, admin, metrics
+from models.artifacts import WATCH_INTERVAL, BundleWatcher
 
 # Create tables automatically (for dev/POC)
 Base.metadata.create_all(bind=engine)
@@ -23,11 +33,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    # Labelled by route template (/recommend/{user_id}), not by raw path
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=request.method,
+                                     route=getattr(route, "path", "unmatched"), status=status)
+
+
+# X-Profile: 1 (or ?profile=1) with an admin token profiles the request
+# in the @profiled endpoints; see lib/profiling.py
+app.middleware("http")(profile_middleware)
+
+
 # Include routers (recommendations in separate backend-ml service)
 app.include_router(resume.router)
 app.include_router(interactions.router)
 app.include_router(auth.router, prefix="/auth")
 app.include_router(recommendations.router)
+app.include_router(admin.router)
+app.include_router(metrics.router)
+
+# Reload the artifact bundle when its files change (ARTIFACT_WATCH_INTERVAL seconds)
+if WATCH_INTERVAL > 0:
+    BundleWatcher(WATCH_INTERVAL).start()
 
 # -------------------------
 # Root endpoint (healthcheck)
@@ -0,0 +1,263 @@
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+
+# Add parent directory to path to allow imports if needed
+sys.path.append(str(Path(__file__).parent.parent))
+from lib.metrics import BUNDLE_RELOADS, CATALOG_JOBS
+from models.bundle_builder import (
+    EMBEDDINGS_NAME,
+    JOB_IDS_NAME,
+    JOBS_NAME,
+    MANIFEST_NAME,
+    BundleError,
+    bundle_dir,
+    read_manifest,
+    stale_sources,
+    verify_bundle,
+)
+from models.classifier import find_classifier_artifact, load_classifier_scorer
+from models.filters import build_filter_indexes, filter_mask
+from models.scoring import ScoringKernel
+from models.registry import ACTIVE_NAME, ModelRegistry, RegistryError, registry_dir
+
+log = logging.getLogger(__name__)
+
+root = Path(__file__).parent
+processed_dir = root.parent / "Processed"
+jobs_path = processed_dir / "jobs_sample.parquet"
+job_emb_path = processed_dir / "job_embeddings.pt"
+
+# Seconds between file checks of the background watcher (0 = disabled)
+WATCH_INTERVAL = float(os.environ.get("ARTIFACT_WATCH_INTERVAL", "0"))
+
+
+class ArtifactBundle:
+    """
+    Everything a recommendation request reads: the job catalog, its
+    embeddings, the classifier and indexes derived from them.
+
+    A bundle is never modified once built. Requests take one reference with
+    get_bundle() and use it throughout, so a reload that swaps in a new
+    bundle does not affect requests already in flight.
+    """
+
+    def __init__(self, jobs, job_emb, classifier=None, classifier_manifest=None, sources=None, job_ids=None):
+        if len(jobs) != job_emb.size(0):
+            raise BundleError(f"Catalog has {len(jobs)} rows but job_embeddings has {job_emb.size(0)}")
+
+        self.jobs = jobs
+        self.job_emb = job_emb
+        self.classifier = classifier
+        self.classifier_manifest = classifier_manifest
+        self.sources = sources or {}
+        self.loaded_at = time.time()
+
+        # job id (str) -> row, shared by exclusion and profile updates
+        if job_ids is not None:
+            self.job_ids = job_ids
+        elif "job id" in jobs.columns:
+            self.job_ids = jobs["job id"].astype(str).to_numpy()
+        else:
+            self.job_ids = np.arange(len(jobs)).astype(str)
+        self.id_index = pd.Index(self.job_ids)
+        self.id_index.get_indexer_for([])  # build the hash table now, not on the first request
+
+        # Per-attribute bitmaps for filtered retrieval (work type, country, ...)
+        self.filter_indexes = build_filter_indexes(jobs)
+
+        # Pre-normalized job matrix and per-thread score buffers
+        self.kernel = ScoringKernel(job_emb)
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def rows_for_ids(self, ids):
+        """Row positions of the given job ids (unknown ids are ignored)."""
+        if not ids:
+            return np.empty(0, dtype=np.int64)
+        rows = self.id_index.get_indexer_for([str(x) for x in ids])
+        return rows[rows >= 0]
+
+    def filter_mask(self, filters):
+        """Boolean mask of the rows matching `filters` (see models/filters.py)."""
+        return filter_mask(self.filter_indexes, len(self), filters)
+
+    def describe(self):
+        manifest = self.classifier_manifest or {}
+        return {
+            "n_jobs": len(self),
+            "embedding_dim": int(self.job_emb.size(1)),
+            "classifier_version": manifest.get("version"),
+            "classifier_backend": getattr(self.classifier, "backend", None),
+            "loaded_at": self.loaded_at,
+            "sources": {name: info[0] for name, info in self.sources.items()},
+        }
+
+
+def _source_state(path):
+    """(path, mtime_ns, size) of a watched file, or (path, None, None) if absent."""
+    path = Path(path)
+    try:
+        stat = path.stat()
+        return (str(path), stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        return (str(path), None, None)
+
+
+def watched_sources(jobs_file=jobs_path, job_emb_file=job_emb_path, registry_path=registry_dir,
+                    bundle_path=bundle_dir):
+    # The artifact load_bundle would serve; classifier.pt (what training writes) until one exists
+    classifier_path = find_classifier_artifact() or root / "classifier.pt"
+    return {
+        "bundle": _source_state(Path(bundle_path) / MANIFEST_NAME),
+        "jobs": _source_state(jobs_file),
+        "job_emb": _source_state(job_emb_file),
+        "registry": _source_state(Path(registry_path) / ACTIVE_NAME),
+        "classifier": _source_state(classifier_path),
+    }
+
+
+def load_bundle(jobs_file=jobs_path, job_emb_file=job_emb_path, registry_path=registry_dir, bundle_path=bundle_dir,
+                strict_model=False):
+    """
+    Build a bundle from disk and validate it. Raises BundleError if the
+    catalog and embeddings are not row-aligned. An active model that cannot
+    score them is dropped with a warning (cosine-only recommendations), or
+    raises BundleError with strict_model=True.
+
+    A bundle directory written by bundle_builder.py is preferred: it is
+    checked against its manifest (O(1)) and holds only the served columns.
+    A bundle built from older versions of jobs_file / job_emb_file is still
+    served, with a warning.
+    Otherwise the raw jobs_sample.parquet / job_embeddings.pt are loaded
+    and their row counts compared.
+    """
+    sources = watched_sources(jobs_file, job_emb_file, registry_path, bundle_path)
+    bundle_path = Path(bundle_path)
+    job_ids = None
+    if read_manifest(bundle_path) is not None:
+        bundle_manifest = verify_bundle(bundle_path)
+        stale = stale_sources(bundle_manifest, jobs_file, job_emb_file)
+        if stale:
+            log.warning("Bundle %s is older than %s; serving it anyway. Rebuild it with "
+                        "`python models/bundle_builder.py build`", bundle_path, ", ".join(stale))
+        jobs = pd.read_parquet(bundle_path / JOBS_NAME)
+        job_emb = torch.load(bundle_path / EMBEDDINGS_NAME)
+        expected = (bundle_manifest["n_jobs"], bundle_manifest["embedding_dim"])
+        if tuple(job_emb.shape) != expected:
+            raise BundleError(f"{EMBEDDINGS_NAME} is {tuple(job_emb.shape)}, manifest says {expected}")
+        job_ids = np.load(bundle_path / JOB_IDS_NAME)
+    else:
+        jobs = pd.read_parquet(jobs_file)
+        job_emb = torch.load(job_emb_file)
+        if len(jobs) != job_emb.size(0):
+            raise BundleError(f"Catalog has {len(jobs)} rows but job_embeddings has {job_emb.size(0)}")
+
+    # Active registry version, validated against job_emb
+    classifier, manifest = None, None
+    registry = ModelRegistry(registry_path)
+    if registry.active_version() is not None:
+        try:
+            classifier, manifest = registry.load_active(job_emb)
+        except RegistryError as e:
+            if strict_model:
+                raise BundleError(f"Active model rejected: {e}")
+            log.warning("Active model rejected, falling back to cosine similarity: %s", e)
+    else:
+        # No registry yet: unversioned classifier next to this file
+        classifier_path = find_classifier_artifact()
+        if classifier_path is not None and classifier_path.exists():
+            classifier = load_classifier_scorer(classifier_path)
+            log.warning("Classifier loaded without manifest (%s: %s); "
+                        "register it with `python models/registry.py import`", classifier.backend, classifier_path.name)
+
+    return ArtifactBundle(jobs, job_emb, classifier, manifest, sources, job_ids)
+
+
+# -------------------------
+# Current bundle
+# -------------------------
+_bundle = None
+_reload_lock = threading.Lock()
+
+
+def get_bundle():
+    """The current bundle (loaded on first use); None if artifacts are missing."""
+    global _bundle
+    if _bundle is None:
+        with _reload_lock:
+            if _bundle is None:
+                try:
+                    swap_bundle(load_bundle())
+                except Exception as e:
+                    log.warning("Could not load model artifacts: %s", e)
+    return _bundle
+
+
+def swap_bundle(bundle):
+    """Make `bundle` current (a single reference assignment). Returns the old one."""
+    global _bundle
+    old, _bundle = _bundle, bundle
+    CATALOG_JOBS.set(len(bundle) if bundle is not None else 0)
+    return old
+
+
+def reload_bundle(**kwargs):
+    """
+    Load and validate a new bundle, then swap it in. The current bundle
+    keeps serving while the new one loads, and stays current if it fails
+    (including when the active model is rejected). Concurrent reloads are
+    serialized.
+    """
+    kwargs.setdefault("strict_model", True)
+    with _reload_lock:
+        start = time.perf_counter()
+        try:
+            bundle = load_bundle(**kwargs)
+        except Exception:
+            BUNDLE_RELOADS.inc(outcome="failed")
+            raise
+        swap_bundle(bundle)
+        BUNDLE_RELOADS.inc(outcome="ok")
+    log.info("Artifact bundle reloaded in %.2fs", time.perf_counter() - start, extra={"bundle": bundle.describe()})
+    return bundle
+
+
+class BundleWatcher(threading.Thread):
+    """
+    Polls the artifact files every `interval` seconds and reloads the bundle
+    when one changes. Each uvicorn worker runs its own watcher, so a single
+    file update reaches every worker.
+    """
+
+    def __init__(self, interval=WATCH_INTERVAL):
+        super().__init__(name="artifact-watcher", daemon=True)
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        bundle = get_bundle()
+        last = bundle.sources if bundle is not None else watched_sources()
+        while not self._stop_event.wait(self.interval):
+            current = watched_sources()
+            if current == last:
+                continue
+            changed = [name for name in current if current[name] != last.get(name)]
+            log.info("Artifact change detected (%s), reloading", ", ".join(changed))
+            try:
+                last = reload_bundle().sources
+            except Exception as e:
+                # Keep serving the old bundle; retry only after the next change
+                log.warning("Reload failed, keeping the current bundle: %s", e)
+                last = current
+
+    def stop(self):
+        self._stop_event.set()
@@ -1,9 +1,14 @@
+import argparse
 import pandas as pd
+import numpy as np
 import torch
 from pathlib import Path
-import random
-from sentence_transformers import util
-from tqdm import tqdm  # For progress bar
+import sys
+
+# Add parent directory to path to allow imports if needed
+sys.path.append(str(Path(__file__).parent.parent))
+from models.data_source import load_interactions
+from models.similarity import item_neighbours
 
 # --- CONFIGURATION ---
 root = Path(__file__).parent
@@ -17,20 +22,25 @@ job_emb_path = processed_dir / "job_embeddings.pt"
 # Output file
 output_path = processed_dir / "interactions_augmented.csv"
 
+# Item-to-item neighbour table cache (shared with any "similar jobs" feature)
+neighbours_path = processed_dir / "item_neighbours.pt"
+
 # Augmentation parameters
 SIMILAR_JOBS_TO_ADD = 3  # For each true LIKE, add 3 similar jobs
 NEGATIVE_RATIO = 1.2     # Add a bit more PASS to maintain balance
+NEIGHBOURS_CONSIDERED = SIMILAR_JOBS_TO_ADD + 1  # Candidates looked at per LIKE
 
-def augment_data():
+def _pair_keys(users, jobs):
+    """Vectorized 'user|job' string keys for (user, job) pair lookups."""
+    return pd.Series(users).astype(str).str.cat(pd.Series(jobs).astype(str).to_numpy(), sep="|")
+
+def augment_data(seed=None, source="csv", db_url=None):
     print("Démarrage de l'augmentation des données")
 
-    # 1. Load data
+    # 1. Load data (CSV export, or the database through the parquet cache
+    # of models/data_source.py)
     try:
-        try:
-            df_inter = pd.read_csv(interactions_path, encoding='utf-8')
-        except:
-            df_inter = pd.read_csv(interactions_path, encoding='latin1')
-            
+        df_inter = load_interactions(source, db_url, csv_path=interactions_path)
         df_jobs = pd.read_parquet(jobs_path)
         job_emb = torch.load(job_emb_path)
         print(f"Données chargées : {len(df_inter)} interactions, {len(df_jobs)} jobs.")
@@ -41,113 +51,109 @@ def augment_data():
     # Job ID to embedding index mapping
     # Important to find which vector corresponds to which job_id
     if 'jobid' in df_jobs.columns:
-        job_ids = df_jobs['jobid'].astype(str).tolist()
+        raw_job_ids = df_jobs['jobid'].to_numpy()
     else:
-        job_ids = df_jobs.index.astype(str).tolist()
-    
-    # Reverse dictionary: Index -> JobID
-    idx_to_jobid = {i: jid for i, jid in enumerate(job_ids)}
-    # Dictionary: JobID -> Index
-    jobid_to_idx = {jid: i for i, jid in enumerate(job_ids)}
+        raw_job_ids = df_jobs.index.to_numpy()
+    job_index = pd.Index(pd.Series(raw_job_ids).astype(str))
+
+    rng = np.random.default_rng(seed)
 
-    # Keep only useful columns
-    new_rows = []
-    
     # Set to avoid duplicates (User, Job)
-    existing_pairs = set(zip(df_inter['user_id'].astype(str), df_inter['item_id'].astype(str)))
+    existing_keys = pd.Index(_pair_keys(df_inter['user_id'], df_inter['item_id']))
 
     # 2. LIKES augmentation (Item-Item Similarity)
     print("Génération des interactions positives (Likes similaires)")
-    
-    # Keep only real likes
+
+    # Top-M neighbours of every job, computed once in blocks and cached
+    _, neighbours = item_neighbours(job_emb, cache_path=neighbours_path)
+    neighbours = neighbours[:, :NEIGHBOURS_CONSIDERED].numpy()
+
+    # Keep only real likes on jobs we have an embedding for
     likes_only = df_inter[df_inter['action'] == 'like']
-    
-    for _, row in tqdm(likes_only.iterrows(), total=len(likes_only)):
-        user_id = str(row['user_id'])
-        original_job_id = str(row['item_id'])
-        
-        if original_job_id not in jobid_to_idx:
-            continue
-            
-        # Get the embedding of the liked job
-        idx = jobid_to_idx[original_job_id]
-        target_emb = job_emb[idx]
-        
-        # Calculate similarity with ALL other jobs
-        # cos_sim returns (1, N_jobs)
-        scores = util.cos_sim(target_emb, job_emb)[0]
-        
-        # Find the top K closest jobs (exclude the job itself)
-        # topk returns values and indices. Take k+1 to be able to remove the original
-        top_results = torch.topk(scores, k=SIMILAR_JOBS_TO_ADD + 1)
-        
-        count = 0
-        for score, neighbor_idx in zip(top_results.values, top_results.indices):
-            neighbor_idx = neighbor_idx.item()
-            neighbor_job_id = idx_to_jobid[neighbor_idx]
-            
-            # Skip if it's the same job or if the interaction already exists
-            if neighbor_job_id == original_job_id or (user_id, neighbor_job_id) in existing_pairs:
-                continue
-            
-            # Add the new artificial like
-            new_rows.append({
-                'user_id': int(user_id) if user_id.isdigit() else user_id,
-                'item_id': int(neighbor_job_id) if neighbor_job_id.isdigit() else neighbor_job_id,
-                'action': 'like',
-                'type': 'augmented_positive', # To trace the origin
-                'timestamp': row['timestamp'] # Keep the same timestamp or use now()
-            })
-            existing_pairs.add((user_id, neighbor_job_id))
-            
-            count += 1
-            if count >= SIMILAR_JOBS_TO_ADD:
-                break
-
-    print(f"   -> {len(new_rows)} nouveaux LIKES générés.")
+    like_job_idx = job_index.get_indexer(likes_only['item_id'].astype(str))
+    in_catalog = (like_job_idx >= 0) & (like_job_idx < len(neighbours))
+    likes = likes_only[in_catalog]
+    like_job_idx = like_job_idx[in_catalog]
+
+    # One row per (like, neighbour), in like order then similarity order
+    n_cand = neighbours.shape[1]
+    cand_idx = neighbours[like_job_idx].ravel()
+    cand = pd.DataFrame({
+        'like': np.repeat(np.arange(len(likes)), n_cand),
+        'user_id': np.repeat(likes['user_id'].to_numpy(), n_cand),
+        'item_id': raw_job_ids[cand_idx],
+        'timestamp': np.repeat(likes['timestamp'].to_numpy(), n_cand),
+    })
+    cand['key'] = _pair_keys(cand['user_id'], cand['item_id']).to_numpy()
+
+    # Skip pairs that already exist, or were already added by an earlier like,
+    # then keep at most SIMILAR_JOBS_TO_ADD per like
+    cand = cand[~cand['key'].isin(existing_keys)]
+    cand = cand.drop_duplicates('key', keep='first')
+    cand = cand[cand.groupby('like').cumcount() < SIMILAR_JOBS_TO_ADD]
+
+    new_likes = pd.DataFrame({
+        'user_id': cand['user_id'].to_numpy(),
+        'item_id': cand['item_id'].to_numpy(),
+        'action': 'like',
+        'type': 'augmented_positive', # To trace the origin
+        'timestamp': cand['timestamp'].to_numpy(), # Keep the same timestamp
+    })
+
+    print(f"   -> {len(new_likes)} nouveaux LIKES générés.")
 
     # 3. PASS augmentation (Negative Sampling) for balance
     print("Génération des interactions négatives (Random Pass)")
-    
+
     # Aim for a ratio (e.g., as many pass as total current + new likes)
-    total_likes = len(likes_only) + len(new_rows)
+    total_likes = len(likes_only) + len(new_likes)
     target_pass = int(total_likes * NEGATIVE_RATIO)
     current_pass = len(df_inter[df_inter['action'] == 'pass'])
     needed_pass = max(0, target_pass - current_pass)
-    
+
     print(f"   Target PASS: {target_pass}. Current: {current_pass}. To generate: {needed_pass}")
-    
+
     unique_users = df_inter['user_id'].unique()
-    
-    pass_generated = 0
-    pbar = tqdm(total=needed_pass)
-    
-    while pass_generated < needed_pass:
-        # Random draw
-        u = random.choice(unique_users)
-        # Draw a random index from jobs
-        rand_idx = random.randint(0, len(job_ids) - 1)
-        j = idx_to_jobid[rand_idx]
-        
-        u_str, j_str = str(u), str(j)
-        
-        if (u_str, j_str) not in existing_pairs:
-            new_rows.append({
-                'user_id': u,
-                'item_id': j if str(j).isdigit() else j, # Keep original type if possible
-                'action': 'pass',
-                'type': 'augmented_negative',
-                'timestamp': df_inter.iloc[0]['timestamp'] # timestamp placeholder
-            })
-            existing_pairs.add((u_str, j_str))
-            pass_generated += 1
-            pbar.update(1)
-            
-    pbar.close()
+
+    # Jobs each user has already interacted with (real + augmented likes)
+    seen = pd.DataFrame({
+        'user_id': np.concatenate([df_inter['user_id'].to_numpy(), new_likes['user_id'].to_numpy()]),
+        'job_idx': np.concatenate([
+            job_index.get_indexer(df_inter['item_id'].astype(str)),
+            job_index.get_indexer(new_likes['item_id'].astype(str)),
+        ]),
+    })
+    seen = seen[seen['job_idx'] >= 0]
+    seen_by_user = seen.groupby('user_id')['job_idx'].unique()
+
+    # Users are drawn uniformly; each user's passes are sampled without
+    # replacement from its own array of unseen jobs.
+    counts = rng.multinomial(needed_pass, np.full(len(unique_users), 1.0 / len(unique_users))) if len(unique_users) else []
+    all_job_idx = np.arange(len(raw_job_ids))
+    pass_users = []
+    pass_jobs = []
+    for u, count in zip(unique_users, counts):
+        if count == 0:
+            continue
+        candidates = np.setdiff1d(all_job_idx, seen_by_user.get(u, []), assume_unique=True)
+        take = min(count, len(candidates))
+        if take < count:
+            print(f"   Warning: user {u} only has {len(candidates)} unseen jobs, {count - take} PASS skipped.")
+        pass_users.append(np.full(take, u))
+        pass_jobs.append(rng.choice(candidates, size=take, replace=False))
+
+    pass_jobs = np.concatenate(pass_jobs) if pass_jobs else np.array([], dtype=int)
+    new_passes = pd.DataFrame({
+        'user_id': np.concatenate(pass_users) if pass_users else np.array([], dtype=int),
+        'item_id': raw_job_ids[pass_jobs],
+        'action': 'pass',
+        'type': 'augmented_negative',
+        'timestamp': df_inter.iloc[0]['timestamp'], # timestamp placeholder
+    })
 
     # 4. Merge and Save
     print("Sauvegarde")
-    df_augmented = pd.DataFrame(new_rows)
+    df_augmented = pd.concat([new_likes, new_passes], ignore_index=True)
     
     # Make sure columns match the original (for concat)
     # The original doesn't have the 'type' column, add it for info or remove it
@@ -167,4 +173,11 @@ def augment_data():
     print(f"   Distribution : \n{df_final['action'].value_counts()}")
 
 if __name__ == "__main__":
-    augment_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Augment the interactions with similar-job likes and random passes")
+    parser.add_argument("--source", choices=["csv", "db"], default="csv",
+                        help="Interactions from the CSV export or the database")
+    parser.add_argument("--db-url", default=None, help="SQLAlchemy URL for --source db (default: DATABASE_URL)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    augment_data(seed=args.seed, source=args.source, db_url=args.db_url)
\ No newline at end of file
@@ -1,65 +1,60 @@
+import logging
 import torch
 import pandas as pd
+import numpy as np
+import os
 import re
-from sentence_transformers import SentenceTransformer, util
+import sys
+from sentence_transformers import SentenceTransformer
 from pathlib import Path
 
+# Add parent directory to path to allow imports if needed
+sys.path.append(str(Path(__file__).parent.parent))
+from lib.metrics import CANDIDATES, ENCODE_BATCH_SIZE, EXCLUDED_JOBS
+from lib.timing import timed
+from models.artifacts import get_bundle
+
+log = logging.getLogger(__name__)
+
 root = Path(__file__).parent
 processed_dir = root.parent / "Processed"
 
-class RecSysClassifier(torch.nn.Module):
-    def __init__(self, input_dim=768, hidden_dim=128):
-        super(RecSysClassifier, self).__init__()
-        self.fc1 = torch.nn.Linear(input_dim, hidden_dim)
-        self.relu = torch.nn.ReLU()
-        self.dropout = torch.nn.Dropout(0.2)
-        self.fc2 = torch.nn.Linear(hidden_dim, 64)
-        self.fc3 = torch.nn.Linear(64, 1)
-        self.sigmoid = torch.nn.Sigmoid()
-
-    def forward(self, x):
-        x = self.fc1(x)
-        x = self.relu(x)
-        x = self.dropout(x)
-        x = self.fc2(x)
-        x = self.relu(x)
-        x = self.fc3(x)
-        return self.sigmoid(x)
-
-# Load pre-calculated artifacts
-try:
-    job_emb  = torch.load(processed_dir / "job_embeddings.pt")       # (N_jobs, 384)
-    jobs     = pd.read_parquet(processed_dir / "jobs_sample.parquet")
-    
-    # Load classifier
-    classifier = RecSysClassifier()
-    classifier_path = root / "classifier.pt"
-    if classifier_path.exists():
-        classifier.load_state_dict(torch.load(classifier_path))
-        classifier.eval()
-        print("Classifier loaded successfully.")
-    else:
-        print("Warning: classifier.pt not found. Using fallback.")
-        classifier = None
-
-    print("Models loaded successfully.")
-    if job_emb is not None:
-        print("job_emb shape :", job_emb.shape)
-    if jobs is not None:
-        print("jobs shape    :", jobs.shape)
-        print("jobs columns  :", jobs.columns.tolist())
-except Exception as e:
-    print(f"WARNING: Could not load model artifacts: {e}")
-    job_emb = None
-    jobs = None
-    classifier = None
+# Recommendation stage sizes (per deployment; can be overridden per request)
+# candidates: jobs kept by cosine similarity and re-scored by the classifier
+CANDIDATE_K = int(os.environ.get("RECO_CANDIDATE_K", "200"))
+# fetch: jobs passed from ranking to the fairness reranker
+FETCH_K = int(os.environ.get("RECO_FETCH_K", "50"))
+# final: jobs returned after fairness reranking
+FINAL_K = int(os.environ.get("RECO_FINAL_K", "10"))
+HYBRID_WEIGHT = float(os.environ.get("RECO_HYBRID_WEIGHT", "0.2"))
+
+# Load pre-calculated artifacts (catalog, embeddings, classifier) as one
+# bundle; see models/artifacts.py for hot reloading.
+_startup_bundle = get_bundle()
+if _startup_bundle is not None:
+    log.info("Models loaded successfully", extra={
+        "job_emb_shape": list(_startup_bundle.job_emb.shape),
+        "jobs_shape": list(_startup_bundle.jobs.shape),
+        "jobs_columns": _startup_bundle.jobs.columns.tolist(),
+    })
+    if _startup_bundle.classifier is None:
+        log.warning("No classifier loaded, using cosine similarity only")
+
+
+def __getattr__(name):
+    # job_emb / jobs / classifier used to be module globals; they now
+    # always reflect the current bundle.
+    if name in ("job_emb", "jobs", "classifier", "classifier_manifest"):
+        current = get_bundle()
+        return getattr(current, name) if current is not None else None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Load sentence embedding model
 try:
     model = SentenceTransformer("all-MiniLM-L6-v2")
-    print("SentenceTransformer loaded.")
+    log.info("SentenceTransformer loaded")
 except Exception as e:
-    print(f"WARNING: Could not load SentenceTransformer: {e}")
+    log.warning("Could not load SentenceTransformer: %s", e)
     model = None
 
 
@@ -112,7 +107,7 @@ def split_skills(val):
     return [t.strip() for t in skills if t and t.strip()]
 
 
-def update_user_profile_vector(user_vector, job_id, alpha=0.1):
+def update_user_profile_vector(user_vector, job_id, alpha=0.1, bundle=None):
     """
     Pseudo Online Learning:
     Updates the user vector by moving it slightly towards the vector of the liked job.
@@ -121,50 +116,34 @@ def update_user_profile_vector(user_vector, job_id, alpha=0.1):
         user_vector (torch.Tensor): Current user embedding (384,)
         job_id (str): ID of the job that was liked
         alpha (float): Learning rate (0.0 to 1.0). How much to adapt.
+        bundle (ArtifactBundle): Artifacts to use; defaults to the current bundle.
         
     Returns:
         torch.Tensor: Updated user vector (normalized)
     """
-    if job_emb is None or jobs is None:
+    bundle = bundle if bundle is not None else get_bundle()
+    if bundle is None:
         return user_vector
 
-    # Find job index
-    # Assuming jobs dataframe has 'jobid' column or index matches
-    # We need to find the row index in 'jobs' which corresponds to 'job_emb' index
-    
+    # Find job index: row position of the job id in the catalog, which is
+    # also its row in job_emb (precomputed id index, first match)
     job_idx = -1
-    
-    # Try to find by column
-    if 'job id' in jobs.columns:
-        matches = jobs.index[jobs['job id'].astype(str) == str(job_id)].tolist()
-        if matches:
-            # If index is integer and matches row number
-            # But wait, job_emb is aligned with jobs rows.
-            # We need the integer position (iloc)
-            # If index is not range(N), we need to find the integer location
-            
-            # Let's assume jobs.index is NOT reliable for position if it was set to jobid
-            # We need the integer position of the row where jobid == job_id
-            
-            # Reset index to be safe? No, that might be expensive.
-            # Let's use numpy to find the index
-            vals = jobs['job id'].astype(str).values
-            indices = (vals == str(job_id)).nonzero()[0]
-            if len(indices) > 0:
-                job_idx = indices[0]
+    rows = bundle.rows_for_ids([job_id])
+    if len(rows) > 0:
+        job_idx = int(rows[0])
     
     if job_idx == -1:
         # Fallback: maybe job_id IS the index (if it's an int)
         if str(job_id).isdigit():
             idx = int(job_id)
-            if 0 <= idx < len(jobs):
+            if 0 <= idx < len(bundle):
                 job_idx = idx
                 
-    if job_idx == -1 or job_idx >= len(job_emb):
-        print(f"Warning: Job ID {job_id} not found for update.")
+    if job_idx == -1 or job_idx >= len(bundle.job_emb):
+        log.warning("Job ID %s not found for update", job_id)
         return user_vector
         
-    target_job_emb = job_emb[job_idx] # (384,)
+    target_job_emb = bundle.job_emb[job_idx] # (384,)
     
     # Move user vector towards job vector
     # New = (1-alpha) * Old + alpha * Job
@@ -176,80 +155,119 @@ def update_user_profile_vector(user_vector, job_id, alpha=0.1):
     return new_vector
 
 
-def recommend_from_embedding(u_emb, top_k=5, exclude_ids=None, hybrid_weight=0.05):
+def generate_candidates(u_emb, bundle, candidate_k=CANDIDATE_K, exclude_ids=None, filters=None, timings=None):
     """
-    Generate recommendations from a pre-computed (and potentially updated) user embedding.
-    exclude_ids: list of job_ids (str) to exclude from results.
-    hybrid_weight: float (0.0 to 1.0). Influence of the classifier. 
-                   0.0 = Pure Content-Based (Cosine).
-                   1.0 = Pure Classifier (MLP).
+    Stage 1, candidate generation: the `candidate_k` jobs most similar to
+    u_emb (cosine), among the rows allowed by `filters`, excluded jobs left out.
+    Returns (rows, cosine_scores) as numpy arrays, best first; rows index
+    the bundle catalog.
     """
-    if job_emb is None or jobs is None:
-        return []
+    kernel = bundle.kernel
+    EXCLUDED_JOBS.observe(len(exclude_ids) if exclude_ids else 0)
 
-    # 2) First, calculate Cosine similarity (Content-Based)
-    cosine_scores = util.cos_sim(u_emb.unsqueeze(0), job_emb)[0]  # (N_jobs,)
-    
+    # Candidate rows: the whole catalog, or the rows allowed by the
+    # attribute bitmaps minus the excluded jobs
+    rows = None
+    if filters and any(filters.values()):
+        with timed("filter", timings):
+            allowed = bundle.filter_mask(filters)
+            if exclude_ids:
+                allowed[bundle.rows_for_ids(set(str(x) for x in exclude_ids))] = False
+            rows = np.flatnonzero(allowed)
+        if rows.size == 0:
+            CANDIDATES.observe(0)
+            return rows, np.empty(0, dtype=np.float32)
+
+    # Cosine against the pre-normalized job matrix (scores live in a
+    # per-thread buffer, no catalog-sized allocation)
+    with timed("cosine", timings):
+        cosine_scores = kernel.cosine(u_emb, rows)  # (N_candidates,)
+
+    # --- EXCLUSION LOGIC ---
+    # Rows of the excluded ids come from the bundle's id index, so the cost
+    # is O(len(exclude_ids)) instead of a scan of the catalog. (With filters
+    # they were already removed from the candidates.)
+    if exclude_ids and rows is None:
+        with timed("exclusion", timings):
+            kernel.exclude(cosine_scores, bundle.rows_for_ids(set(str(x) for x in exclude_ids)))
+    # -----------------------
+
+    # Partial top-k; excluded (-inf) scores are dropped
+    with timed("topk", timings):
+        top_idx, top_scores = kernel.topk(cosine_scores, candidate_k)
+        if rows is not None:
+            top_idx = rows[top_idx]
+    CANDIDATES.observe(len(top_idx))
+    return top_idx, top_scores
+
+
+def rank_candidates(u_emb, bundle, rows, cosine_scores, top_k, hybrid_weight=HYBRID_WEIGHT, timings=None):
+    """
+    Stage 2, ranking: blend the classifier score into the cosine score of
+    the candidates only (O(candidate_k), not O(N_jobs)) and keep the top_k.
+    Returns (rows, scores), best first.
+    """
+    # cosine_scores is this request's own array (not a kernel buffer)
     final_scores = cosine_scores
+    classifier = bundle.classifier
 
-    # 3) Hybrid Scoring with Classifier
-    if classifier is not None and hybrid_weight > 0.0:
+    # Hybrid Scoring with Classifier
+    if classifier is not None and hybrid_weight > 0.0 and len(rows) > 0:
         try:
-            u_emb_expanded = u_emb.unsqueeze(0).expand(job_emb.size(0), -1)
-            inputs = torch.cat((u_emb_expanded, job_emb), dim=1)
-            
-            with torch.no_grad():
-                mlp_scores = classifier(inputs).squeeze()
-            
-            # Hybrid Weight
-            alpha = hybrid_weight
-            final_scores = (1 - alpha) * cosine_scores + alpha * mlp_scores
-            
+            with timed("mlp", timings):
+                inputs = bundle.kernel.classifier_inputs(u_emb, rows)
+                mlp_scores = classifier(inputs).squeeze(1).numpy()
+
+            # Hybrid Weight, blended in place
+            final_scores = bundle.kernel.blend(cosine_scores, mlp_scores, hybrid_weight)
+
         except Exception as e:
-            print(f"Classifier prediction failed: {e}")
+            log.exception("Classifier prediction failed: %s", e)
             final_scores = cosine_scores
 
-    # --- EXCLUSION LOGIC ---
-    if exclude_ids:
-        # We need to find indices of these IDs and set their score to -inf
-        # This is a bit slow if exclude_ids is large and we do it naively.
-        # Assuming jobs['jobid'] corresponds to the rows.
-        
-        # Create a mask?
-        # Let's map job_id -> index once? No, jobs is global.
-        # Let's do a quick lookup.
-        # jobs['jobid'] might be strings or ints.
-        
-        # Optimization: Pre-compute a map if possible, but for now:
-        # Filter by boolean mask on dataframe is easy but we need indices for tensor.
-        
-        # Let's assume exclude_ids is a set of strings
-        exclude_set = set(str(x) for x in exclude_ids)
-        
-        # We need to mask 'final_scores' at specific indices.
-        # Iterating over all jobs to check membership is O(N).
-        # N is ~20k? It's fine.
-        
-        # Vectorized approach:
-        # jobs['jobid'].isin(exclude_ids) -> boolean mask
-        # indices = mask.nonzero()
-        
-        mask = jobs['job id'].astype(str).isin(exclude_set).values
-        # Set scores of masked items to -infinity
-        final_scores[torch.tensor(mask, dtype=torch.bool)] = -float('inf')
-    # -----------------------
+    order = np.argsort(-final_scores, kind="stable")[:top_k]
+    return rows[order], final_scores[order].tolist()
 
-    # 4) Top-k indices
-    # We want to return scores too.
-    top_k_result = torch.topk(final_scores, k=top_k)
-    top_idx = top_k_result.indices.cpu().tolist()
-    top_scores = top_k_result.values.cpu().tolist()
 
-    # 5) Retrieve Jobs
-    return _get_jobs_from_indices(top_idx, top_scores)
+def recommend_from_embedding(u_emb, top_k=5, exclude_ids=None, hybrid_weight=0.05, bundle=None, filters=None,
+                             candidate_k=None, timings=None):
+    """
+    Generate recommendations from a pre-computed (and potentially updated) user embedding.
+    exclude_ids: list of job_ids (str) to exclude from results.
+    hybrid_weight: float (0.0 to 1.0). Influence of the classifier. 
+                   0.0 = Pure Content-Based (Cosine).
+                   1.0 = Pure Classifier (MLP).
+    bundle: artifacts to score against; defaults to the current bundle. The
+            same bundle is used for the whole request, even if a reload
+            swaps in a new one meanwhile.
+    filters: dict of structured constraints, e.g. {"work_type": ["Intern"],
+             "country": ["France", "Spain"]} (keys in models.filters.FILTER_COLUMNS).
+             Only matching jobs are scored, so top_k is filled from them.
+    candidate_k: size of the cosine candidate pool re-scored by the
+             classifier (default CANDIDATE_K, at least top_k).
+    timings: optional dict, receives the duration of each stage in ms
+             (stages are also recorded in lib.metrics).
+    """
+    bundle = bundle if bundle is not None else get_bundle()
+    if bundle is None:
+        return []
+    candidate_k = max(candidate_k or CANDIDATE_K, top_k)
+
+    # 1) Candidate generation (cosine, filters, exclusion)
+    with timed("candidates", timings):
+        rows, cosine_scores = generate_candidates(u_emb, bundle, candidate_k, exclude_ids, filters, timings)
 
+    # 2) Ranking (classifier on the candidates only)
+    with timed("rank", timings):
+        top_idx, top_scores = rank_candidates(u_emb, bundle, rows, cosine_scores, top_k, hybrid_weight, timings)
 
-def recommend_from_text(profile_text: str, top_k: int = 5, exclude_ids=None, hybrid_weight=0.05) -> tuple:
+    # 3) Retrieve Jobs
+    with timed("payload", timings):
+        return _get_jobs_from_indices(top_idx.tolist(), top_scores, bundle=bundle)
+
+
+def recommend_from_text(profile_text: str, top_k: int = 5, exclude_ids=None, hybrid_weight=0.05, bundle=None,
+                        filters=None, candidate_k=None, timings=None) -> tuple:
     """
     Generates recommendations and returns the initial user embedding.
     Returns: (recommendations_list, user_embedding_tensor)
@@ -258,17 +276,21 @@ def recommend_from_text(profile_text: str, top_k: int = 5, exclude_ids=None, hyb
         return [], None
 
     # 1) Encode text
-    u_emb = model.encode(profile_text, convert_to_tensor=True) # (384,)
+    with timed("encode", timings):
+        u_emb = model.encode(profile_text, convert_to_tensor=True) # (384,)
+    ENCODE_BATCH_SIZE.observe(1)
     
     # 2) Recommend
-    recos = recommend_from_embedding(u_emb, top_k, exclude_ids=exclude_ids, hybrid_weight=hybrid_weight)
+    recos = recommend_from_embedding(u_emb, top_k, exclude_ids=exclude_ids, hybrid_weight=hybrid_weight,
+                                     bundle=bundle, filters=filters, candidate_k=candidate_k, timings=timings)
     
     return recos, u_emb
 
 
-def _get_jobs_from_indices(indices, scores=None):
+def _get_jobs_from_indices(indices, scores=None, bundle=None):
+    bundle = bundle if bundle is not None else get_bundle()
     results = []
-    recos_df = jobs.iloc[indices].copy()
+    recos_df = bundle.jobs.iloc[indices].copy()
     
     # If scores provided, add them to the dataframe temporarily to iterate easily
     if scores is not None:
@@ -300,24 +322,23 @@ def _get_jobs_from_indices(indices, scores=None):
     return results
 
 
-def get_job_details(job_ids):
+def get_job_details(job_ids, bundle=None):
     """
     Retrieve job details for a list of job IDs.
     """
-    if jobs is None:
+    bundle = bundle if bundle is not None else get_bundle()
+    if bundle is None:
         return []
+    jobs = bundle.jobs
         
     results = []
     # Convert IDs to string for comparison
     target_ids = set(str(jid) for jid in job_ids)
     
-    # Filter dataframe
-    # This might be slow if we iterate.
-    # Let's use isin
-    
     if 'job id' in jobs.columns:
-        mask = jobs['job id'].astype(str).isin(target_ids)
-        filtered_jobs = jobs[mask]
+        # Catalog order, like the previous isin() filter
+        rows = np.sort(bundle.rows_for_ids(target_ids))
+        filtered_jobs = jobs.iloc[rows]
         
         for idx, row in filtered_jobs.iterrows():
             raw_id = row.get("job id")
@@ -0,0 +1,214 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import torch
+
+# Add parent directory to path to allow imports if needed
+sys.path.append(str(Path(__file__).parent.parent))
+from models.similarity import embedding_fingerprint
+
+root = Path(__file__).parent
+processed_dir = root.parent / "Processed"
+bundle_dir = processed_dir / "bundle"
+
+BUNDLE_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+JOBS_NAME = "jobs.parquet"
+EMBEDDINGS_NAME = "job_embeddings.pt"
+JOB_IDS_NAME = "job_ids.npy"
+
+# Catalog fields read when building API responses (base_model._get_jobs_from_indices)
+SERVING_COLUMNS = [
+    "job id", "job title", "role", "company", "location", "country", "skills", "salary range",
+    "experience", "qualifications", "work type", "companybucket", "benefits", "company profile",
+    "job description",
+]
+
+
+class BundleError(Exception):
+    """Catalog and embeddings do not line up, or a bundle does not match its manifest."""
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def source_state(path):
+    """Size and mtime of a raw source file, recorded in the manifest to detect a stale bundle."""
+    stat = Path(path).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def stale_sources(manifest, jobs_file, job_emb_file):
+    """
+    Names of the raw sources ("jobs", "job_emb") that changed since the
+    bundle was built. Sources that are not on disk are skipped (a bundle
+    can be deployed without them). Manifests without recorded source state
+    fall back to comparing the source mtimes with created_at.
+    """
+    recorded = manifest.get("source_state", {})
+    created_at = datetime.fromisoformat(manifest["created_at"]).timestamp() if "created_at" in manifest else None
+    stale = []
+    for name, path in (("jobs", jobs_file), ("job_emb", job_emb_file)):
+        path = Path(path)
+        if not path.exists():
+            continue
+        if name in recorded:
+            if source_state(path) != recorded[name]:
+                stale.append(name)
+        elif created_at is not None and path.stat().st_mtime > created_at + 1:
+            stale.append(name)
+    return stale
+
+
+def build_bundle(jobs_file=processed_dir / "jobs_sample.parquet", job_emb_file=processed_dir / "job_embeddings.pt",
+                 out_dir=bundle_dir):
+    """
+    Write a self-contained serving bundle:
+      jobs.parquet        catalog pruned to SERVING_COLUMNS
+      job_embeddings.pt   float32 (N_jobs, dim), row-aligned with jobs.parquet
+      job_ids.npy         job id (str) of every row, for the id index
+      manifest.json       row count, dim, columns, size and sha256 per file,
+                          size and mtime of the raw sources
+
+    The catalog and embeddings are checked for alignment here, once, so the
+    server only has to compare the files against the manifest.
+    The bundle is written next to `out_dir` and moved into place at the end.
+    """
+    out_dir = Path(out_dir)
+    sources = {"jobs": source_state(jobs_file), "job_emb": source_state(job_emb_file)}
+    jobs = pd.read_parquet(jobs_file)
+    job_emb = torch.load(job_emb_file)
+
+    if job_emb.dim() != 2 or len(jobs) != job_emb.size(0):
+        raise BundleError(f"{jobs_file} has {len(jobs)} rows but {job_emb_file} is {tuple(job_emb.shape)}")
+
+    columns = [c for c in SERVING_COLUMNS if c in jobs.columns]
+    missing = sorted(set(SERVING_COLUMNS) - set(columns))
+    if missing:
+        print(f"Warning: catalog has no {missing} column(s); responses will use defaults.")
+    jobs = jobs[columns].reset_index(drop=True)
+
+    if "job id" in jobs.columns:
+        job_ids = jobs["job id"].astype(str).to_numpy().astype(str)
+    else:
+        job_ids = np.arange(len(jobs)).astype(str)
+    job_emb = job_emb.detach().cpu().to(torch.float32).contiguous()
+
+    tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    jobs.to_parquet(tmp_dir / JOBS_NAME, index=False)
+    torch.save(job_emb, tmp_dir / EMBEDDINGS_NAME)
+    np.save(tmp_dir / JOB_IDS_NAME, job_ids)
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "n_jobs": len(jobs),
+        "embedding_dim": int(job_emb.size(1)),
+        "catalog_hash": embedding_fingerprint(job_emb),
+        "columns": columns,
+        "sources": {"jobs": str(jobs_file), "job_emb": str(job_emb_file)},
+        "source_state": sources,
+        "files": {
+            name: {"size": (tmp_dir / name).stat().st_size, "sha256": file_sha256(tmp_dir / name)}
+            for name in (JOBS_NAME, EMBEDDINGS_NAME, JOB_IDS_NAME)
+        },
+    }
+    with open(tmp_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap directories: the old bundle is removed only once the new one is in place
+    old_dir = out_dir.with_name(out_dir.name + ".old")
+    if old_dir.exists():
+        shutil.rmtree(old_dir)
+    if out_dir.exists():
+        os.replace(out_dir, old_dir)
+    os.replace(tmp_dir, out_dir)
+    if old_dir.exists():
+        shutil.rmtree(old_dir)
+
+    print(f"Bundle written to {out_dir}: {manifest['n_jobs']} jobs x {manifest['embedding_dim']}, "
+          f"{len(columns)} columns")
+    return manifest
+
+
+def read_manifest(path=bundle_dir):
+    manifest_path = Path(path) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_bundle(path=bundle_dir, full=False):
+    """
+    Check a bundle against its manifest and return the manifest.
+
+    The default check is O(1) in the catalog size: file sizes and the row
+    count stored in the parquet footer. full=True also re-hashes every file.
+    Raises BundleError on any mismatch.
+    """
+    path = Path(path)
+    manifest = read_manifest(path)
+    if manifest is None:
+        raise BundleError(f"No {MANIFEST_NAME} in {path}")
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise BundleError(f"Unsupported bundle format {manifest.get('format')}")
+
+    for name, expected in manifest["files"].items():
+        file_path = path / name
+        if not file_path.exists():
+            raise BundleError(f"{file_path} is missing")
+        size = file_path.stat().st_size
+        if size != expected["size"]:
+            raise BundleError(f"{file_path} is {size} bytes, manifest says {expected['size']}")
+        if full and file_sha256(file_path) != expected["sha256"]:
+            raise BundleError(f"{file_path} does not match its checksum")
+
+    n_rows = pq.read_metadata(path / JOBS_NAME).num_rows
+    if n_rows != manifest["n_jobs"]:
+        raise BundleError(f"{JOBS_NAME} has {n_rows} rows, manifest says {manifest['n_jobs']}")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or verify the serving artifact bundle")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Build the bundle from the Processed files")
+    build.add_argument("--jobs", type=Path, default=processed_dir / "jobs_sample.parquet")
+    build.add_argument("--job-emb", type=Path, default=processed_dir / "job_embeddings.pt")
+    build.add_argument("--out", type=Path, default=bundle_dir)
+    verify = sub.add_parser("verify", help="Check a bundle against its manifest")
+    verify.add_argument("--path", type=Path, default=bundle_dir)
+    verify.add_argument("--full", action="store_true", help="Also re-hash every file")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "build":
+            build_bundle(args.jobs, args.job_emb, args.out)
+        else:
+            manifest = verify_bundle(args.path, full=args.full)
+            print(f"OK: {manifest['n_jobs']} jobs x {manifest['embedding_dim']} ({manifest['created_at']})")
+            stale = stale_sources(manifest, manifest["sources"]["jobs"], manifest["sources"]["job_emb"])
+            if stale:
+                print(f"Warning: {', '.join(stale)} changed since the bundle was built; rebuild it.")
+    except BundleError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,106 @@
+import importlib.util
+import os
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+root = Path(__file__).parent
+
+DEFAULT_ARCHITECTURE = {"input_dim": 768, "hidden_dim": 128, "hidden_dim2": 64, "dropout": 0.2}
+
+
+class RecSysClassifier(nn.Module):
+    def __init__(self, input_dim=768, hidden_dim=128, hidden_dim2=64, dropout=0.2):
+        super(RecSysClassifier, self).__init__()
+        self.fc1 = nn.Linear(input_dim, hidden_dim)
+        self.relu = nn.ReLU()
+        self.dropout = nn.Dropout(dropout)
+        self.fc2 = nn.Linear(hidden_dim, hidden_dim2)
+        self.fc3 = nn.Linear(hidden_dim2, 1)
+        self.sigmoid = nn.Sigmoid()
+
+    def forward(self, x):
+        x = self.fc1(x)
+        x = self.relu(x)
+        x = self.dropout(x)
+        x = self.fc2(x)
+        x = self.relu(x)
+        x = self.fc3(x)
+        return self.sigmoid(x)
+
+
+def architecture_of(model):
+    """Constructor arguments of a RecSysClassifier, as stored in registry manifests."""
+    return {
+        "input_dim": model.fc1.in_features,
+        "hidden_dim": model.fc1.out_features,
+        "hidden_dim2": model.fc2.out_features,
+        "dropout": model.dropout.p,
+    }
+
+
+def architecture_from_state_dict(state_dict, dropout=DEFAULT_ARCHITECTURE["dropout"]):
+    """Recover the layer sizes from a bare state_dict (dropout is not stored in it)."""
+    hidden_dim, input_dim = state_dict["fc1.weight"].shape
+    hidden_dim2 = state_dict["fc2.weight"].shape[0]
+    return {"input_dim": int(input_dim), "hidden_dim": int(hidden_dim), "hidden_dim2": int(hidden_dim2), "dropout": dropout}
+
+
+class ClassifierScorer:
+    """
+    Serving adapter for the classifier. Loads whichever artifact it is given
+    (ONNX, TorchScript or an eager state_dict) and exposes the same call:
+    scorer(inputs) -> (N, 1) tensor of like probabilities.
+    """
+    def __init__(self, path, architecture=None):
+        self.path = Path(path)
+        name = self.path.name
+        if name.endswith(".onnx"):
+            import onnxruntime as ort
+            self.backend = "onnx"
+            self._session = ort.InferenceSession(str(self.path), providers=["CPUExecutionProvider"])
+        elif name.endswith(".ts.pt"):
+            self.backend = "torchscript"
+            self._module = torch.jit.load(str(self.path)).eval()
+        else:
+            self.backend = "eager"
+            state_dict = torch.load(self.path)
+            self._module = RecSysClassifier(**(architecture or architecture_from_state_dict(state_dict)))
+            self._module.load_state_dict(state_dict)
+            self._module.eval()
+
+    def __call__(self, inputs):
+        if self.backend == "onnx":
+            x = inputs.detach().cpu().numpy().astype(np.float32, copy=False)
+            return torch.from_numpy(self._session.run(None, {"inputs": x})[0])
+        with torch.no_grad():
+            return self._module(inputs)
+
+
+def find_classifier_artifact(directory=root):
+    """
+    Pick the classifier artifact to serve from `directory`.
+    CLASSIFIER_ARTIFACT (a file name inside `directory`, or an absolute path)
+    wins; otherwise the first present of classifier.onnx (if onnxruntime is
+    installed), classifier.ts.pt and classifier.pt.
+    The int8 artifacts are only used when named explicitly.
+    """
+    directory = Path(directory)
+    explicit = os.environ.get("CLASSIFIER_ARTIFACT")
+    if explicit:
+        return directory / explicit
+
+    candidates = []
+    if importlib.util.find_spec("onnxruntime") is not None:
+        candidates.append(directory / "classifier.onnx")
+    candidates += [directory / "classifier.ts.pt", directory / "classifier.pt"]
+    for path in candidates:
+        if path.exists():
+            return path
+    return None
+
+
+def load_classifier_scorer(path, architecture=None):
+    return ClassifierScorer(path, architecture)
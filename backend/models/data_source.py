@@ -0,0 +1,280 @@
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+# Add parent directory to path to allow imports if needed
+sys.path.append(str(Path(__file__).parent.parent))
+
+log = logging.getLogger(__name__)
+
+root = Path(__file__).parent
+processed_dir = root.parent / "Processed"
+interactions_export_path = processed_dir / "interactions_export.csv"
+users_export_path = processed_dir / "users_export.csv"
+# Local parquet cache of the database tables
+cache_dir = Path(os.environ.get("DB_CACHE_DIR", processed_dir / "db_cache"))
+
+# Rows fetched from the database per batch
+FETCH_BATCH = int(os.environ.get("DB_FETCH_BATCH", "50000"))
+
+# Columns fetched; same names as the exports. Email, password and name
+# are not needed for training and stay in the database.
+INTERACTIONS_SCHEMA = pa.schema([
+    ("id", pa.int64()), ("user_id", pa.int64()), ("item_id", pa.string()), ("type", pa.string()),
+    ("action", pa.string()), ("timestamp", pa.string()),
+])
+USERS_SCHEMA = pa.schema([
+    ("id", pa.int64()), ("role", pa.string()), ("gender", pa.string()), ("interested_domain", pa.string()),
+    ("age", pa.float64()), ("projects", pa.string()), ("future_career", pa.string()),
+    ("python_level", pa.string()), ("sql_level", pa.string()), ("java_level", pa.string()),
+])
+
+INTERACTIONS_DIR = "interactions"
+USERS_NAME = "users.parquet"
+_PART_NAME = re.compile(r"^part-(\d+)-(\d+)\.parquet$")
+
+
+# -------------------------
+# CSV exports
+# -------------------------
+def read_export(path):
+    """Read a CSV export; older exports are latin1 rather than UTF-8."""
+    try:
+        return pd.read_csv(path, encoding="utf-8")
+    except UnicodeDecodeError:
+        log.warning("%s is not UTF-8, reading it as latin1", Path(path).name)
+        return pd.read_csv(path, encoding="latin1")
+
+
+# -------------------------
+# Database streaming
+# -------------------------
+def _select(table, schema, where=""):
+    columns = ", ".join(f'"{name}"' for name in schema.names)
+    return f"SELECT {columns} FROM {table} {where} ORDER BY id"
+
+
+def _copy_batches(engine, query, schema, batch_size):
+    """
+    Postgres: COPY (query) TO STDOUT as CSV. The whole result is spooled to
+    a temporary file on disk first (not streamed), then parsed back as Arrow
+    record batches, so memory stays at one batch.
+    """
+    block_size = max(1 << 20, batch_size * 64)
+    connection = engine.raw_connection()
+    try:
+        with tempfile.TemporaryFile() as spool:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)", spool)
+            spool.seek(0)
+            reader = pa_csv.open_csv(
+                spool,
+                read_options=pa_csv.ReadOptions(block_size=block_size),
+                convert_options=pa_csv.ConvertOptions(column_types=dict(zip(schema.names, schema.types)),
+                                                      strings_can_be_null=True),
+            )
+            for batch in reader:
+                yield batch.select(schema.names).cast(schema)
+    finally:
+        connection.close()
+
+
+def _cursor_batches(engine, query, schema, batch_size):
+    """Any database: server-side cursor (stream_results), batch_size rows at a time."""
+    from sqlalchemy import text
+
+    with engine.connect().execution_options(stream_results=True, yield_per=batch_size) as connection:
+        result = connection.execute(text(query))
+        for rows in result.partitions(batch_size):
+            columns = list(zip(*rows))
+            arrays = []
+            for values, field in zip(columns, schema):
+                if pa.types.is_string(field.type):
+                    # JSON columns (projects) come back as lists
+                    values = [json.dumps(v) if isinstance(v, (list, dict)) else v for v in values]
+                arrays.append(pa.array(values, type=field.type))
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def stream_table(engine, table, schema, where="", batch_size=FETCH_BATCH, method="auto"):
+    """
+    Yield the rows of `table` (schema columns, ordered by id) as Arrow
+    record batches without loading the table in memory. method: "copy"
+    (Postgres COPY, spooled to a temporary file), "cursor" (server-side
+    cursor, streamed) or "auto".
+    """
+    if method == "auto":
+        method = "copy" if engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2" else "cursor"
+    query = _select(table, schema, where)
+    batches = _copy_batches if method == "copy" else _cursor_batches
+    return batches(engine, query, schema, batch_size)
+
+
+def _write_batches(path, batches, schema):
+    """Write record batches to `path`.tmp; returns (tmp path, rows, first id, last id)."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    rows, first_id, last_id = 0, None, None
+    with pq.ParquetWriter(tmp_path, schema) as writer:
+        for batch in batches:
+            if batch.num_rows == 0:
+                continue
+            writer.write_batch(batch)
+            ids = batch.column("id")
+            first_id = ids[0].as_py() if first_id is None else first_id
+            last_id = ids[-1].as_py()
+            rows += batch.num_rows
+    return tmp_path, rows, first_id, last_id
+
+
+def _engine(db_url):
+    from sqlalchemy import create_engine
+
+    db_url = db_url or os.environ.get("DATABASE_URL")
+    if not db_url:
+        raise ValueError("No database URL: pass --db-url or set DATABASE_URL")
+    return create_engine(db_url)
+
+
+# -------------------------
+# Parquet cache
+# -------------------------
+def interaction_parts(cache=cache_dir):
+    """Cached interaction parts as (first id, last id, path), oldest first."""
+    directory = Path(cache) / INTERACTIONS_DIR
+    if not directory.exists():
+        return []
+    parts = []
+    for path in directory.iterdir():
+        match = _PART_NAME.match(path.name)
+        if match:
+            parts.append((int(match.group(1)), int(match.group(2)), path))
+    return sorted(parts)
+
+
+def high_water_mark(cache=cache_dir):
+    """Largest interaction id in the cache (0 when empty)."""
+    parts = interaction_parts(cache)
+    return max(last for _, last, _ in parts) if parts else 0
+
+
+def sync_interactions(db_url=None, cache=cache_dir, batch_size=FETCH_BATCH, method="auto", full=False, engine=None):
+    """
+    Fetch the interactions with id above the cache's high-water mark into a
+    new parquet part named after its id range. The mark is read back from
+    the part names, so an interrupted sync leaves no gap and no duplicate.
+    Interactions are append-only in the app; full=True fetches everything
+    again (e.g. after rows were deleted) into a new directory that replaces
+    the cached parts only once the fetch succeeded. A row committed
+    after a sync with a lower id than the mark (a transaction still open
+    during the sync) is only picked up by a full sync.
+    Returns {"new_rows", "high_water_mark", "parts"}.
+    """
+    directory = Path(cache) / INTERACTIONS_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    # A full sync is written next to the cache and swapped in at the end
+    target = directory.with_name(directory.name + ".tmp") if full else directory
+    if full:
+        shutil.rmtree(target, ignore_errors=True)
+        target.mkdir()
+
+    engine = engine or _engine(db_url)
+    mark = 0 if full else high_water_mark(cache)
+    batches = stream_table(engine, "interactions", INTERACTIONS_SCHEMA, f"WHERE id > {int(mark)}",
+                           batch_size, method)
+    tmp_path, rows, first_id, last_id = _write_batches(target / "part.parquet", batches, INTERACTIONS_SCHEMA)
+    if rows:
+        tmp_path.rename(target / f"part-{first_id:012d}-{last_id:012d}.parquet")
+        mark = last_id
+    else:
+        tmp_path.unlink()
+
+    if full:
+        # Same swap as bundle_builder.py: the old parts go only once the new ones are in place
+        old_dir = directory.with_name(directory.name + ".old")
+        shutil.rmtree(old_dir, ignore_errors=True)
+        os.replace(directory, old_dir)
+        os.replace(target, directory)
+        shutil.rmtree(old_dir)
+    log.info("Interactions synced", extra={"new_rows": rows, "high_water_mark": mark})
+    return {"new_rows": rows, "high_water_mark": mark, "parts": len(interaction_parts(cache))}
+
+
+def sync_users(db_url=None, cache=cache_dir, batch_size=FETCH_BATCH, method="auto", engine=None):
+    """
+    Fetch the users into users.parquet. Profiles are edited in place, so
+    the table is fetched whole every time (streamed, then swapped in).
+    Returns the number of users.
+    """
+    cache = Path(cache)
+    cache.mkdir(parents=True, exist_ok=True)
+    engine = engine or _engine(db_url)
+    batches = stream_table(engine, "users", USERS_SCHEMA, "", batch_size, method)
+    tmp_path, rows, _, _ = _write_batches(cache / USERS_NAME, batches, USERS_SCHEMA)
+    tmp_path.replace(cache / USERS_NAME)
+    log.info("Users synced", extra={"rows": rows})
+    return rows
+
+
+def load_cached_interactions(cache=cache_dir):
+    parts = [path for _, _, path in interaction_parts(cache)]
+    if not parts:
+        return INTERACTIONS_SCHEMA.empty_table().to_pandas()
+    return pq.ParquetDataset(parts).read().to_pandas()
+
+
+def load_cached_users(cache=cache_dir):
+    path = Path(cache) / USERS_NAME
+    return pq.read_table(path).to_pandas() if path.exists() else USERS_SCHEMA.empty_table().to_pandas()
+
+
+# -------------------------
+# Entry points for training
+# -------------------------
+def load_interactions(source="csv", db_url=None, cache=cache_dir, csv_path=interactions_export_path):
+    """Interactions from the CSV export, or from the database (synced into the cache first)."""
+    if source == "csv":
+        return read_export(csv_path)
+    if source != "db":
+        raise ValueError(f"Unknown data source: {source}")
+    sync_interactions(db_url, cache)
+    return load_cached_interactions(cache)
+
+
+def load_users(source="csv", db_url=None, cache=cache_dir, csv_path=users_export_path):
+    """Users from the CSV export, or from the database (synced into the cache first)."""
+    if source == "csv":
+        return read_export(csv_path)
+    if source != "db":
+        raise ValueError(f"Unknown data source: {source}")
+    sync_users(db_url, cache)
+    return load_cached_users(cache)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync the interactions and users tables into the parquet cache")
+    parser.add_argument("--db-url", default=None, help="SQLAlchemy URL (default: DATABASE_URL)")
+    parser.add_argument("--cache", type=Path, default=cache_dir)
+    parser.add_argument("--batch-size", type=int, default=FETCH_BATCH)
+    parser.add_argument("--method", choices=["auto", "copy", "cursor"], default="auto")
+    parser.add_argument("--full", action="store_true", help="Drop the cached interactions and fetch them all")
+    args = parser.parse_args()
+
+    engine = _engine(args.db_url)
+    result = sync_interactions(cache=args.cache, batch_size=args.batch_size, method=args.method, full=args.full,
+                               engine=engine)
+    users = sync_users(cache=args.cache, batch_size=args.batch_size, method=args.method, engine=engine)
+    print(f"Interactions: {result['new_rows']} new, high-water mark {result['high_water_mark']}, "
+          f"{result['parts']} part(s)")
+    print(f"Users: {users}")
+    print(f"Cache: {args.cache}")
@@ -0,0 +1,106 @@
+import hashlib
+import os
+import torch
+from pathlib import Path
+
+root = Path(__file__).parent
+store_dir = root / "embedding_store"
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+def text_hash(text):
+    return hashlib.sha256(str(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Sentence embeddings keyed by the sha256 of the encoded text.
+
+    Only texts whose hash is not in the store are sent to the model, so
+    rebuilding a catalog after adding or editing a few jobs re-encodes just
+    those jobs. The store is tied to one embedding model: if the saved file
+    was built with another model it is ignored and rebuilt.
+    """
+
+    def __init__(self, path, model_name=EMBEDDING_MODEL_NAME):
+        self.path = Path(path)
+        self.model_name = model_name
+        self.keys = []
+        self.index = {}
+        self.embeddings = None
+
+        if self.path.exists():
+            data = torch.load(self.path)
+            if data.get("model_name") == model_name:
+                self.keys = list(data["keys"])
+                self.index = {k: i for i, k in enumerate(self.keys)}
+                self.embeddings = data["embeddings"]
+            else:
+                print(f"Embedding store {self.path} was built with {data.get('model_name')}, rebuilding.")
+
+    def __len__(self):
+        return len(self.keys)
+
+    def encode(self, texts, model, batch_size=64, show_progress_bar=True, prune=False):
+        """
+        Return a (len(texts), dim) tensor aligned with `texts`,
+        encoding only the texts that are not already stored.
+        prune=True drops the stored texts that are not in `texts` (removed
+        or edited rows), so the store does not grow with every rebuild.
+        """
+        keys = [text_hash(t) for t in texts]
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self.index and key not in missing:
+                missing[key] = text
+
+        print(f"Embedding store: {len(texts) - len(missing)} cached, {len(missing)} to encode")
+
+        if missing:
+            new_emb = model.encode(
+                list(missing.values()),
+                batch_size=batch_size,
+                convert_to_tensor=True,
+                show_progress_bar=show_progress_bar,
+            ).cpu()
+            start = len(self.keys)
+            for offset, key in enumerate(missing):
+                self.index[key] = start + offset
+            self.keys.extend(missing)
+            self.embeddings = new_emb if self.embeddings is None else torch.cat((self.embeddings, new_emb))
+
+        if prune:
+            self.prune(keys)
+
+        if not keys:
+            return torch.empty(0, 0)
+
+        rows = torch.tensor([self.index[k] for k in keys], dtype=torch.long)
+        return self.embeddings[rows]
+
+    def prune(self, keys):
+        """Keep only the entries whose key is in `keys`."""
+        referenced = [k for k in dict.fromkeys(keys) if k in self.index]
+        removed = len(self.keys) - len(referenced)
+        if removed == 0:
+            return
+        if referenced:
+            rows = torch.tensor([self.index[k] for k in referenced], dtype=torch.long)
+            self.embeddings = self.embeddings[rows]
+        else:
+            self.embeddings = None
+        self.keys = referenced
+        self.index = {k: i for i, k in enumerate(self.keys)}
+        print(f"Embedding store: pruned {removed} unused entries")
+
+    def save(self):
+        """Write the store atomically (tmp file + rename)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        torch.save(
+            {"model_name": self.model_name, "keys": self.keys, "embeddings": self.embeddings},
+            tmp_path,
+        )
+        os.replace(tmp_path, self.path)
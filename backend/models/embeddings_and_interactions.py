@@ -1,8 +1,14 @@
 import pandas as pd
 import numpy as np
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import SentenceTransformer
 import torch
 from pathlib import Path
+import sys
+
+# Add parent directory to path to allow imports if needed
+sys.path.append(str(Path(__file__).parent.parent))
+from models.embedding_store import EMBEDDING_MODEL_NAME, EmbeddingStore, store_dir
+from models.similarity import blocked_topk, sample_negatives
 
 project_root = Path(__file__).parent
 
@@ -33,44 +39,50 @@ jobs_sample["JobText"] = jobs_sample.apply(build_job_text, axis=1)
 print("Jobs sample (avec JobText):", jobs_sample.shape)
 
 # 4. Encode with SentenceTransformer
-model = SentenceTransformer("all-MiniLM-L6-v2")
+# Embeddings are cached by text hash: only new or edited profiles / jobs are
+# encoded, then the tensors are re-assembled in DataFrame order.
+model = SentenceTransformer(EMBEDDING_MODEL_NAME)
 
-user_emb = model.encode(
-    students["ProfileText"].tolist(),
-    convert_to_tensor=True,
-    show_progress_bar=True,
-)
+user_store = EmbeddingStore(store_dir / "students.pt")
+user_emb = user_store.encode(students["ProfileText"].tolist(), model, prune=True)
+user_store.save()
 
-job_emb = model.encode(
-    jobs_sample["JobText"].tolist(),
-    convert_to_tensor=True,
-    show_progress_bar=True,
-)
+job_store = EmbeddingStore(store_dir / "jobs.pt")
+job_emb = job_store.encode(jobs_sample["JobText"].tolist(), model, prune=True)
+job_store.save()
 
 # 5. Build positive/negative interactions
-user_ids = students.index.to_list()
-job_ids = jobs_sample.index.to_list()
+# Similarities are computed in blocks of users (one matmul + batched top-k
+# per block) and negatives are drawn for all users at once, so this scales
+# to ~100k synthetic users without a Python loop per user.
+N_POSITIVES = 10
+N_NEGATIVES = 10
 
-interactions = []
+user_ids = students.index.to_numpy()
+job_ids = jobs_sample.index.to_numpy()
 
 # Positives: top-10 jobs by similarity
-for i, uvec in enumerate(user_emb):
-    sims = util.cos_sim(uvec, job_emb)[0]
-    topk = torch.topk(sims, k=10)
-    top_job_idx = topk.indices.cpu().numpy()
-
-    uid = user_ids[i]
-    for j_idx in top_job_idx:
-        jid = job_ids[int(j_idx)]
-        interactions.append({"UserId": int(uid), "JobId": int(jid), "Label": 1})
-
-# Negatives: 10 random jobs per user
-for uid in user_ids:
-    negative_choices = np.random.choice(job_ids, size=10, replace=False)
-    for jid in negative_choices:
-        interactions.append({"UserId": int(uid), "JobId": int(jid), "Label": 0})
-
-inter_df = pd.DataFrame(interactions)
+_, top_job_idx = blocked_topk(user_emb.cpu(), job_emb.cpu(), k=N_POSITIVES)
+top_job_idx = top_job_idx.numpy()
+
+# Negatives: 10 random jobs per user, never one of its positives
+rng = np.random.default_rng(42)
+neg_job_idx = sample_negatives(top_job_idx, n_items=len(job_ids), n_neg=N_NEGATIVES, rng=rng)
+
+inter_df = pd.DataFrame({
+    "UserId": np.concatenate([
+        np.repeat(user_ids, top_job_idx.shape[1]),
+        np.repeat(user_ids, N_NEGATIVES),
+    ]).astype(int),
+    "JobId": np.concatenate([
+        job_ids[top_job_idx.ravel()],
+        job_ids[neg_job_idx.ravel()],
+    ]).astype(int),
+    "Label": np.concatenate([
+        np.ones(top_job_idx.size, dtype=int),
+        np.zeros(neg_job_idx.size, dtype=int),
+    ]),
+})
 
 # 6. Shuffle + split train/val/test
 inter_df = inter_df.sample(frac=1, random_state=42).reset_index(drop=True)
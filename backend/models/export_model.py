@@ -0,0 +1,151 @@
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import torch
+import torch.nn as nn
+
+# Add parent directory to path to allow imports if needed
+sys.path.append(str(Path(__file__).parent.parent))
+
+root = Path(__file__).parent
+model_path = root / "classifier.pt"
+
+# Artifact names, next to classifier.pt
+TORCHSCRIPT_NAME = "classifier.ts.pt"
+TORCHSCRIPT_INT8_NAME = "classifier.int8.ts.pt"
+ONNX_NAME = "classifier.onnx"
+ONNX_INT8_NAME = "classifier.int8.onnx"
+
+
+def quantize_int8(model):
+    """Dynamic int8 quantization of the Linear layers (weights int8, activations fp32)."""
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def export_torchscript(model, path, input_dim=768, quantize=False):
+    """Trace the classifier to TorchScript; optionally quantize it first."""
+    model = model.eval()
+    if quantize:
+        model = quantize_int8(model)
+    example = torch.randn(8, input_dim)
+    with torch.no_grad(), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        traced = torch.jit.trace(model, example)
+        traced = torch.jit.freeze(traced) if not quantize else traced
+    torch.jit.save(traced, str(path))
+    return path
+
+
+def export_onnx(model, path, input_dim=768, quantize=False):
+    """
+    Export the classifier to ONNX with a dynamic batch axis.
+    With quantize=True the exported graph is then quantized with
+    onnxruntime's dynamic int8 quantizer. Requires `onnx` (and
+    `onnxruntime` for quantization); returns None if they are missing.
+    """
+    try:
+        import onnx  # noqa: F401
+    except ImportError:
+        print("onnx is not installed; skipping ONNX export.")
+        return None
+
+    model = model.eval()
+    fp32_path = Path(path) if not quantize else Path(path).with_suffix(".fp32.tmp.onnx")
+    example = torch.randn(8, input_dim)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        torch.onnx.export(
+            model, (example,), str(fp32_path),
+            input_names=["inputs"], output_names=["scores"],
+            dynamic_axes={"inputs": {0: "batch"}, "scores": {0: "batch"}},
+            dynamo=False,
+        )
+
+    if quantize:
+        try:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+        except ImportError:
+            print("onnxruntime is not installed; skipping ONNX int8 quantization.")
+            fp32_path.unlink()
+            return None
+        quantize_dynamic(str(fp32_path), str(path), weight_type=QuantType.QInt8)
+        fp32_path.unlink()
+    return path
+
+
+def export_all(model, out_dir=root, input_dim=768, quantize=True, onnx=True):
+    """
+    Write every serving artifact for `model` into `out_dir`.
+    Returns {artifact name: path} for the artifacts that were produced.
+    """
+    out_dir = Path(out_dir)
+    # Never leave a stale export next to a newer classifier.pt
+    for name in (TORCHSCRIPT_NAME, TORCHSCRIPT_INT8_NAME, ONNX_NAME, ONNX_INT8_NAME):
+        (out_dir / name).unlink(missing_ok=True)
+
+    artifacts = {TORCHSCRIPT_NAME: export_torchscript(model, out_dir / TORCHSCRIPT_NAME, input_dim)}
+    if quantize:
+        artifacts[TORCHSCRIPT_INT8_NAME] = export_torchscript(model, out_dir / TORCHSCRIPT_INT8_NAME, input_dim, quantize=True)
+    if onnx:
+        artifacts[ONNX_NAME] = export_onnx(model, out_dir / ONNX_NAME, input_dim)
+        if quantize and artifacts[ONNX_NAME] is not None:
+            artifacts[ONNX_INT8_NAME] = export_onnx(model, out_dir / ONNX_INT8_NAME, input_dim, quantize=True)
+    artifacts = {name: p for name, p in artifacts.items() if p is not None}
+    for name, p in artifacts.items():
+        print(f"Exported {name} -> {p}")
+    return artifacts
+
+
+def benchmark(scorers, batch_sizes=(50, 650, 20000), input_dim=768, repeats=50):
+    """
+    Median latency (ms) of each scorer callable at several batch sizes.
+    A batch is one user scored against that many jobs.
+    """
+    torch.manual_seed(0)
+    results = {}
+    for n in batch_sizes:
+        inputs = torch.randn(n, input_dim)
+        for name, scorer in scorers.items():
+            scorer(inputs)  # warm-up
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                scorer(inputs)
+                times.append(time.perf_counter() - start)
+            times.sort()
+            results[(name, n)] = times[len(times) // 2] * 1000
+    return results
+
+
+if __name__ == "__main__":
+    from models.classifier import RecSysClassifier, architecture_from_state_dict, load_classifier_scorer
+
+    parser = argparse.ArgumentParser(description="Export classifier.pt for CPU serving")
+    parser.add_argument("--model", type=Path, default=model_path)
+    parser.add_argument("--out-dir", type=Path, default=root)
+    parser.add_argument("--no-quantize", action="store_true", help="Skip the int8 artifacts")
+    parser.add_argument("--no-onnx", action="store_true", help="Skip the ONNX artifacts")
+    parser.add_argument("--benchmark", action="store_true", help="Compare latency against the eager model")
+    args = parser.parse_args()
+
+    state_dict = torch.load(args.model)
+    architecture = architecture_from_state_dict(state_dict)
+    model = RecSysClassifier(**architecture)
+    model.load_state_dict(state_dict)
+    model.eval()
+
+    artifacts = export_all(model, args.out_dir, input_dim=architecture["input_dim"],
+                           quantize=not args.no_quantize, onnx=not args.no_onnx)
+
+    if args.benchmark:
+        scorers = {"eager": load_classifier_scorer(args.model)}
+        for name, p in artifacts.items():
+            scorers[name] = load_classifier_scorer(p)
+
+        results = benchmark(scorers)
+        print(f"\n{'artifact':<24}{'batch':>8}{'median ms':>12}{'vs eager':>10}")
+        for (name, n), ms in results.items():
+            print(f"{name:<24}{n:>8}{ms:>12.3f}{results[('eager', n)] / ms:>9.2f}x")
@@ -1,8 +1,14 @@
 # models/fairness_reranker.py
 
+import logging
 from collections import Counter, defaultdict
 from typing import List, Dict, Any
 
+log = logging.getLogger(__name__)
+
+# Share of per-call DEBUG records kept (one pair per request otherwise)
+DEBUG_SAMPLE_RATE = 0.01
+
 
 def rerank_conditional_demographic_parity(
     candidates: List[Dict[str, Any]],
@@ -52,7 +58,7 @@ def rerank_conditional_demographic_parity(
     ]
 
     if not qualified:
-        print("[FAIRNESS] No qualified candidates; falling back to pure relevance top-k.")
+        log.info("No qualified candidates; falling back to pure relevance top-k")
         return sorted(
             candidates, key=lambda x: x.get("score", 0.0), reverse=True
         )[:k]
@@ -81,11 +87,12 @@ def rerank_conditional_demographic_parity(
         g: group_counts[g] / total_qualified for g in group_counts
     }
 
-    print(
-        f"[FAIRNESS/CDP] Qualified={total_qualified}, "
-        f"groups={dict(group_counts)}, "
-        f"target_proportions={group_proportions}"
-    )
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(
+            "CDP targets: qualified=%d, groups=%s, target_proportions=%s",
+            total_qualified, dict(group_counts), group_proportions,
+            extra={"sample_rate": DEBUG_SAMPLE_RATE},
+        )
 
     # -----------------------------
     # 3. Pre-sort candidates by group & FAIR_SCORE (rank-awareness)
@@ -136,10 +143,12 @@ def rerank_conditional_demographic_parity(
         used_ids.add(cid)
         taken_per_group[next_c.get(protected_attr, "unknown")] += 1
 
-    print(
-        f"[FAIRNESS/CDP] Final shortlist size={len(shortlist)}, "
-        f"taken_per_group={dict(taken_per_group)}"
-    )
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(
+            "CDP shortlist: size=%d, taken_per_group=%s",
+            len(shortlist), dict(taken_per_group),
+            extra={"sample_rate": DEBUG_SAMPLE_RATE},
+        )
 
     return shortlist
 
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+# Query parameter -> catalog column that can be filtered on
+FILTER_COLUMNS = {
+    "work_type": "work type",
+    "country": "country",
+    "location": "location",
+    "company_bucket": "companybucket",
+}
+
+
+def normalize_value(value):
+    return str(value).strip().lower()
+
+
+class AttributeIndex:
+    """
+    Rows of the catalog holding each value of one column.
+
+    Frequent values are kept as packed bitmaps (1 bit per row); values
+    covering less than 1/32 of the rows are kept as int32 row lists, which
+    are smaller than a bitmap at that density. Either way the rows matching
+    a set of values are found without scanning the column.
+    """
+
+    def __init__(self, column):
+        self.n_rows = len(column)
+        self.dense = {}
+        self.sparse = {}
+
+        values = pd.Series(column).fillna("").astype(str).str.strip().str.lower().to_numpy()
+        codes, uniques = pd.factorize(values)
+        order = np.argsort(codes, kind="stable").astype(np.int32)
+        counts = np.bincount(codes, minlength=len(uniques))
+        bounds = np.concatenate(([0], np.cumsum(counts)))
+
+        for code, value in enumerate(uniques):
+            rows = order[bounds[code]:bounds[code + 1]]
+            if len(rows) * 32 >= self.n_rows:
+                bits = np.zeros(self.n_rows, dtype=bool)
+                bits[rows] = True
+                self.dense[value] = np.packbits(bits)
+            else:
+                self.sparse[value] = rows
+
+    def __contains__(self, value):
+        value = normalize_value(value)
+        return value in self.dense or value in self.sparse
+
+    def values(self):
+        return sorted(list(self.dense) + list(self.sparse))
+
+    def packed_mask(self, values):
+        """Packed bitmap of the rows matching any of `values`."""
+        packed = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        sparse_rows = []
+        for value in {normalize_value(v) for v in values}:
+            if value in self.dense:
+                packed |= self.dense[value]
+            elif value in self.sparse:
+                sparse_rows.append(self.sparse[value])
+        if sparse_rows:
+            bits = np.zeros(self.n_rows, dtype=bool)
+            bits[np.concatenate(sparse_rows)] = True
+            packed |= np.packbits(bits)
+        return packed
+
+
+def build_filter_indexes(jobs):
+    """AttributeIndex per filterable column present in `jobs`."""
+    return {
+        param: AttributeIndex(jobs[column])
+        for param, column in FILTER_COLUMNS.items()
+        if column in jobs.columns
+    }
+
+
+def filter_mask(indexes, n_rows, filters):
+    """
+    Boolean (n_rows,) mask of the rows matching every filter.
+    `filters` maps a FILTER_COLUMNS key to accepted values: values of one
+    attribute are OR-ed, attributes are AND-ed. Empty filters are ignored;
+    an attribute missing from the catalog matches nothing.
+    """
+    packed = None
+    for param, values in filters.items():
+        if not values:
+            continue
+        if param not in indexes:
+            return np.zeros(n_rows, dtype=bool)
+        mask = indexes[param].packed_mask(values)
+        packed = mask if packed is None else packed & mask
+    if packed is None:
+        return np.ones(n_rows, dtype=bool)
+    return np.unpackbits(packed, count=n_rows).view(bool)
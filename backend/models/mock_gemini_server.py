@@ -0,0 +1,97 @@
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockGeminiHandler(BaseHTTPRequestHandler):
+    """
+    Answers `POST .../models/<model>:generateContent` with a canned rewrite,
+    so the rewrite stage can run without network access or an API key.
+    """
+
+    def do_POST(self):
+        if not self.path.endswith(":generateContent"):
+            self.send_error(404, "Only generateContent is mocked")
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+
+        with server.lock:
+            server.request_count += 1
+            fail = server.fail_every and server.request_count % server.fail_every == 0
+
+        if server.latency > 0:
+            time.sleep(server.latency)
+
+        if fail:
+            self.send_error(500, "Injected failure")
+            return
+
+        prompt = ""
+        for content in body.get("contents", []):
+            for part in content.get("parts", []):
+                prompt += part.get("text", "")
+
+        match = re.search(r"for a (.+?) role", prompt)
+        job_title = match.group(1) if match else "Position"
+        text = f"Mock rewrite for a {job_title} role."
+
+        payload = json.dumps({
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {"promptTokenCount": 0, "candidatesTokenCount": 0, "totalTokenCount": 0},
+        }).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # Keep test and pipeline output quiet
+        pass
+
+
+def start_mock_server(host="127.0.0.1", port=0, latency=0.0, fail_every=0):
+    """
+    Start the mock server in a daemon thread.
+    Returns (server, base_url). Call server.shutdown() to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), MockGeminiHandler)
+    server.request_count = 0
+    server.latency = latency
+    server.fail_every = fail_every
+    server.lock = threading.Lock()
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    base_url = f"http://{host}:{server.server_address[1]}/"
+    return server, base_url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock of the Gemini generateContent API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument("--fail-every", type=int, default=0, help="Return HTTP 500 on every Nth request")
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(args.host, args.port, args.latency, args.fail_every)
+    print(f"Mock Gemini server listening on {base_url}")
+    print(f"Run the pipeline with GEMINI_BASE_URL={base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import torch
+
+# Add parent directory to path to allow imports if needed
+sys.path.append(str(Path(__file__).parent.parent))
+from models.classifier import (
+    RecSysClassifier,
+    architecture_from_state_dict,
+    find_classifier_artifact,
+    load_classifier_scorer,
+)
+from models.embedding_store import EMBEDDING_MODEL_NAME
+from models.similarity import embedding_fingerprint
+
+root = Path(__file__).parent
+processed_dir = root.parent / "Processed"
+registry_dir = root / "registry"
+
+MANIFEST_NAME = "manifest.json"
+ACTIVE_NAME = "ACTIVE"
+STATE_DICT_NAME = "classifier.pt"
+
+
+class RegistryError(Exception):
+    """A model version is missing or incompatible with the serving catalog."""
+
+
+def _write_json_atomic(path, data):
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def catalog_hash(job_emb):
+    """Identifies the job catalog (embedding matrix) a model was trained against."""
+    return embedding_fingerprint(job_emb)
+
+
+class ModelRegistry:
+    """
+    Versioned classifier store.
+
+    registry/
+        v0001/  classifier.pt, exported artifacts, manifest.json
+        v0002/  ...
+        ACTIVE  {"version": "v0002", "previous": "v0001"}
+
+    Versions are immutable once written. Serving reads the ACTIVE pointer,
+    which is replaced atomically; activating or rolling back a version never
+    copies model files.
+    """
+
+    def __init__(self, path=registry_dir):
+        self.path = Path(path)
+
+    # -------------------------
+    # Versions
+    # -------------------------
+    def versions(self):
+        if not self.path.exists():
+            return []
+        return sorted(p.name for p in self.path.iterdir() if p.is_dir() and (p / MANIFEST_NAME).exists())
+
+    def version_dir(self, version):
+        return self.path / version
+
+    def manifest(self, version):
+        path = self.version_dir(version) / MANIFEST_NAME
+        if not path.exists():
+            raise RegistryError(f"Unknown model version {version!r}")
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _new_version_dir(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        existing = [int(p.name[1:]) for p in self.path.iterdir() if p.is_dir() and p.name[1:].isdigit()]
+        n = max(existing, default=0) + 1
+        while True:
+            version = f"v{n:04d}"
+            try:
+                (self.path / version).mkdir()
+                return version
+            except FileExistsError:
+                n += 1
+
+    def register(self, state_dict, architecture, job_emb, metrics=None, training=None,
+                 embedding_model=EMBEDDING_MODEL_NAME, export=True, activate=True):
+        """
+        Store a trained classifier as a new version and return its name.
+        The manifest records what serving needs to check compatibility:
+        architecture, embedding model and dimension, and the catalog hash.
+        """
+        version = self._new_version_dir()
+        vdir = self.version_dir(version)
+        torch.save(state_dict, vdir / STATE_DICT_NAME)
+
+        artifacts = [STATE_DICT_NAME]
+        if export:
+            try:
+                from models.export_model import export_all
+                model = RecSysClassifier(**architecture)
+                model.load_state_dict(state_dict)
+                artifacts += list(export_all(model, vdir, input_dim=architecture["input_dim"]))
+            except Exception as e:
+                print(f"Warning: export failed, {version} will be served from {STATE_DICT_NAME}: {e}")
+
+        manifest = {
+            "version": version,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "architecture": dict(architecture),
+            "embedding": {"model_name": embedding_model, "dim": int(job_emb.size(1))},
+            "catalog": {"hash": catalog_hash(job_emb), "n_jobs": int(job_emb.size(0))},
+            "metrics": metrics or {},
+            "training": training or {},
+            "artifacts": artifacts,
+        }
+        # Written last: a version without a manifest is not listed
+        _write_json_atomic(vdir / MANIFEST_NAME, manifest)
+        print(f"Registered model {version} in {self.path}")
+
+        if activate:
+            self.activate(version)
+        return version
+
+    # -------------------------
+    # ACTIVE pointer
+    # -------------------------
+    def _pointer(self):
+        path = self.path / ACTIVE_NAME
+        if not path.exists():
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def active_version(self):
+        return self._pointer().get("version")
+
+    def activate(self, version):
+        self.manifest(version)  # must exist
+        current = self.active_version()
+        if current == version:
+            return version
+        _write_json_atomic(self.path / ACTIVE_NAME, {"version": version, "previous": current})
+        print(f"Active model: {version} (was {current})")
+        return version
+
+    def rollback(self):
+        """Point ACTIVE back at the previously active version."""
+        previous = self._pointer().get("previous")
+        if previous is None:
+            raise RegistryError("No previous version to roll back to")
+        return self.activate(previous)
+
+    # -------------------------
+    # Serving
+    # -------------------------
+    def load_active(self, job_emb, embedding_model=EMBEDDING_MODEL_NAME):
+        """
+        Validate the active version against the serving catalog and load it.
+        Returns (scorer, manifest), or (None, None) when nothing is active.
+        Raises RegistryError if the version cannot score this catalog.
+        """
+        version = self.active_version()
+        if version is None:
+            return None, None
+        manifest = self.manifest(version)
+        for warning in validate_manifest(manifest, job_emb, embedding_model):
+            print(f"Warning ({version}): {warning}")
+
+        path = find_classifier_artifact(self.version_dir(version))
+        if path is None or not path.exists():
+            raise RegistryError(f"No classifier artifact in {self.version_dir(version)}")
+        return load_classifier_scorer(path, manifest["architecture"]), manifest
+
+
+def validate_manifest(manifest, job_emb, embedding_model=EMBEDDING_MODEL_NAME):
+    """
+    Check a manifest against the serving embeddings.
+    Raises RegistryError when the model cannot score them (wrong embedding
+    model or dimension); returns a list of warnings for softer mismatches
+    such as a model trained on another version of the catalog.
+    """
+    dim = int(job_emb.size(1))
+    embedding = manifest["embedding"]
+    if embedding["model_name"] != embedding_model:
+        raise RegistryError(f"Model expects {embedding['model_name']} embeddings, serving uses {embedding_model}")
+    if embedding["dim"] != dim:
+        raise RegistryError(f"Model expects {embedding['dim']}-d embeddings, job_embeddings.pt is {dim}-d")
+    if manifest["architecture"]["input_dim"] != 2 * dim:
+        raise RegistryError(f"Model input_dim {manifest['architecture']['input_dim']} != 2 x {dim}")
+
+    warnings = []
+    catalog = manifest["catalog"]
+    if catalog["n_jobs"] != job_emb.size(0) or catalog["hash"] != catalog_hash(job_emb):
+        warnings.append(f"trained on a different job catalog ({catalog['n_jobs']} jobs, {catalog['hash'][:12]})")
+    return warnings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage versioned classifier models")
+    parser.add_argument("--registry", type=Path, default=registry_dir)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="List versions and their metrics")
+    sub.add_parser("show", help="Print a manifest").add_argument("version", nargs="?")
+    sub.add_parser("activate", help="Point serving at a version").add_argument("version")
+    sub.add_parser("rollback", help="Re-activate the previously active version")
+    imp = sub.add_parser("import", help="Register an existing classifier state_dict")
+    imp.add_argument("path", type=Path, nargs="?", default=root / STATE_DICT_NAME)
+    imp.add_argument("--job-emb", type=Path, default=processed_dir / "job_embeddings.pt")
+    imp.add_argument("--no-activate", action="store_true")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.registry)
+    try:
+        if args.command == "list":
+            active = registry.active_version()
+            for version in registry.versions():
+                m = registry.manifest(version)
+                metrics = ", ".join(f"{k}={v}" for k, v in m["metrics"].items())
+                marker = "*" if version == active else " "
+                print(f"{marker} {version}  {m['created_at']}  {m['catalog']['n_jobs']} jobs  {metrics}")
+        elif args.command == "show":
+            version = args.version or registry.active_version()
+            if version is None:
+                raise RegistryError("No active version")
+            print(json.dumps(registry.manifest(version), indent=2))
+        elif args.command == "activate":
+            registry.activate(args.version)
+        elif args.command == "rollback":
+            registry.rollback()
+        elif args.command == "import":
+            state_dict = torch.load(args.path)
+            registry.register(
+                state_dict, architecture_from_state_dict(state_dict), torch.load(args.job_emb),
+                training={"imported_from": str(args.path)}, activate=not args.no_activate,
+            )
+    except RegistryError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,244 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from google import genai
+from google.genai import types
+
+root = Path(__file__).parent
+
+GEMINI_MODEL = "gemini-2.5-flash-lite"
+REQUESTS_PER_MINUTE = 15
+MAX_WORKERS = 4
+DEFAULT_CHECKPOINT_PATH = root / "rewrite_checkpoint.jsonl"
+
+REWRITE_FIELDS = ["job_title", "description", "company", "benefits", "responsibilities", "company_profile"]
+
+
+def _is_set(val):
+    return val is not None and str(val).lower() != "nan" and str(val) != ""
+
+
+def build_rewrite_prompt(description, job_title, company=None, benefits=None, responsibilities=None, company_profile=None):
+    """Build the recruiter prompt used to rewrite a job description."""
+    # Build a context string from available data
+    context_details = ""
+    if _is_set(company):
+        context_details += f"Company Name: {company}\n"
+    if _is_set(company_profile):
+        context_details += f"About the Company: {company_profile}\n"
+    if _is_set(responsibilities):
+        context_details += f"Key Responsibilities: {responsibilities}\n"
+    if _is_set(benefits):
+        context_details += f"Key Benefits: {benefits}\n"
+
+    return (
+        f"Act as a professional recruiter. Write a cohesive, concise job description (2-3 sentences) "
+        f"for a {job_title} role.\n\n"
+        f"Synthesize the following details into the description:\n"
+        f"{context_details}\n"
+        f"Original Draft: {description}\n\n"
+        f"IMPORTANT: Output ONLY the raw paragraph text. Do not output 'Here is the description' or quotes."
+    )
+
+
+def row_content_hash(request):
+    """
+    Stable hash of the fields that go into the prompt.
+    """
+    payload = json.dumps(
+        {field: str(request.get(field, "")) for field in REWRITE_FIELDS},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def checkpoint_keys(requests):
+    """
+    Checkpoint key per request: the content hash, suffixed with the
+    occurrence number for exact duplicates so each copy still gets its own
+    rewrite (the point of the rewrite is to diversify duplicated postings).
+    """
+    seen = {}
+    keys = []
+    for request in requests:
+        h = row_content_hash(request)
+        n = seen.get(h, 0)
+        seen[h] = n + 1
+        keys.append(h if n == 0 else f"{h}:{n}")
+    return keys
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter.
+    `rate_per_minute` tokens are refilled continuously, up to `capacity`.
+    """
+
+    def __init__(self, rate_per_minute=REQUESTS_PER_MINUTE, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1.0:
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1.0
+
+
+class RewriteCheckpoint:
+    """
+    Append-only JSONL file of completed rewrites keyed by row content hash.
+    Every completed rewrite is flushed immediately, so an interrupted run
+    loses at most the requests that were in flight.
+    """
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_PATH):
+        self.path = Path(path)
+        self.done = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Partial last line from an interrupted run
+                        continue
+                    self.done[entry["hash"]] = entry["text"]
+
+    def __contains__(self, key):
+        return key in self.done
+
+    def get(self, key):
+        return self.done.get(key)
+
+    def add(self, key, text):
+        self.done[key] = text
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"hash": key, "text": text}) + "\n")
+
+
+class RewriteStage:
+    """
+    Rewrites job descriptions with Gemini using one shared client,
+    a token-bucket limiter and a bounded pool of async workers.
+
+    Each request is a dict with the keys in REWRITE_FIELDS.
+    Without an API key or base URL (see mock_gemini_server.py) the stage
+    is a no-op that returns the original descriptions.
+    Failed rewrites fall back to the original description and are not
+    checkpointed, so they are retried on the next run.
+    """
+
+    def __init__(
+        self,
+        api_key=None,
+        base_url=None,
+        model=GEMINI_MODEL,
+        requests_per_minute=REQUESTS_PER_MINUTE,
+        max_workers=MAX_WORKERS,
+        checkpoint_path=DEFAULT_CHECKPOINT_PATH,
+        client=None,
+    ):
+        api_key = api_key or os.environ.get("GOOGLE_API_KEY")
+        base_url = base_url or os.environ.get("GEMINI_BASE_URL")
+
+        if client is None and (api_key or base_url):
+            http_options = types.HttpOptions(base_url=base_url) if base_url else None
+            client = genai.Client(api_key=api_key or "mock", http_options=http_options)
+
+        self.client = client
+        self.model = model
+        self.requests_per_minute = requests_per_minute
+        self.max_workers = max_workers
+        self.checkpoint = RewriteCheckpoint(checkpoint_path)
+        self.stats = {"cached": 0, "rewritten": 0, "failed": 0}
+
+    async def _rewrite_one(self, request):
+        prompt = build_rewrite_prompt(
+            description=request.get("description", ""),
+            job_title=request.get("job_title", "Position"),
+            company=request.get("company"),
+            benefits=request.get("benefits"),
+            responsibilities=request.get("responsibilities"),
+            company_profile=request.get("company_profile"),
+        )
+        response = await self.client.aio.models.generate_content(model=self.model, contents=prompt)
+        text = response.text.strip() if response and response.text else ""
+        return text.strip('"').strip("'")
+
+    async def _worker(self, queue, limiter, results_by_hash):
+        while True:
+            item = await queue.get()
+            if item is None:
+                queue.task_done()
+                return
+            key, request = item
+            try:
+                await limiter.acquire()
+                text = await self._rewrite_one(request)
+                if text:
+                    self.checkpoint.add(key, text)
+                    results_by_hash[key] = text
+                    self.stats["rewritten"] += 1
+                    print(f"[Gemini] Rewrote {self.stats['rewritten']} - {request.get('job_title', '')}")
+                else:
+                    self.stats["failed"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"Gemini rewrite failed: {e}")
+            finally:
+                queue.task_done()
+
+    async def run_async(self, requests):
+        """Rewrite all requests; returns the new descriptions in input order."""
+        if self.client is None:
+            print("WARNING: no GOOGLE_API_KEY or GEMINI_BASE_URL; keeping original descriptions.")
+            return [request.get("description", "") for request in requests]
+
+        keys = checkpoint_keys(requests)
+        results_by_hash = {}
+
+        queue = asyncio.Queue()
+        n_queued = 0
+        for key, request in zip(keys, requests):
+            if key in self.checkpoint:
+                results_by_hash[key] = self.checkpoint.get(key)
+                self.stats["cached"] += 1
+            else:
+                queue.put_nowait((key, request))
+                n_queued += 1
+
+        print(f"[Gemini] {len(requests)} rows: {self.stats['cached']} from checkpoint, {n_queued} to rewrite")
+
+        if n_queued:
+            limiter = TokenBucket(self.requests_per_minute)
+            n_workers = max(1, min(self.max_workers, n_queued))
+            for _ in range(n_workers):
+                queue.put_nowait(None)
+            workers = [
+                asyncio.create_task(self._worker(queue, limiter, results_by_hash))
+                for _ in range(n_workers)
+            ]
+            await asyncio.gather(*workers)
+
+        return [
+            results_by_hash.get(key, request.get("description", ""))
+            for key, request in zip(keys, requests)
+        ]
+
+    def run(self, requests):
+        return asyncio.run(self.run_async(requests))
@@ -0,0 +1,230 @@
+import argparse
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import torch
+
+# Rows gathered / partitioned per block: bounds the per-call scratch memory
+BLOCK_ROWS = 4096
+
+
+class _Buffers:
+    """Scratch arrays owned by one thread, grown on demand and then reused."""
+
+    def __init__(self, n_rows, dim):
+        self.scores = np.empty(n_rows, dtype=np.float32)
+        self.gather = np.empty((BLOCK_ROWS, dim), dtype=np.float32)
+        self.inputs = np.empty((0, 2 * dim), dtype=np.float32)
+        self.candidates = np.empty(0, dtype=np.int64)
+
+    def inputs_for(self, n):
+        if self.inputs.shape[0] < n:
+            self.inputs = np.empty((n, self.inputs.shape[1]), dtype=np.float32)
+        return self.inputs[:n]
+
+    def gather_for(self, n):
+        if self.gather.shape[0] < n:
+            self.gather = np.empty((n, self.gather.shape[1]), dtype=np.float32)
+        return self.gather[:n]
+
+    def candidates_for(self, n):
+        if self.candidates.shape[0] < n:
+            self.candidates = np.empty(n, dtype=np.int64)
+        return self.candidates[:n]
+
+
+class ScoringKernel:
+    """
+    Cosine scoring over a fixed job matrix without per-request allocations
+    proportional to the catalog.
+
+    Job vectors are L2-normalized once, here (the matrix is shared with
+    job_emb when it is already normalized). A request then costs one matvec
+    into a per-thread score buffer; exclusion and the hybrid blend are
+    written into that buffer in place, and top-k is a blocked
+    argpartition, so scratch memory is O(BLOCK_ROWS + k) per call.
+
+    Arrays returned by cosine() are views of the calling thread's buffer:
+    they stay valid until the same thread scores again.
+    """
+
+    def __init__(self, job_emb):
+        emb = job_emb.detach().cpu().to(torch.float32).contiguous().numpy()
+        norms = np.linalg.norm(emb, axis=1)
+        if np.allclose(norms, 1.0, atol=1e-4):
+            self.unit = emb
+        else:
+            self.unit = emb / np.maximum(norms, 1e-12)[:, None]
+        # Classifier inputs use the embeddings as stored, like training
+        self.raw = emb
+        self.n_rows, self.dim = emb.shape
+        self._local = threading.local()
+
+    def _buffers(self):
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None:
+            buffers = self._local.buffers = _Buffers(self.n_rows, self.dim)
+        return buffers
+
+    @staticmethod
+    def _unit_query(u):
+        u = np.asarray(u.detach().cpu() if isinstance(u, torch.Tensor) else u, dtype=np.float32)
+        return u / max(float(np.linalg.norm(u)), 1e-12)
+
+    def cosine(self, u, rows=None):
+        """Cosine similarity of u with every job (or with `rows` only)."""
+        buffers = self._buffers()
+        u = self._unit_query(u)
+        if rows is None:
+            np.dot(self.unit, u, out=buffers.scores)
+            return buffers.scores
+
+        out = buffers.scores[:len(rows)]
+        for start in range(0, len(rows), BLOCK_ROWS):
+            block = rows[start:start + BLOCK_ROWS]
+            gathered = buffers.gather[:len(block)]
+            np.take(self.unit, block, axis=0, out=gathered, mode="clip")
+            np.dot(gathered, u, out=out[start:start + len(block)])
+        return out
+
+    @staticmethod
+    def exclude(scores, rows):
+        """Mask `rows` out of `scores` in place."""
+        if len(rows):
+            scores[rows] = -np.inf
+
+    def topk(self, scores, k):
+        """
+        Indices and values of the k largest finite scores, best first.
+        Each block of BLOCK_ROWS scores contributes its own top-k (argpartition),
+        then the survivors are partitioned once more.
+        """
+        n = scores.shape[0]
+        k = min(k, n)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if n <= BLOCK_ROWS:
+            idx = np.argpartition(scores, n - k)[n - k:]
+        else:
+            candidates = self._buffers().candidates_for(((n + BLOCK_ROWS - 1) // BLOCK_ROWS) * k)
+            m = 0
+            for start in range(0, n, BLOCK_ROWS):
+                block = scores[start:start + BLOCK_ROWS]
+                kb = min(k, block.shape[0])
+                part = np.argpartition(block, block.shape[0] - kb)[block.shape[0] - kb:]
+                np.add(part, start, out=candidates[m:m + kb])
+                m += kb
+            candidates = candidates[:m]
+            best = np.argpartition(scores[candidates], m - k)[m - k:]
+            idx = candidates[best]
+
+        values = scores[idx]
+        order = np.argsort(-values, kind="stable")
+        idx, values = idx[order], values[order]
+        keep = np.isfinite(values)
+        return idx[keep], values[keep]
+
+    def classifier_inputs(self, u, rows):
+        """(len(rows), 2*dim) float32 tensor [u, job] in a reused buffer."""
+        buffers = self._buffers()
+        inputs = buffers.inputs_for(len(rows))
+        gathered = buffers.gather_for(len(rows))
+        u = np.asarray(u.detach().cpu() if isinstance(u, torch.Tensor) else u, dtype=np.float32)
+        inputs[:, :self.dim] = u
+        np.take(self.raw, rows, axis=0, out=gathered, mode="clip")
+        inputs[:, self.dim:] = gathered
+        return torch.from_numpy(inputs)
+
+    @staticmethod
+    def blend(scores, mlp_scores, alpha):
+        """scores = (1 - alpha) * scores + alpha * mlp_scores, in place."""
+        scores *= (1.0 - alpha)
+        mlp_scores *= alpha
+        scores += mlp_scores
+        return scores
+
+
+# -------------------------
+# Microbenchmark
+# -------------------------
+def _legacy_scores(u_emb, job_emb, excluded, k):
+    """The previous request path: cos_sim over the catalog, bool mask, topk."""
+    from sentence_transformers import util
+
+    scores = util.cos_sim(u_emb.unsqueeze(0), job_emb)[0]
+    mask = torch.zeros(job_emb.size(0), dtype=torch.bool)
+    mask[torch.from_numpy(excluded)] = True
+    scores[mask] = -float("inf")
+    top = torch.topk(scores, k=k)
+    return top.indices.numpy(), top.values.numpy()
+
+
+def _kernel_scores(kernel, u, excluded, k):
+    scores = kernel.cosine(u)
+    kernel.exclude(scores, excluded)
+    return kernel.topk(scores, k)
+
+
+def _torch_allocated_bytes(fn):
+    """Bytes allocated by torch's CPU allocator during fn() (not seen by tracemalloc)."""
+    from torch.profiler import ProfilerActivity, profile
+
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+        fn()
+    return sum(max(e.cpu_memory_usage, 0) for e in prof.events())
+
+
+def microbenchmark(n_jobs=20000, dim=384, k=200, n_excluded=50, repeats=100, seed=0):
+    """Median latency and per-call allocations of the legacy path vs the kernel."""
+    rng = np.random.default_rng(seed)
+    job_emb = torch.nn.functional.normalize(torch.from_numpy(rng.standard_normal((n_jobs, dim), dtype=np.float32)), dim=1)
+    u_emb = torch.from_numpy(rng.standard_normal(dim, dtype=np.float32))
+    excluded = rng.choice(n_jobs, size=n_excluded, replace=False)
+    kernel = ScoringKernel(job_emb)
+
+    cases = {
+        "legacy (cos_sim + mask + topk)": lambda: _legacy_scores(u_emb, job_emb, excluded, k),
+        "kernel": lambda: _kernel_scores(kernel, u_emb, excluded, k),
+    }
+    assert np.array_equal(np.sort(cases["legacy (cos_sim + mask + topk)"]()[0]), np.sort(cases["kernel"]()[0]))
+
+    results = {}
+    for name, fn in cases.items():
+        fn()  # warm-up (and first-call buffer allocation for the kernel)
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        times.sort()
+
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        fn()
+        numpy_peak = tracemalloc.get_traced_memory()[1] - before
+        tracemalloc.stop()
+
+        results[name] = {
+            "median_ms": times[len(times) // 2] * 1000,
+            "numpy_peak_bytes": numpy_peak,
+            "torch_alloc_bytes": _torch_allocated_bytes(fn),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scoring kernel microbenchmark")
+    parser.add_argument("--n-jobs", type=int, nargs="+", default=[650, 20000, 200000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'n_jobs':>8}  {'path':<32}{'median ms':>10}{'numpy peak':>14}{'torch alloc':>14}")
+    for n in args.n_jobs:
+        for name, r in microbenchmark(n, args.dim, args.k, repeats=args.repeats).items():
+            print(f"{n:>8}  {name:<32}{r['median_ms']:>10.3f}{r['numpy_peak_bytes']:>14,}{r['torch_alloc_bytes']:>14,}")
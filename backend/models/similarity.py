@@ -0,0 +1,132 @@
+import hashlib
+import os
+import numpy as np
+import torch
+import torch.nn.functional as F
+from pathlib import Path
+
+DEFAULT_NEIGHBOURS = 20
+
+
+def blocked_topk(queries, keys, k, chunk_size=1024, normalize=True):
+    """
+    Top-k cosine neighbours of every query row among `keys`.
+
+    Scores are computed one block of queries at a time with a single matrix
+    multiply, so memory stays at chunk_size x N_keys whatever the number of
+    queries.
+
+    Returns (values, indices), both (N_queries, k).
+    """
+    k = min(k, keys.size(0))
+    if normalize:
+        keys = F.normalize(keys, p=2, dim=1)
+    keys_t = keys.t().contiguous()
+
+    values = torch.empty(queries.size(0), k, dtype=keys.dtype)
+    indices = torch.empty(queries.size(0), k, dtype=torch.long)
+
+    with torch.no_grad():
+        for start in range(0, queries.size(0), chunk_size):
+            end = min(start + chunk_size, queries.size(0))
+            block = queries[start:end]
+            if normalize:
+                block = F.normalize(block, p=2, dim=1)
+            sims = block @ keys_t
+            top = torch.topk(sims, k=k, dim=1)
+            values[start:end] = top.values
+            indices[start:end] = top.indices
+
+    return values, indices
+
+
+def sample_negatives(exclude, n_items, n_neg, rng=None):
+    """
+    Draw `n_neg` distinct items per row, uniformly from range(n_items),
+    avoiding the items listed in that row of `exclude` (N_rows, P).
+
+    Candidates are drawn for all rows at once; the few rows that do not get
+    enough valid draws (duplicates / excluded items) are redrawn.
+
+    Returns an int64 array (N_rows, n_neg).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    exclude = np.asarray(exclude, dtype=np.int64)
+    if exclude.ndim == 1:
+        exclude = exclude[:, None]
+    n_rows, n_excluded = exclude.shape
+
+    if n_items - n_excluded < n_neg:
+        raise ValueError(f"Cannot draw {n_neg} negatives from {n_items} items with {n_excluded} excluded per row")
+
+    out = np.empty((n_rows, n_neg), dtype=np.int64)
+    todo = np.arange(n_rows)
+    n_draw = n_neg + n_excluded + 8
+
+    while todo.size:
+        cand = rng.integers(0, n_items, size=(todo.size, n_draw))
+
+        # Duplicates within a row: keep the first occurrence only
+        order = np.argsort(cand, axis=1, kind="stable")
+        sorted_cand = np.take_along_axis(cand, order, axis=1)
+        dup_sorted = np.zeros(cand.shape, dtype=bool)
+        dup_sorted[:, 1:] = sorted_cand[:, 1:] == sorted_cand[:, :-1]
+        dup = np.empty_like(dup_sorted)
+        np.put_along_axis(dup, order, dup_sorted, axis=1)
+
+        excluded = (cand[:, :, None] == exclude[todo][:, None, :]).any(axis=2)
+        valid = ~(dup | excluded)
+
+        enough = valid.sum(axis=1) >= n_neg
+        # Stable argsort of ~valid puts valid positions first, in draw order
+        first_valid = np.argsort(~valid[enough], axis=1, kind="stable")[:, :n_neg]
+        out[todo[enough]] = np.take_along_axis(cand[enough], first_valid, axis=1)
+
+        todo = todo[~enough]
+
+    return out
+
+
+def embedding_fingerprint(emb):
+    """sha256 of an embedding matrix (shape + raw bytes), used to key caches."""
+    data = emb.detach().cpu().contiguous()
+    h = hashlib.sha256(str(tuple(data.shape)).encode("utf-8"))
+    h.update(data.numpy().tobytes())
+    return h.hexdigest()
+
+
+def item_neighbours(job_emb, m=DEFAULT_NEIGHBOURS, cache_path=None, chunk_size=1024):
+    """
+    Item-to-item table: the top-m most similar jobs of every job (itself
+    excluded), as (values, indices) tensors of shape (N_jobs, m).
+
+    Computed once with blocked_topk and cached at `cache_path`. The cache is
+    keyed by the embedding fingerprint and m, so a new catalog or a larger m
+    triggers a rebuild.
+    """
+    fingerprint = embedding_fingerprint(job_emb)
+    cache_path = Path(cache_path) if cache_path is not None else None
+
+    if cache_path is not None and cache_path.exists():
+        cached = torch.load(cache_path)
+        if cached.get("fingerprint") == fingerprint and cached.get("m", 0) >= m:
+            return cached["values"][:, :m], cached["indices"][:, :m]
+
+    n = job_emb.size(0)
+    m = min(m, n - 1)
+    values, indices = blocked_topk(job_emb, job_emb, k=m + 1, chunk_size=chunk_size)
+
+    # Drop each job from its own list; if it is not there (duplicate
+    # embeddings), drop the last column instead.
+    keep = indices != torch.arange(n).unsqueeze(1)
+    keep[keep.all(dim=1), -1] = False
+    values = values[keep].view(n, m)
+    indices = indices[keep].view(n, m)
+
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+        torch.save({"fingerprint": fingerprint, "m": m, "values": values, "indices": indices}, tmp_path)
+        os.replace(tmp_path, cache_path)
+
+    return values, indices
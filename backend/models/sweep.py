@@ -0,0 +1,268 @@
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+import torch.optim as optim
+
+# Add parent directory to path to allow imports if needed
+sys.path.append(str(Path(__file__).parent.parent))
+from evaluation import EvaluationHarness
+from models.classifier import RecSysClassifier
+from models.training import (
+    FastInteractionLoader,
+    assemble_training_data,
+    evaluate,
+    get_st_model,
+    load_training_frames,
+    train_one_epoch,
+)
+
+root = Path(__file__).parent
+results_dir = root.parent.parent / "results" / "sweep"
+results_path = results_dir / "sweep_results.csv"
+
+# Search space
+GRID = {
+    "lr": [1e-4, 3e-4, 1e-3, 3e-3],
+    "batch_size": [32, 128, 512],
+    "hidden_dim": [64, 128, 256],
+    "hidden_dim2": [32, 64],
+    "dropout": [0.0, 0.2, 0.4],
+    "hybrid_weight": [0.05, 0.2, 0.5],
+}
+
+RESULT_COLUMNS = [
+    "trial", "status", "lr", "batch_size", "hidden_dim", "hidden_dim2", "dropout", "hybrid_weight",
+    "epochs_run", "val_loss", "val_acc", "ndcg@10", "train_time_s",
+]
+
+# Per-process state, set by _init_worker
+_data = None
+
+
+def grid_trials(grid=GRID):
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def random_trials(n_trials, grid=GRID, seed=0):
+    """Random search: lr is log-uniform over the grid range, the rest sampled from the grid."""
+    rng = random.Random(seed)
+    lo, hi = np.log10(min(grid["lr"])), np.log10(max(grid["lr"]))
+    trials = []
+    for _ in range(n_trials):
+        trial = {k: rng.choice(v) for k, v in grid.items()}
+        trial["lr"] = float(10 ** rng.uniform(lo, hi))
+        trials.append(trial)
+    return trials
+
+
+def _init_worker(num_threads, data_path):
+    """Pin torch threads and load the shared dataset once per process."""
+    global _data
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Already set in this process
+        pass
+    _data = torch.load(data_path)
+
+
+def hybrid_ndcg(model, features, pairs, labels, hybrid_weight, k=10):
+    """
+    NDCG@k of the hybrid score (cosine blended with the classifier, as in
+    serving) when ranking each validation user's interactions. Users with
+    no like in the validation set are skipped: they score 0 whatever the
+    ranking.
+    """
+    model.eval()
+    with torch.no_grad():
+        inputs = features[pairs].view(len(pairs), -1)
+        mlp_scores = model(inputs).squeeze(1)
+        u = F.normalize(features[pairs[:, 0]], p=2, dim=1)
+        j = F.normalize(features[pairs[:, 1]], p=2, dim=1)
+        cosine_scores = (u * j).sum(dim=1)
+        scores = (1 - hybrid_weight) * cosine_scores + hybrid_weight * mlp_scores
+
+    users = pairs[:, 0].numpy()
+    scores = scores.numpy()
+    liked = labels.squeeze(1).numpy() > 0.5
+    items = np.arange(len(pairs))
+
+    predictions = {}
+    ground_truth = {}
+    order = np.lexsort((-scores, users))
+    for user, group in itertools.groupby(order, key=lambda i: users[i]):
+        group = list(group)
+        predictions[user] = items[group].tolist()
+        ground_truth[user] = items[group][liked[group]].tolist()
+
+    harness = EvaluationHarness(k=k)
+    scored = [u for u in predictions if ground_truth[u]]
+    return float(np.mean([
+        harness.calculate_ndcg(predictions[u], ground_truth[u]) for u in scored
+    ])) if scored else 0.0
+
+
+def run_trial(trial_id, params, epochs, patience, warmup_epochs, shared_losses, lock, seed=42):
+    """
+    Train one configuration. Stops early when the validation loss has not
+    improved for `patience` epochs, and prunes the trial when, after
+    `warmup_epochs`, its loss is worse than the median of the other trials
+    at the same epoch.
+    """
+    features, pairs, y = _data["features"], _data["pairs"], _data["y"]
+    train_idx, val_idx = _data["train_idx"], _data["val_idx"]
+
+    torch.manual_seed(seed)
+    generator = torch.Generator().manual_seed(seed)
+    train_loader = FastInteractionLoader(features, pairs[train_idx], y[train_idx],
+                                         batch_size=params["batch_size"], shuffle=True, generator=generator)
+    val_loader = FastInteractionLoader(features, pairs[val_idx], y[val_idx])
+
+    model = RecSysClassifier(
+        input_dim=features.size(1) * 2,
+        hidden_dim=params["hidden_dim"],
+        hidden_dim2=params["hidden_dim2"],
+        dropout=params["dropout"],
+    )
+    criterion = nn.BCELoss()
+    optimizer = optim.Adam(model.parameters(), lr=params["lr"])
+
+    best_loss = float("inf")
+    best_acc = 0.0
+    best_state = None
+    bad_epochs = 0
+    epochs_run = 0
+    status = "complete"
+    start = time.perf_counter()
+
+    for epoch in range(epochs):
+        train_one_epoch(model, train_loader, criterion, optimizer)
+        epochs_run = epoch + 1
+        val_loss, acc = evaluate(model, val_loader, criterion)
+
+        if val_loss < best_loss:
+            best_loss, best_acc, bad_epochs = val_loss, acc, 0
+            best_state = {k: v.clone() for k, v in model.state_dict().items()}
+        else:
+            bad_epochs += 1
+
+        with lock:
+            others = list(shared_losses.get(epoch, []))
+            shared_losses[epoch] = others + [val_loss]
+
+        if bad_epochs >= patience:
+            status = "early_stopped"
+            break
+        if epoch + 1 >= warmup_epochs and len(others) >= 2 and val_loss > statistics.median(others):
+            status = "pruned"
+            break
+
+    train_time = time.perf_counter() - start
+    if best_state is not None:
+        model.load_state_dict(best_state)
+    ndcg = hybrid_ndcg(model, features, pairs[val_idx], y[val_idx], params["hybrid_weight"])
+
+    return {
+        "trial": trial_id,
+        "status": status,
+        **params,
+        "epochs_run": epochs_run,
+        "val_loss": round(best_loss, 5),
+        "val_acc": round(best_acc, 5),
+        "ndcg@10": round(ndcg, 5),
+        "train_time_s": round(train_time, 3),
+    }
+
+
+def prepare_data(data_path, seed=42):
+    """Assemble the training tensors once and save them for the workers."""
+    interactions, users, jobs, job_emb = load_training_frames()
+    encoder = get_st_model()
+    if encoder is None:
+        raise RuntimeError("SentenceTransformer is not available")
+    data = assemble_training_data(interactions, users, jobs, job_emb, encoder)
+    if data is None:
+        raise RuntimeError("No valid training samples")
+    features, pairs, y = data
+
+    # One fixed split so every trial is compared on the same validation set
+    indices = torch.from_numpy(np.random.default_rng(seed).permutation(len(y)))
+    split = int(np.floor(0.2 * len(y)))
+    torch.save({
+        "features": features, "pairs": pairs, "y": y,
+        "train_idx": indices[split:], "val_idx": indices[:split],
+    }, data_path)
+
+
+def run_sweep(trials, epochs=20, workers=None, threads_per_worker=1, patience=3, warmup_epochs=3, out_path=results_path):
+    workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+    print(f"Running {len(trials)} trials on {workers} processes x {threads_per_worker} torch threads")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = Path(tmp) / "sweep_data.pt"
+        prepare_data(data_path)
+
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Manager() as manager:
+            shared_losses = manager.dict()
+            lock = manager.Lock()
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                     initializer=_init_worker, initargs=(threads_per_worker, data_path)) as pool:
+                futures = [
+                    pool.submit(run_trial, i, params, epochs, patience, warmup_epochs, shared_losses, lock)
+                    for i, params in enumerate(trials)
+                ]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    print(f"[trial {result['trial']}] {result['status']} val_loss={result['val_loss']:.4f} "
+                          f"acc={result['val_acc']:.3f} ndcg={result['ndcg@10']:.3f} ({result['train_time_s']:.1f}s)")
+
+    results.sort(key=lambda r: r["val_loss"])
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(results)
+
+    print(f"\nResults saved to {out_path}")
+    print("Best trials:")
+    for r in results[:5]:
+        print("  " + ", ".join(f"{c}={r[c]}" for c in RESULT_COLUMNS))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep for RecSysClassifier")
+    parser.add_argument("--mode", choices=["grid", "random"], default="random")
+    parser.add_argument("--trials", type=int, default=20, help="Number of trials for random search")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: cpu_count / threads)")
+    parser.add_argument("--threads", type=int, default=1, help="Torch threads per process")
+    parser.add_argument("--patience", type=int, default=3)
+    parser.add_argument("--warmup-epochs", type=int, default=3, help="Epochs before median pruning kicks in")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=results_path)
+    args = parser.parse_args()
+
+    trials = grid_trials() if args.mode == "grid" else random_trials(args.trials, seed=args.seed)
+    run_sweep(trials, epochs=args.epochs, workers=args.workers, threads_per_worker=args.threads,
+              patience=args.patience, warmup_epochs=args.warmup_epochs, out_path=args.out)
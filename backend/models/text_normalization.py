@@ -0,0 +1,145 @@
+import re
+import time
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+root = Path(__file__).parent
+processed_dir = root.parent / "Processed"
+
+# Non-ASCII runs are replaced by a space, the other ASCII separators that
+# str.split() knows about become spaces, then runs of spaces collapse to one.
+# Matching only runs of 2+ spaces keeps the regex engine off ordinary text.
+NON_ASCII_PATTERN = r"[^\x00-\x7F]+"
+SEPARATOR_PATTERN = r"[\t\n\x0b\x0c\r\x1c-\x1f]"
+MULTI_SPACE_PATTERN = r"  +"
+
+
+# -------------------------
+# Row-wise reference versions (kept for regression tests / timing)
+# -------------------------
+def clean_text(x):
+    if pd.isna(x):
+        return ""
+    x = str(x)
+    x = x.replace("\n", " ").replace("\r", " ")
+    x = re.sub(r"[^\x00-\x7F]+", " ", x)  # remove weird chars
+    x = " ".join(x.split())              # remove multi spaces
+    return x
+
+
+def extract_min_experience(exp_str):
+    """Extract minimum years from 'X to Z Years' format."""
+    if pd.isna(exp_str):
+        return None
+    try:
+        exp_str = str(exp_str).strip()
+        # parse "X to Z Years"
+        parts = exp_str.split(" to ")
+        if len(parts) >= 1:
+            min_years = int(parts[0].strip())
+            return min_years
+    except Exception:
+        pass
+    return None
+
+
+def build_profile(row):
+    return (
+        f"gender {row.Gender}, age {row.Age}, "
+        f"major {row.Major}, interested domain {row.InterestedDomain}, "
+        f"projects {row.Projects}, "
+        f"skills python {row.PythonSkill}, sql {row.SqlSkill}, java {row.JavaSkill}."
+    )
+
+
+# -------------------------
+# Vectorized versions (used by the data pipeline)
+# -------------------------
+def _as_text(col):
+    """
+    str() every cell of a column, like an f-string would (NaN -> 'nan').
+    """
+    values = col.to_numpy(dtype=object).astype(str)
+    return pd.Series(values, index=col.index, dtype="str")
+
+
+def clean_text_series(col):
+    """
+    Vectorized clean_text: same output, computed with pandas string kernels.
+    """
+    text = col.fillna("")
+    if text.dtype != "str":
+        text = _as_text(text)
+    text = text.str.replace(NON_ASCII_PATTERN, " ", regex=True)
+    text = text.str.replace(SEPARATOR_PATTERN, " ", regex=True)
+    text = text.str.replace(MULTI_SPACE_PATTERN, " ", regex=True)
+    return text.str.strip(" ")
+
+
+def extract_min_experience_series(col):
+    """
+    Vectorized extract_min_experience.
+    Returns a float Series (NaN where the minimum could not be parsed).
+    """
+    text = col.astype("str").str.strip()
+    first = text.str.split(" to ", n=1).str[0].str.strip()
+    valid = first.str.fullmatch(r"[+-]?\d+").fillna(False).astype(bool)
+    return pd.to_numeric(first.where(valid), errors="coerce").astype("float64")
+
+
+def build_profile_series(students):
+    """
+    Vectorized build_profile over the renamed students DataFrame.
+    """
+    return (
+        "gender " + _as_text(students["Gender"])
+        + ", age " + _as_text(students["Age"])
+        + ", major " + _as_text(students["Major"])
+        + ", interested domain " + _as_text(students["InterestedDomain"])
+        + ", projects " + _as_text(students["Projects"])
+        + ", skills python " + _as_text(students["PythonSkill"])
+        + ", sql " + _as_text(students["SqlSkill"])
+        + ", java " + _as_text(students["JavaSkill"])
+        + "."
+    )
+
+
+def clean_columns(df, cols):
+    """
+    Apply clean_text_series in place to the given columns (if present).
+    """
+    for col in cols:
+        if col in df.columns:
+            df[col] = clean_text_series(df[col])
+    return df
+
+
+if __name__ == "__main__":
+    # Timing comparison on the full jobs file: row-wise .apply vs vectorized.
+    jobs = pd.read_parquet(processed_dir / "jobs.parquet")
+    text_cols = [
+        "job description", "benefits", "skills", "responsibilities",
+        "company profile", "job title", "role",
+    ]
+    text_cols = [c for c in text_cols if c in jobs.columns]
+    print(f"jobs.parquet: {len(jobs)} rows, {len(text_cols)} text columns")
+
+    start = time.perf_counter()
+    legacy = {c: jobs[c].apply(clean_text) for c in text_cols}
+    legacy_exp = jobs["experience"].apply(extract_min_experience)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = {c: clean_text_series(jobs[c]) for c in text_cols}
+    vectorized_exp = extract_min_experience_series(jobs["experience"])
+    vectorized_time = time.perf_counter() - start
+
+    same = all((legacy[c].astype(object) == vectorized[c].astype(object)).all() for c in text_cols)
+    same = same and np.allclose(
+        legacy_exp.astype("float64"), vectorized_exp, equal_nan=True
+    )
+    print(f"row-wise   : {legacy_time * 1000:.1f} ms")
+    print(f"vectorized : {vectorized_time * 1000:.1f} ms")
+    print(f"speedup    : {legacy_time / max(vectorized_time, 1e-9):.1f}x")
+    print(f"identical  : {same}")
@@ -6,12 +6,19 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from sentence_transformers import SentenceTransformer
-from torch.utils.data import Dataset, DataLoader
 import sys
 import os
+import time
+import random
+import argparse
+from contextlib import contextmanager
 
 # Add parent directory to path to allow imports if needed
 sys.path.append(str(Path(__file__).parent.parent))
+from models.classifier import RecSysClassifier, architecture_of
+from models.data_source import high_water_mark, load_interactions, load_users
+from models.registry import ModelRegistry
+from models.similarity import embedding_fingerprint
 
 # Define paths
 root = Path(__file__).parent
@@ -20,54 +27,80 @@ interactions_path = processed_dir / "interactions_export.csv" # "interactions_ex
 users_path = processed_dir / "users_export.csv"
 jobs_path = processed_dir / "jobs.parquet"
 job_emb_path = processed_dir / "job_embeddings.pt"
-model_save_path = root / "classifier.pt"
-
-# Load SentenceTransformer for user embeddings
-try:
-    st_model = SentenceTransformer("all-MiniLM-L6-v2")
-except Exception as e:
-    print(f"Error loading SentenceTransformer: {e}")
-    st_model = None
-
-class RecSysClassifier(nn.Module):
-    def __init__(self, input_dim=768, hidden_dim=128):
-        super(RecSysClassifier, self).__init__()
-        self.fc1 = nn.Linear(input_dim, hidden_dim)
-        self.relu = nn.ReLU()
-        self.dropout = nn.Dropout(0.2)
-        self.fc2 = nn.Linear(hidden_dim, 64)
-        self.fc3 = nn.Linear(64, 1)
-        self.sigmoid = nn.Sigmoid()
-
-    def forward(self, x):
-        x = self.fc1(x)
-        x = self.relu(x)
-        x = self.dropout(x)
-        x = self.fc2(x)
-        x = self.relu(x)
-        x = self.fc3(x)
-        return self.sigmoid(x)
-
-class InteractionDataset(Dataset):
-    def __init__(self, user_embeddings, job_embeddings, labels):
-        self.user_embeddings = user_embeddings
-        self.job_embeddings = job_embeddings
+checkpoint_path = root / "checkpoints" / "last.pt"
+
+# SentenceTransformer for user embeddings, loaded on first use
+st_model = None
+
+def get_st_model():
+    global st_model
+    if st_model is None:
+        try:
+            st_model = SentenceTransformer("all-MiniLM-L6-v2")
+        except Exception as e:
+            print(f"Error loading SentenceTransformer: {e}")
+    return st_model
+
+@contextmanager
+def timed(phase, timings):
+    """Record the wall-clock time of a phase into `timings` (seconds)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = time.perf_counter() - start
+
+def print_timings(timings):
+    """Print the phase timings recorded so far (also on early exits)."""
+    if not timings:
+        return
+    print("Phase timings:")
+    for phase, seconds in timings.items():
+        print(f"  {phase:<13}: {seconds:.3f}s")
+
+class FastInteractionLoader:
+    """
+    In-memory replacement for DataLoader over (user, job, label) samples.
+
+    `features` holds the user embeddings followed by the job embeddings, and
+    each sample is a pair of row indices into it, so memory grows with
+    n_users + n_jobs instead of n_interactions x 768. Every batch, shuffled
+    or not, is gathered by index (features[pairs]) into a new (B, 2, dim)
+    tensor and viewed as the (B, 2 * dim) classifier input, with no
+    per-item collation or torch.cat. Large batches (the default 1024) keep
+    that per-step cost small.
+    """
+    def __init__(self, features, pairs, labels, batch_size=1024, shuffle=False, generator=None):
+        self.features = features
+        self.pairs = pairs
         self.labels = labels
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.generator = generator
 
     def __len__(self):
-        return len(self.labels)
+        return (len(self.labels) + self.batch_size - 1) // self.batch_size
 
-    def __getitem__(self, idx):
-        return (
-            self.user_embeddings[idx],
-            self.job_embeddings[idx],
-            self.labels[idx]
-        )
+    def __iter__(self):
+        n = len(self.labels)
+        # One permutation per epoch
+        order = torch.randperm(n, generator=self.generator) if self.shuffle else None
+        for start in range(0, n, self.batch_size):
+            end = min(start + self.batch_size, n)
+            if order is None:
+                pairs = self.pairs[start:end]
+                labels = self.labels[start:end]
+            else:
+                batch = order[start:end]
+                pairs = self.pairs[batch]
+                labels = self.labels[batch]
+            inputs = self.features[pairs].view(end - start, -1)
+            yield inputs, labels
 
 def build_user_profile_text(row):
     # Construct profile text similar to data_pipeline_new.py
     # Adjust column names based on users_export.csv
-    # users_export.csv columns: id, email, username, role, name, gender, interested_domain, age, projects, future_career, Python_Level, SQL_Level, Java_Level
+    # users_export.csv columns: id, email, password, role, name, gender, interested_domain, age, projects, future_career, python_level, sql_level, java_level, resume_content
     
     # Handle potential missing values
     def safe_str(val):
@@ -77,173 +110,338 @@ def build_user_profile_text(row):
         f"gender {safe_str(row.get('gender', ''))}, age {safe_str(row.get('age', ''))}, "
         f"interested domain {safe_str(row.get('interested_domain', ''))}, "
         f"projects {safe_str(row.get('projects', ''))}, "
-        f"skills python {safe_str(row.get('Python_Level', ''))}, sql {safe_str(row.get('SQL_Level', ''))}, java {safe_str(row.get('Java_Level', ''))}."
+        f"skills python {safe_str(row.get('python_level', ''))}, sql {safe_str(row.get('sql_level', ''))}, java {safe_str(row.get('java_level', ''))}."
     )
 
-def train_model(epochs=20, batch_size=32, lr=0.001):
-    print("Loading data...")
-    
-    # Load Data
-    try:
-        try:
-            interactions = pd.read_csv(interactions_path, encoding='utf-8')
-        except UnicodeDecodeError:
-            print("Warning: interactions.csv not UTF-8, trying latin1")
-            interactions = pd.read_csv(interactions_path, encoding='latin1')
-            
-        try:
-            users = pd.read_csv(users_path, encoding='utf-8')
-        except UnicodeDecodeError:
-            print("Warning: users.csv not UTF-8, trying latin1")
-            users = pd.read_csv(users_path, encoding='latin1')
+def assemble_training_data(interactions, users, jobs, job_emb, encoder, timings=None):
+    """
+    Build the training tensors from raw interactions.
 
-        jobs = pd.read_parquet(jobs_path)
-        job_emb = torch.load(job_emb_path)
-    except Exception as e:
-        print(f"Error loading files: {e}")
-        return
+    All user profile texts are encoded in one batched call and interactions
+    are joined to user / job row positions with Index.get_indexer.
 
-    print(f"Interactions: {len(interactions)}")
-    print(f"Users: {len(users)}")
-    print(f"Jobs: {len(jobs)}")
+    Returns (features, pairs, y) for FastInteractionLoader, or None if no
+    interaction could be matched:
+      - features: (n_users + n_jobs, dim) user embeddings then job embeddings
+      - pairs: (n_samples, 2) row indices of the user and the job in features
+      - y: (n_samples, 1) labels
+    """
+    timings = timings if timings is not None else {}
 
-    # Filter interactions
     # Keep only 'like' (1) and 'pass' (0)
-    interactions = interactions[interactions['action'].isin(['like', 'pass'])].copy()
-    interactions['label'] = interactions['action'].apply(lambda x: 1.0 if x == 'like' else 0.0)
-    
+    interactions = interactions[interactions['action'].isin(['like', 'pass'])]
+    labels = (interactions['action'] == 'like').to_numpy(dtype=np.float32)
+
     print(f"Filtered Interactions: {len(interactions)}")
-    print(interactions['label'].value_counts())
+    print(pd.Series(labels).value_counts())
 
-    # Generate User Embeddings
+    # Generate User Embeddings (one batched encode)
     print("Generating user embeddings...")
-    user_emb_map = {}
-    
-    # Ensure users have 'id' column matching interactions 'user_id'
-    # users_export.csv has 'id'
-    
-    for idx, row in users.iterrows():
-        uid = row['id']
-        text = build_user_profile_text(row)
-        emb = st_model.encode(text, convert_to_tensor=True)
-        user_emb_map[uid] = emb
-
-    # Prepare Training Data
-    X_user = []
-    X_job = []
-    y = []
-
-    # Map job_id to embedding index
-    # jobs.parquet index is likely the job_id if it was saved that way, or we need to look it up
-    # base_model.py loads job_emb which corresponds to jobs_sample.parquet (or jobs.parquet)
-    # We assume job_emb aligns with jobs DataFrame index or order
-    
-    # Let's verify job alignment. 
-    # If job_emb was created from jobs.parquet, then index i in job_emb corresponds to row i in jobs.
-    # We need to map job_id from interactions to this index.
-    
-    # Create a mapping from job_id (in dataframe) to index (0..N)
-    # jobs dataframe might have 'jobid' column or be indexed by it.
-    
-    job_id_to_idx = {}
-    if 'jobid' in jobs.columns:
-        for idx, jid in enumerate(jobs['jobid']):
-            job_id_to_idx[jid] = idx
-    else:
-        # Assume index is jobid
-        for idx in range(len(jobs)):
-            job_id_to_idx[jobs.index[idx]] = idx
-
-    valid_samples = 0
-    for idx, row in interactions.iterrows():
-        uid = row['user_id']
-        jid = row['item_id'] # interactions.csv has 'item_id' for job
-        label = row['label']
-
-        if uid in user_emb_map and jid in job_id_to_idx:
-            job_idx = job_id_to_idx[jid]
-            if job_idx < len(job_emb):
-                X_user.append(user_emb_map[uid])
-                X_job.append(job_emb[job_idx])
-                y.append(label)
-                valid_samples += 1
+    with timed("encode_users", timings):
+        texts = [build_user_profile_text(row) for _, row in users.iterrows()]
+        user_emb = encoder.encode(texts, convert_to_tensor=True, show_progress_bar=False).cpu()
+
+    # Map user_id / item_id to row positions in users / job_emb.
+    # users_export.csv has 'id'; job_emb is aligned with the jobs rows, keyed
+    # by the 'jobid' column or the index.
+    with timed("join", timings):
+        user_index = pd.Index(users['id'])
+        if 'jobid' in jobs.columns:
+            job_index = pd.Index(jobs['jobid'])
+        else:
+            job_index = jobs.index
 
+        user_pos = user_index.get_indexer(interactions['user_id'])
+        job_pos = job_index.get_indexer(interactions['item_id'])
+        valid = (user_pos >= 0) & (job_pos >= 0) & (job_pos < len(job_emb))
+
+    valid_samples = int(valid.sum())
     print(f"Valid training samples: {valid_samples}")
 
     if valid_samples == 0:
         print("No valid samples found. Check ID matching.")
+        return None
+
+    with timed("gather", timings):
+        features = torch.cat((user_emb, job_emb.cpu()), dim=0)
+        pairs = torch.stack((
+            torch.from_numpy(user_pos[valid]),
+            torch.from_numpy(job_pos[valid]) + len(user_emb),
+        ), dim=1)
+        y = torch.from_numpy(labels[valid]).unsqueeze(1)
+
+    return features, pairs, y
+
+def load_training_frames(source="csv", db_url=None):
+    """
+    Load (interactions, users, jobs, job_emb). Interactions and users come
+    from the Processed CSV exports (source="csv") or from the database
+    (source="db"), through the parquet cache of models/data_source.py
+    that only fetches the interactions added since the previous run.
+    """
+    interactions = load_interactions(source, db_url, csv_path=interactions_path)
+    users = load_users(source, db_url, csv_path=users_path)
+
+    jobs = pd.read_parquet(jobs_path)
+    job_emb = torch.load(job_emb_path)
+    return interactions, users, jobs, job_emb
+
+def train_one_epoch(model, loader, criterion, optimizer):
+    """One pass over `loader`; returns the mean training loss."""
+    model.train()
+    running_loss = 0.0
+    n = 0
+    for inputs, labels in loader:
+        optimizer.zero_grad()
+        outputs = model(inputs)
+        loss = criterion(outputs, labels)
+        loss.backward()
+        optimizer.step()
+
+        running_loss += loss.item() * inputs.size(0)
+        n += inputs.size(0)
+    return running_loss / max(n, 1)
+
+def evaluate(model, loader, criterion):
+    """Returns (mean loss, accuracy at 0.5) of `model` over `loader`."""
+    model.eval()
+    val_loss = 0.0
+    correct = 0
+    total = 0
+    with torch.no_grad():
+        for inputs, labels in loader:
+            outputs = model(inputs)
+            loss = criterion(outputs, labels)
+            val_loss += loss.item() * inputs.size(0)
+
+            predicted = (outputs > 0.5).float()
+            total += labels.size(0)
+            correct += (predicted == labels).sum().item()
+    return val_loss / max(total, 1), correct / max(total, 1)
+
+def save_checkpoint(path, state):
+    """Write a training checkpoint atomically (tmp file + rename)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    torch.save(state, tmp_path)
+    os.replace(tmp_path, path)
+
+def _rng_state(generator):
+    return {
+        "torch": torch.get_rng_state(),
+        "numpy": np.random.get_state(),
+        "python": random.getstate(),
+        "loader": generator.get_state(),
+    }
+
+def _set_rng_state(state, generator):
+    torch.set_rng_state(state["torch"])
+    np.random.set_state(state["numpy"])
+    random.setstate(state["python"])
+    generator.set_state(state["loader"])
+
+def train_model(epochs=20, batch_size=1024, lr=0.001, patience=5, seed=42, resume=False, checkpoint=checkpoint_path,
+                activate=True, source="csv", db_url=None):
+    """
+    Train the classifier and register the best weights (lowest val loss) as
+    a new version in the model registry, activated unless activate=False.
+
+    A full checkpoint (model, optimizer, RNG states, epoch, best loss and
+    the train/val split) is written after every epoch, so `resume=True`
+    continues an interrupted run exactly where it stopped. It is refused if
+    the training samples changed, and does nothing if the run already
+    finished and was registered. Training stops
+    early after `patience` epochs without val loss improvement.
+    source="db" reads interactions and users from the database (db_url,
+    default DATABASE_URL) instead of the CSV exports.
+    """
+    timings = {}
+    print("Loading data...")
+
+    # Load Data
+    try:
+        with timed("load", timings):
+            interactions, users, jobs, job_emb = load_training_frames(source, db_url)
+    except Exception as e:
+        print(f"Error loading files: {e}")
+        print_timings(timings)
         return
 
-    X_user = torch.stack(X_user)
-    X_job = torch.stack(X_job)
-    y = torch.tensor(y, dtype=torch.float32).unsqueeze(1)
+    print(f"Interactions: {len(interactions)}")
+    print(f"Users: {len(users)}")
+    print(f"Jobs: {len(jobs)}")
+
+    encoder = get_st_model()
+    if encoder is None:
+        print_timings(timings)
+        return
 
-    # Split Train/Val
+    data = assemble_training_data(interactions, users, jobs, job_emb, encoder, timings)
+    if data is None:
+        print_timings(timings)
+        return
+    features, pairs, y = data
     dataset_size = len(y)
-    indices = list(range(dataset_size))
-    split = int(np.floor(0.2 * dataset_size))
-    np.random.shuffle(indices)
-    train_indices, val_indices = indices[split:], indices[:split]
+    # The stored train/val split is only valid on the very same samples
+    data_fingerprint = f"{embedding_fingerprint(pairs)}:{embedding_fingerprint(y)}"
+
+    state = None
+    if resume:
+        if Path(checkpoint).exists():
+            state = torch.load(checkpoint, weights_only=False)
+            if state.get("data_fingerprint") != data_fingerprint:
+                print(f"Checkpoint was made on different training data ({state['dataset_size']} samples, "
+                      f"data now has {dataset_size}). Start a fresh run instead of --resume.")
+                print_timings(timings)
+                return
+            finished = state["bad_epochs"] >= patience or state["epoch"] + 1 >= epochs
+            if finished and state.get("version"):
+                print(f"The run in {checkpoint} already finished and was registered as {state['version']}.")
+                print_timings(timings)
+                return
+            seed, batch_size, lr = state["seed"], state["batch_size"], state["lr"]
+            print(f"Resuming from {checkpoint} after epoch {state['epoch'] + 1}")
+        else:
+            print(f"No checkpoint at {checkpoint}, starting a fresh run.")
 
-    train_dataset = InteractionDataset(X_user[train_indices], X_job[train_indices], y[train_indices])
-    val_dataset = InteractionDataset(X_user[val_indices], X_job[val_indices], y[val_indices])
+    # Best weights so far, next to the checkpoint (registered at the end)
+    best_model_path = Path(checkpoint).with_name("best.pt")
 
-    train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
-    val_loader = DataLoader(val_dataset, batch_size=batch_size)
+    generator = torch.Generator()
+    if state is None:
+        best_model_path.unlink(missing_ok=True)
+        torch.manual_seed(seed)
+        np.random.seed(seed)
+        random.seed(seed)
+        generator.manual_seed(seed)
+
+        # Split Train/Val
+        indices = torch.from_numpy(np.random.default_rng(seed).permutation(dataset_size))
+        split = int(np.floor(0.2 * dataset_size))
+        train_indices, val_indices = indices[split:], indices[:split]
+    else:
+        train_indices, val_indices = state["train_indices"], state["val_indices"]
+
+    train_loader = FastInteractionLoader(features, pairs[train_indices], y[train_indices],
+                                         batch_size=batch_size, shuffle=True, generator=generator)
+    val_loader = FastInteractionLoader(features, pairs[val_indices], y[val_indices])
 
     # Initialize Model
     model = RecSysClassifier()
     criterion = nn.BCELoss()
     optimizer = optim.Adam(model.parameters(), lr=lr)
 
+    start_epoch = 0
+    best_loss = float('inf')
+    best_acc = 0.0
+    bad_epochs = 0
+    if state is not None:
+        model.load_state_dict(state["model"])
+        optimizer.load_state_dict(state["optimizer"])
+        _set_rng_state(state["rng"], generator)
+        start_epoch = state["epoch"] + 1
+        best_loss = state["best_loss"]
+        best_acc = state.get("best_acc", 0.0)
+        bad_epochs = state["bad_epochs"]
+
     # Training Loop
     print("Starting training...")
-    best_loss = float('inf')
-    
-    for epoch in range(epochs):
-        model.train()
-        running_loss = 0.0
-        for u_emb, j_emb, labels in train_loader:
-            # Concatenate user and job embeddings
-            inputs = torch.cat((u_emb, j_emb), dim=1)
-            
-            optimizer.zero_grad()
-            outputs = model(inputs)
-            loss = criterion(outputs, labels)
-            loss.backward()
-            optimizer.step()
-            
-            running_loss += loss.item() * inputs.size(0)
-        
-        epoch_loss = running_loss / len(train_dataset)
-        
+    train_start = time.perf_counter()
+    epochs_run = start_epoch
+    last_state = state
+
+    for epoch in range(start_epoch, epochs):
+        if bad_epochs >= patience:
+            break
+
+        epoch_loss = train_one_epoch(model, train_loader, criterion, optimizer)
+        epochs_run = epoch + 1
+
         # Validation
-        model.eval()
-        val_loss = 0.0
-        correct = 0
-        total = 0
-        with torch.no_grad():
-            for u_emb, j_emb, labels in val_loader:
-                inputs = torch.cat((u_emb, j_emb), dim=1)
-                outputs = model(inputs)
-                loss = criterion(outputs, labels)
-                val_loss += loss.item() * inputs.size(0)
-                
-                predicted = (outputs > 0.5).float()
-                total += labels.size(0)
-                correct += (predicted == labels).sum().item()
-
-        val_loss = val_loss / len(val_dataset)
-        acc = correct / total
-        
+        val_loss, acc = evaluate(model, val_loader, criterion)
+
         print(f"Epoch {epoch+1}/{epochs} - Train Loss: {epoch_loss:.4f} - Val Loss: {val_loss:.4f} - Val Acc: {acc:.4f}")
 
         if val_loss < best_loss:
             best_loss = val_loss
-            torch.save(model.state_dict(), model_save_path)
+            best_acc = acc
+            bad_epochs = 0
+            save_checkpoint(best_model_path, model.state_dict())
             print("  Saved best model.")
+        else:
+            bad_epochs += 1
+
+        last_state = {
+            "epoch": epoch,
+            "model": model.state_dict(),
+            "optimizer": optimizer.state_dict(),
+            "rng": _rng_state(generator),
+            "best_loss": best_loss,
+            "best_acc": best_acc,
+            "bad_epochs": bad_epochs,
+            "train_indices": train_indices,
+            "val_indices": val_indices,
+            "dataset_size": dataset_size,
+            "data_fingerprint": data_fingerprint,
+            "seed": seed,
+            "batch_size": batch_size,
+            "lr": lr,
+        }
+        save_checkpoint(checkpoint, last_state)
+
+        if bad_epochs >= patience:
+            print(f"Early stopping: no improvement for {patience} epochs.")
+            break
+
+    timings["train"] = time.perf_counter() - train_start
+
+    print("Training complete.")
+    if not best_model_path.exists():
+        print(f"No best weights at {best_model_path}, nothing to register.")
+        print_timings(timings)
+        return
 
-    print(f"Training complete. Model saved to {model_save_path}")
+    # Where the samples came from: the CSV export, or the database up to
+    # the cache's high-water mark
+    if source == "db":
+        data_source = {"source": "db", "high_water_mark": high_water_mark()}
+    else:
+        data_source = {"source": "csv", "interactions": interactions_path.name}
+
+    # Register the best weights; the registry also exports them for CPU
+    # serving (TorchScript / ONNX, + int8)
+    with timed("register", timings):
+        version = ModelRegistry().register(
+            torch.load(best_model_path),
+            architecture_of(model),
+            job_emb,
+            metrics={"val_loss": round(best_loss, 5), "val_acc": round(best_acc, 5), "epochs_run": epochs_run},
+            training={"epochs": epochs, "batch_size": batch_size, "lr": lr, "patience": patience, "seed": seed,
+                      "n_samples": dataset_size, **data_source},
+            activate=activate,
+        )
+    print(f"Model saved as {version}")
+    # Mark the run as registered, so resuming it does not register it again
+    if last_state is not None:
+        save_checkpoint(checkpoint, {**last_state, "version": version})
+    print_timings(timings)
 
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description="Train the RecSys classifier")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--lr", type=float, default=0.001)
+    parser.add_argument("--patience", type=int, default=5, help="Epochs without val loss improvement before stopping")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint")
+    parser.add_argument("--checkpoint", type=Path, default=checkpoint_path)
+    parser.add_argument("--no-activate", action="store_true", help="Register the model without serving it")
+    parser.add_argument("--source", choices=["csv", "db"], default="csv",
+                        help="Interactions and users from the CSV exports or the database")
+    parser.add_argument("--db-url", default=None, help="SQLAlchemy URL for --source db (default: DATABASE_URL)")
+    args = parser.parse_args()
+
+    train_model(epochs=args.epochs, batch_size=args.batch_size, lr=args.lr, patience=args.patience,
+                seed=args.seed, resume=args.resume, checkpoint=args.checkpoint, activate=not args.no_activate,
+                source=args.source, db_url=args.db_url)
@@ -0,0 +1,71 @@
+import logging
+import threading
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse, PlainTextResponse
+from lib.admin import require_admin
+from lib.profiling import list_profiles, profile_path, profile_summary
+from models.artifacts import BundleError, get_bundle, reload_bundle
+
+log = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+@router.get("/artifacts")
+def current_artifacts():
+    """Describe the artifact bundle this worker is serving."""
+    bundle = get_bundle()
+    if bundle is None:
+        raise HTTPException(status_code=503, detail="No artifacts loaded")
+    return bundle.describe()
+
+
+def _reload_in_background():
+    try:
+        reload_bundle()
+    except Exception as e:
+        log.error("Artifact reload failed, keeping the current bundle: %s", e)
+
+
+@router.post("/reload", status_code=202)
+def reload_artifacts(wait: bool = False):
+    """
+    Load the catalog, embeddings and active model from disk and swap them in.
+    Requests keep being served from the current bundle while the new one
+    loads. With wait=true the call returns once the swap is done (or 422 if
+    the new bundle failed validation). Only this worker is reloaded; set
+    ARTIFACT_WATCH_INTERVAL to reload every worker on file changes.
+    """
+    if not wait:
+        threading.Thread(target=_reload_in_background, name="artifact-reload", daemon=True).start()
+        return {"status": "reloading"}
+
+    try:
+        bundle = reload_bundle()
+    except BundleError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"status": "reloaded", **bundle.describe()}
+
+
+@router.get("/profiles")
+def profiles(limit: int = 20):
+    """Most recent request profiles (see X-Profile in lib/profiling.py), newest first."""
+    return list_profiles()[:limit]
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, format: str = "prof", sort: str = "cumulative", limit: int = 40):
+    """
+    A saved profile: the raw .prof file (format=prof, for pstats or snakeviz)
+    or a pstats text report (format=text, sorted by `sort`).
+    """
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "text":
+        try:
+            return PlainTextResponse(profile_summary(path, sort=sort, limit=limit))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return FileResponse(path, media_type="application/octet-stream", filename=profile_id)
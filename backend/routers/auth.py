@@ -1,7 +1,11 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from lib import database, models, schemas
 
+log = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.post("/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
@@ -16,7 +20,7 @@ def register_user(user_create: schemas.UserCreate, db: Session = Depends(databas
     
     # Create new user
     # In a real app, you should hash the password
-    print(f"[DEBUG] Creating user: email={user_create.email}, role={user_create.role}")
+    log.debug("Creating user: role=%s", user_create.role)
     new_user = models.User(
         email=user_create.email,
         password=user_create.password, # Hashing is recommended!
@@ -26,7 +30,7 @@ def register_user(user_create: schemas.UserCreate, db: Session = Depends(databas
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
-    print(f"[DEBUG] User created: id={new_user.id}, email={new_user.email}")
+    log.info("User created: id=%s, role=%s", new_user.id, new_user.role)
     return new_user
 
 @router.post("/login", response_model=schemas.User)
@@ -1,3 +1,5 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
@@ -5,6 +7,8 @@ from lib.database import get_db
 from lib.models import Interaction
 
 
+log = logging.getLogger(__name__)
+
 router = APIRouter()
 
 class InteractionCreate(BaseModel):
@@ -45,20 +49,20 @@ def create_interaction(interaction: InteractionCreate, db: Session = Depends(get
                     # Ideally we should have the initial embedding. 
                     # For now, let's skip if no initial embedding (or maybe we can trigger a re-compute?)
                     # Let's try to re-compute if possible, or just log warning.
-                    print(f"[WARN] User {user.id} has no profile_embedding. Skipping update.")
+                    log.warning("User %s has no profile_embedding, skipping update", user.id)
                 
                 if current_emb is not None:
                     # 2. Update vector
-                    print(f"[INFO] Updating profile for User {user.id} with Job {interaction.item_id}")
+                    log.debug("Updating profile for user %s with job %s", user.id, interaction.item_id)
                     new_emb = update_user_profile_vector(current_emb, interaction.item_id, alpha=0.1)
                     
                     # 3. Save back to DB
                     user.profile_embedding = new_emb.tolist()
                     db.commit()
-                    print(f"[SUCCESS] User {user.id} profile updated.")
+                    log.info("Profile of user %s updated", user.id, extra={"job_id": interaction.item_id})
                     
         except Exception as e:
-            print(f"[ERROR] Failed to update user profile: {e}")
+            log.exception("Failed to update user profile: %s", e)
     # ----------------------------
 
     return {"status": "success", "id": db_interaction.id}
@@ -1,22 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Dict, Any
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from lib.database import get_db
 from lib.models import User, Interaction
-from models.base_model import recommend_from_text
+from lib.metrics import PROFILE_EMBEDDINGS, RECOMMENDATIONS
+from lib.profiling import profiled
+from lib.timing import timed
+from models.artifacts import get_bundle
+from models.base_model import CANDIDATE_K, FETCH_K, FINAL_K, HYBRID_WEIGHT, recommend_from_text
 from models.fairness_reranker import rerank_conditional_demographic_parity
 
+log = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.get("/recommend/{user_id}")
-def recommend(user_id: int, db: Session = Depends(get_db)) -> Dict[str, Any]:
+@profiled("recommend")
+def recommend(
+    user_id: int,
+    work_type: Optional[List[str]] = Query(None),
+    country: Optional[List[str]] = Query(None),
+    location: Optional[List[str]] = Query(None),
+    company_bucket: Optional[List[str]] = Query(None),
+    candidate_k: int = Query(CANDIDATE_K, ge=1, le=5000),
+    fetch_k: int = Query(FETCH_K, ge=1, le=1000),
+    final_k: int = Query(FINAL_K, ge=1, le=100),
+    hybrid_weight: float = Query(HYBRID_WEIGHT, ge=0.0, le=1.0),
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
     """
     Returns job recommendations for the given user_id using the trained content-based model.
+    Optional filters restrict retrieval to matching jobs (case-insensitive);
+    repeat a parameter to accept several values, e.g.
+    /recommend/1?work_type=Intern&country=France&country=Spain
+
+    The pipeline runs in stages, each sized per request (defaults from the
+    RECO_* environment variables):
+      candidates  top candidate_k jobs by cosine similarity
+      rank        classifier blended in (hybrid_weight) on those only, top fetch_k
+      rerank      fairness reranker, top final_k
+    Per-stage timings (ms) are returned in "timings_ms" and aggregated in
+    the fairmatch_stage_duration_seconds histogram of /metrics.
     """
+    timings = {}
+
     # 1. Fetch User from DB
-    user = db.query(User).filter(User.id == user_id).first()
+    with timed("db_user", timings):
+        user = db.query(User).filter(User.id == user_id).first()
     if not user:
+        RECOMMENDATIONS.inc(outcome="user_not_found")
         raise HTTPException(status_code=404, detail="User not found")
 
     # 2. Construct Profile Text (similar to training pipeline)
@@ -45,46 +80,60 @@ def recommend(user_id: int, db: Session = Depends(get_db)) -> Dict[str, Any]:
         f"java {user.java_level or 'Weak'}."
     )
     
-    print(f"[INFO] Generating recommendations for User {user_id} with profile: {profile_text[:100]}...")
+    log.debug("Generating recommendations for user %s with profile: %.100s", user_id, profile_text)
 
     # 2.5 Get Seen Jobs (Likes and Passes)
-    interactions = db.query(Interaction).filter(
-        Interaction.user_id == user_id,
-        Interaction.type == "job"
-    ).all()
-    seen_ids = [i.item_id for i in interactions]
+    with timed("db_seen", timings):
+        interactions = db.query(Interaction).filter(
+            Interaction.user_id == user_id,
+            Interaction.type == "job"
+        ).all()
+        seen_ids = [i.item_id for i in interactions]
     
-    print(f"[INFO] User {user_id} has seen {len(seen_ids)} jobs. Excluding them.")
+    log.debug("User %s has seen %d jobs, excluding them", user_id, len(seen_ids))
 
     # 3. Get Recommendations from Model
     # Check if we have a stored embedding (from online learning)
-    # Fetch larger pool for reranking
-    fetch_k = 50 
-    final_k = 10
-    
-    # Use low hybrid weight to prioritize content-based relevance
-    HYBRID_WEIGHT = 0.2
+    # Fetch larger pool (fetch_k) for reranking to final_k
+    fetch_k = max(fetch_k, final_k)
+    candidate_k = max(candidate_k, fetch_k)
+
+    # One artifact bundle for the whole request, even if a reload happens
+    bundle = get_bundle()
+
+    # Structured constraints, applied before top-k (see models/filters.py)
+    filters = {
+        "work_type": work_type,
+        "country": country,
+        "location": location,
+        "company_bucket": company_bucket,
+    }
 
     if user.profile_embedding:
         import torch
         from models.base_model import recommend_from_embedding
-        print(f"[INFO] Using stored profile embedding for User {user_id}")
+        log.debug("Using stored profile embedding for user %s", user_id)
+        PROFILE_EMBEDDINGS.inc(source="stored")
         u_emb = torch.tensor(user.profile_embedding)
-        candidates = recommend_from_embedding(u_emb, top_k=fetch_k, exclude_ids=seen_ids, hybrid_weight=HYBRID_WEIGHT)
+        candidates = recommend_from_embedding(u_emb, top_k=fetch_k, exclude_ids=seen_ids, hybrid_weight=hybrid_weight,
+                                              bundle=bundle, filters=filters, candidate_k=candidate_k, timings=timings)
     else:
         # Fallback to text-based
-        candidates, u_emb = recommend_from_text(profile_text, top_k=fetch_k, exclude_ids=seen_ids, hybrid_weight=HYBRID_WEIGHT)
+        PROFILE_EMBEDDINGS.inc(source="encoded")
+        candidates, u_emb = recommend_from_text(profile_text, top_k=fetch_k, exclude_ids=seen_ids, hybrid_weight=hybrid_weight,
+                                                bundle=bundle, filters=filters, candidate_k=candidate_k, timings=timings)
         
         # Save this initial embedding to DB so we can update it later!
         if u_emb is not None:
             try:
-                user.profile_embedding = u_emb.tolist()
-                db.commit()
-                print(f"[INFO] Initial profile embedding saved for User {user_id}")
+                with timed("db_save_embedding", timings):
+                    user.profile_embedding = u_emb.tolist()
+                    db.commit()
+                log.info("Initial profile embedding saved for user %s", user_id)
             except Exception as e:
-                print(f"[WARN] Could not save initial embedding: {e}")
+                log.warning("Could not save initial embedding for user %s: %s", user_id, e)
     
-    print(f"[INFO] Retrieved {len(candidates)} candidates. Applying Fairness Reranker...")
+    log.debug("Retrieved %d candidates, applying fairness reranker", len(candidates))
 
     # 4. Compute Exposure Counts for Fairness
     # We need to know how many times each job has been shown (or interacted with).
@@ -97,9 +146,10 @@ def recommend(user_id: int, db: Session = Depends(get_db)) -> Dict[str, Any]:
     
     # Query DB for counts
     # SELECT item_id, COUNT(*) FROM interactions WHERE item_id IN candidate_ids GROUP BY item_id
-    exposure_counts = db.query(Interaction.item_id, func.count(Interaction.id))\
-        .filter(Interaction.item_id.in_(candidate_ids))\
-        .group_by(Interaction.item_id).all()
+    with timed("db_exposure", timings):
+        exposure_counts = db.query(Interaction.item_id, func.count(Interaction.id))\
+            .filter(Interaction.item_id.in_(candidate_ids))\
+            .group_by(Interaction.item_id).all()
     
     exposure_map = {item_id: count for item_id, count in exposure_counts}
     
@@ -112,19 +162,30 @@ def recommend(user_id: int, db: Session = Depends(get_db)) -> Dict[str, Any]:
             c["company_bucket"] = "unknown"
 
     # 5. Apply Reranking
-    reranked_jobs = rerank_conditional_demographic_parity(
-        candidates,
-        k=final_k,
-        protected_attr="company_bucket",
-        coverage_weight=5.0 # Boost unseen jobs
-    )
+    with timed("rerank", timings):
+        reranked_jobs = rerank_conditional_demographic_parity(
+            candidates,
+            k=final_k,
+            protected_attr="company_bucket",
+            coverage_weight=5.0 # Boost unseen jobs
+        )
     
-    print(f"[INFO] Reranking complete. Returning top {len(reranked_jobs)} jobs.")
+    RECOMMENDATIONS.inc(outcome="ok" if reranked_jobs else "empty")
+    log.info("Recommendations served", extra={
+        "user_id": user_id,
+        "n_seen": len(seen_ids),
+        "n_candidates": len(candidates),
+        "n_returned": len(reranked_jobs),
+        "timings_ms": {stage: round(ms, 2) for stage, ms in timings.items()},
+    })
 
     response = {
         "user_id": user_id,
         "num_recommendations": len(reranked_jobs),
         "recommendations": reranked_jobs,
+        "filters": {name: values for name, values in filters.items() if values},
+        "stages": {"candidate_k": candidate_k, "fetch_k": fetch_k, "final_k": final_k, "hybrid_weight": hybrid_weight},
+        "timings_ms": {stage: round(ms, 2) for stage, ms in timings.items()},
         "note": "Generated by Content-Based Model + Fairness Reranker",
     }
     return response
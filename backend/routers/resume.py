@@ -1,14 +1,20 @@
+import logging
+
 from fastapi import APIRouter, UploadFile, Form, File, HTTPException, Depends
 from sqlalchemy.orm import Session
 import fitz  # PyMuPDF
 from lib.gemini_parser import parse_resume_with_gemini
 from lib.database import get_db
 from lib.models import User
+from lib.profiling import profiled
+
 
+log = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.post("/api/parse-resume")
+@profiled("parse_resume")
 async def parse_resume(
     file: UploadFile = File(...),
     user_id: int = Form(...),
@@ -32,7 +38,9 @@ async def parse_resume(
     # 3. AI Parsing
     parsed_data = parse_resume_with_gemini(text, interested_domain)
     
-    print(f"[INFO] Resume parsed for user '{name}': {parsed_data}")
+    # Field names only: the parsed values are personal data
+    log.info("Resume parsed for user %s", user_id,
+             extra={"fields": sorted(parsed_data) if parsed_data else []})
 
     
     if not parsed_data:
@@ -41,10 +49,10 @@ async def parse_resume(
     # 4. Update Existing User in PostgreSQL
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
-        print(f"[DEBUG] User not found: id={user_id}")
+        log.debug("User not found: id=%s", user_id)
         raise HTTPException(status_code=404, detail="User not found")
     
-    print(f"[DEBUG] Updating user {user.id}: existing email={user.email}")
+    log.debug("Updating user %s from parsed resume", user.id)
 
     # Update fields
     user.name = name
@@ -1,9 +1,8 @@
-
 import pandas as pd
 import torch
 from pathlib import Path
 
-processed_dir = Path("c:/Code/RecSys-Project-FairMatch/backend/Processed")
+processed_dir = Path(__file__).parent / "backend" / "Processed"
 
 try:
     jobs = pd.read_parquet(processed_dir / "jobs.parquet")
@@ -22,3 +21,11 @@ try:
     print(f"job_embeddings.pt shape: {emb.shape}")
 except Exception as e:
     print(f"Error reading job_embeddings.pt: {e}")
+
+try:
+    if len(jobs_sample) == emb.shape[0]:
+        print("jobs_sample.parquet and job_embeddings.pt are row-aligned.")
+    else:
+        print(f"MISMATCH: jobs_sample.parquet has {len(jobs_sample)} rows, job_embeddings.pt has {emb.shape[0]}")
+except NameError:
+    pass
@@ -0,0 +1,36 @@
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import torch
+
+backend_dir = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+# Tests never download the SentenceTransformer model.
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+
+class FakeEncoder:
+    """
+    Deterministic stand-in for the SentenceTransformer: one normalized
+    vector per text (seeded by its sha256), and a record of every text
+    encoded.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+        self.encoded = []
+
+    def encode(self, texts, batch_size=64, convert_to_tensor=True, show_progress_bar=False, **kwargs):
+        if isinstance(texts, str):
+            self.encoded.append(texts)
+            return self.vector(texts)
+        self.encoded.extend(texts)
+        return torch.stack([self.vector(t) for t in texts])
+
+    def vector(self, text):
+        seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+        g = torch.Generator().manual_seed(seed)
+        return torch.nn.functional.normalize(torch.randn(self.dim, generator=g), dim=0)
@@ -0,0 +1,111 @@
+import pandas as pd
+import pytest
+import torch
+
+import models.artifacts as artifacts
+from models.artifacts import ArtifactBundle, BundleError, load_bundle
+
+
+def _write_catalog(tmp_path, n_jobs, n_emb):
+    jobs = pd.DataFrame({"job id": [100 + i for i in range(n_jobs)], "job title": [f"job {i}" for i in range(n_jobs)]})
+    jobs.to_parquet(tmp_path / "jobs.parquet")
+    torch.save(torch.nn.functional.normalize(torch.randn(n_emb, 384), dim=1), tmp_path / "emb.pt")
+    return dict(jobs_file=tmp_path / "jobs.parquet", job_emb_file=tmp_path / "emb.pt", registry_path=tmp_path / "registry",
+                bundle_path=tmp_path / "bundle")
+
+
+def test_bundle_id_index(tmp_path):
+    bundle = load_bundle(**_write_catalog(tmp_path, 20, 20))
+    assert len(bundle) == 20
+    assert bundle.rows_for_ids(["105", 110, "missing"]).tolist() == [5, 10]
+    assert bundle.rows_for_ids([]).tolist() == []
+
+
+def test_misaligned_catalog_is_rejected(tmp_path):
+    with pytest.raises(BundleError):
+        load_bundle(**_write_catalog(tmp_path, 20, 19))
+
+
+def test_incompatible_active_model_falls_back_to_cosine(tmp_path, monkeypatch):
+    from models.classifier import RecSysClassifier, architecture_of
+    from models.registry import ModelRegistry
+
+    paths = _write_catalog(tmp_path, 10, 10)
+    model = RecSysClassifier(hidden_dim=32, hidden_dim2=16)
+    ModelRegistry(paths["registry_path"]).register(model.state_dict(), architecture_of(model),
+                                                   torch.randn(10, 128), export=False)
+
+    bundle = load_bundle(**paths)
+    assert bundle.classifier is None and bundle.classifier_manifest is None
+    assert len(bundle) == 10
+
+    # On reload the rejection is an error, so the current bundle keeps serving
+    monkeypatch.setattr(artifacts, "_bundle", bundle)
+    with pytest.raises(BundleError):
+        artifacts.reload_bundle(**paths)
+    assert artifacts.get_bundle() is bundle
+
+
+def test_reload_swaps_atomically(tmp_path, monkeypatch):
+    paths = _write_catalog(tmp_path, 10, 10)
+    monkeypatch.setattr(artifacts, "_bundle", load_bundle(**paths))
+    in_flight = artifacts.get_bundle()
+
+    _write_catalog(tmp_path, 12, 12)
+    new = artifacts.reload_bundle(**paths)
+    assert artifacts.get_bundle() is new and len(new) == 12
+    # A request holding the old bundle keeps a consistent view
+    assert len(in_flight) == 10 and in_flight.job_emb.size(0) == 10
+
+    # A bad update leaves the current bundle in place
+    _write_catalog(tmp_path, 15, 14)
+    with pytest.raises(BundleError):
+        artifacts.reload_bundle(**paths)
+    assert artifacts.get_bundle() is new
+
+
+def test_bundle_requires_alignment():
+    with pytest.raises(BundleError):
+        ArtifactBundle(pd.DataFrame({"job id": [1, 2]}), torch.zeros(3, 4))
+
+
+def test_admin_reload_endpoint(tmp_path, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    import lib.admin
+    from routers import admin
+
+    paths = _write_catalog(tmp_path, 8, 8)
+    monkeypatch.setattr(artifacts, "_bundle", load_bundle(**paths))
+    monkeypatch.setattr(admin, "reload_bundle", lambda: artifacts.reload_bundle(**paths))
+    monkeypatch.setattr(lib.admin, "ADMIN_TOKEN", "secret")
+
+    app = FastAPI()
+    app.include_router(admin.router)
+    client = TestClient(app)
+
+    assert client.post("/admin/reload").status_code == 401
+    assert client.post("/admin/reload", headers={"X-Admin-Token": "wrong"}).status_code == 401
+
+    _write_catalog(tmp_path, 9, 9)
+    response = client.post("/admin/reload?wait=true", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 202
+    assert response.json()["n_jobs"] == 9
+
+    _write_catalog(tmp_path, 9, 7)
+    response = client.post("/admin/reload?wait=true", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 422
+    assert client.get("/admin/artifacts", headers={"X-Admin-Token": "secret"}).json()["n_jobs"] == 9
+
+
+def test_watcher_follows_the_served_classifier(tmp_path, monkeypatch):
+    artifact = tmp_path / "classifier.ts.pt"
+    monkeypatch.setenv("CLASSIFIER_ARTIFACT", str(artifact))
+    paths = _write_catalog(tmp_path, 5, 5)
+    del paths["jobs_file"], paths["job_emb_file"]
+
+    before = artifacts.watched_sources(**paths)
+    assert before["classifier"] == (str(artifact), None, None)
+    artifact.write_bytes(b"model")
+    assert artifacts.watched_sources(**paths)["classifier"] != before["classifier"]
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import torch
+
+import models.augment_data as augment
+
+
+def test_augmented_pairs_never_collide(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    n_jobs = 25
+    job_ids = [f"j{i}" for i in range(n_jobs)]
+    pd.DataFrame({"jobid": job_ids}).to_parquet(tmp_path / "jobs.parquet")
+    torch.save(torch.nn.functional.normalize(torch.randn(n_jobs, 16), dim=1), tmp_path / "emb.pt")
+
+    # Mostly likes, so PASS rows are needed; user 1 has seen all but two jobs
+    rows = [(1, job, "like" if i % 3 else "pass") for i, job in enumerate(job_ids[:-2])]
+    for user in range(2, 7):
+        for job in rng.choice(job_ids, size=6, replace=False):
+            rows.append((user, job, "like"))
+    interactions = pd.DataFrame(rows, columns=["user_id", "item_id", "action"])
+    interactions.insert(0, "id", np.arange(len(interactions)))
+    interactions["timestamp"] = "2024-01-01 00:00:00"
+    interactions.to_csv(tmp_path / "interactions.csv", index=False)
+
+    monkeypatch.setattr(augment, "interactions_path", tmp_path / "interactions.csv")
+    monkeypatch.setattr(augment, "jobs_path", tmp_path / "jobs.parquet")
+    monkeypatch.setattr(augment, "job_emb_path", tmp_path / "emb.pt")
+    monkeypatch.setattr(augment, "neighbours_path", tmp_path / "neighbours.pt")
+    monkeypatch.setattr(augment, "output_path", tmp_path / "augmented.csv")
+    augment.augment_data(seed=0)
+
+    result = pd.read_csv(tmp_path / "augmented.csv")
+    added = result[result["id"].isna()]
+    seen = set(zip(interactions["user_id"], interactions["item_id"]))
+    added_pairs = list(zip(added["user_id"], added["item_id"]))
+    passes = added[added["action"] == "pass"]
+
+    assert len(result) == len(interactions) + len(added)
+    assert len(passes) > 0 and (added["action"] == "like").sum() > 0
+    # No augmented pair repeats a real one or another augmented one
+    assert not seen & set(added_pairs)
+    assert len(set(added_pairs)) == len(added_pairs)
+    assert set(added["item_id"]) <= set(job_ids)
+    # User 1 only had two unseen jobs left
+    assert (added["user_id"] == 1).sum() <= 2
@@ -0,0 +1,29 @@
+import copy
+
+from benchmarks.suite import compare, run_suite, synthetic_bundle
+
+
+def test_synthetic_bundle_is_servable():
+    bundle = synthetic_bundle(500, dim=16)
+    assert len(bundle) == 500 and bundle.job_emb.shape == (500, 16)
+    assert len(set(bundle.job_ids)) == 500
+    assert bundle.filter_mask({"work_type": ["Intern"]}).any()
+
+
+def test_suite_runs_and_compares():
+    report = run_suite(sizes=[300], dim=16, min_time=0.0, rerank_sizes=[20])
+    names = {r["name"] for r in report["results"]}
+    assert names == {
+        "split_skills", "rerank_conditional_demographic_parity", "update_user_profile_vector",
+        "recommend_from_embedding[cosine]", "recommend_from_embedding[hybrid]", "_get_jobs_from_indices",
+        "get_job_details", "EvaluationHarness.run_benchmark", "EvaluationHarness.evaluate_arrays",
+    }
+    assert report["meta"]["sizes"] == [300]
+
+    slower = copy.deepcopy(report)
+    for r in slower["results"]:
+        if r["name"] == "split_skills":
+            r["median_ms"] = report["results"][0]["median_ms"] * 2
+    rows, regressions = compare(report, slower, threshold=0.5)
+    assert len(rows) == len(report["results"])
+    assert [r["name"] for r in regressions] == ["split_skills"]
@@ -0,0 +1,111 @@
+import pandas as pd
+import pytest
+
+from benchmarks.load_test import seed_database
+from models.data_source import (high_water_mark, load_cached_interactions, load_cached_users, read_export,
+                                sync_interactions, sync_users)
+
+
+def _add_interactions(url, n):
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        user_id = connection.execute(text("SELECT MIN(id) FROM users")).scalar()
+        for i in range(n):
+            connection.execute(text("INSERT INTO interactions (user_id, item_id, type, action, timestamp) "
+                                    "VALUES (:u, :item, 'job', 'like', '2025-01-01T00:00:00Z')"),
+                               {"u": user_id, "item": f"new-{i}"})
+
+
+def test_sync_fetches_only_new_interactions(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    seed_database(url, n_users=4, interactions_per_user=5, embedded_fraction=0.0)
+    cache = tmp_path / "cache"
+
+    first = sync_interactions(url, cache, batch_size=7)
+    assert first["new_rows"] == 20 and first["parts"] == 1
+    assert high_water_mark(cache) == first["high_water_mark"]
+
+    assert sync_interactions(url, cache)["new_rows"] == 0
+    _add_interactions(url, 3)
+    second = sync_interactions(url, cache, batch_size=2)
+    assert second["new_rows"] == 3 and second["parts"] == 2
+
+    interactions = load_cached_interactions(cache)
+    assert len(interactions) == 23 and interactions["id"].is_unique
+    assert list(interactions.columns) == ["id", "user_id", "item_id", "type", "action", "timestamp"]
+    assert interactions["item_id"].iloc[-1] == "new-2"
+
+    full = sync_interactions(url, cache, full=True)
+    assert full["new_rows"] == 23 and full["parts"] == 1
+    assert sorted(p.name for p in cache.iterdir()) == ["interactions"]
+
+
+def test_failed_full_sync_keeps_the_cache(tmp_path, monkeypatch):
+    import models.data_source as data_source
+
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    seed_database(url, n_users=3, interactions_per_user=4, embedded_fraction=0.0)
+    cache = tmp_path / "cache"
+    sync_interactions(url, cache)
+
+    def failing_stream(*args, **kwargs):
+        yield from ()
+        raise ConnectionError("database went away")
+
+    monkeypatch.setattr(data_source, "stream_table", failing_stream)
+    with pytest.raises(ConnectionError):
+        sync_interactions(url, cache, full=True)
+    assert len(load_cached_interactions(cache)) == 12
+    assert high_water_mark(cache) > 0
+
+
+def test_sync_users_without_credentials(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    seed_database(url, n_users=3, interactions_per_user=1, embedded_fraction=0.0)
+
+    assert sync_users(url, tmp_path / "cache") == 3
+    users = load_cached_users(tmp_path / "cache")
+    assert len(users) == 3 and "email" not in users.columns and "password" not in users.columns
+    assert users["projects"].iloc[0].startswith("[")
+
+
+def test_read_export_falls_back_to_latin1(tmp_path):
+    path = tmp_path / "users.csv"
+    path.write_bytes("id,name\n1,Anaïs\n".encode("latin1"))
+    assert read_export(path)["name"].iloc[0] == "Anaïs"
+    pd.testing.assert_frame_equal(read_export(path), pd.read_csv(path, encoding="latin1"))
+
+
+def test_copy_batches_parse_postgres_csv():
+    from models.data_source import INTERACTIONS_SCHEMA, _copy_batches
+
+    class Cursor:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def copy_expert(self, sql, file):
+            assert sql.startswith("COPY (SELECT") and "TO STDOUT" in sql
+            file.write(b'id,user_id,item_id,type,action,timestamp\n'
+                       b'7,1,123456,job,like,2025-01-01T00:00:00Z\n'
+                       b'9,2,"a,b",job,pass,\n')
+
+    class Connection:
+        def cursor(self):
+            return Cursor()
+
+        def close(self):
+            pass
+
+    class Engine:
+        def raw_connection(self):
+            return Connection()
+
+    batches = list(_copy_batches(Engine(), "SELECT 1", INTERACTIONS_SCHEMA, batch_size=10))
+    frame = pd.concat([b.to_pandas() for b in batches])
+    assert frame["id"].tolist() == [7, 9] and frame["item_id"].tolist() == ["123456", "a,b"]
+    assert frame["timestamp"].isna().tolist() == [False, True]
@@ -0,0 +1,50 @@
+import torch
+
+from conftest import FakeEncoder
+from models.embedding_store import EmbeddingStore
+
+
+def test_only_new_texts_are_encoded(tmp_path):
+    path = tmp_path / "store.pt"
+    encoder = FakeEncoder(dim=8)
+    texts = ["alpha", "beta", "gamma", "beta"]
+
+    store = EmbeddingStore(path)
+    emb = store.encode(texts, encoder, show_progress_bar=False)
+    store.save()
+    assert encoder.encoded == ["alpha", "beta", "gamma"]
+    assert torch.equal(emb, torch.stack([encoder.vector(t) for t in texts]))
+
+    # Unchanged catalog: nothing to encode
+    encoder.encoded.clear()
+    store = EmbeddingStore(path)
+    assert torch.equal(store.encode(texts, encoder, show_progress_bar=False), emb)
+    assert encoder.encoded == []
+
+    # One edited row, one new row, reordered: only those are encoded, rows follow the input
+    encoder.encoded.clear()
+    texts = ["delta", "gamma", "alpha", "beta (edited)"]
+    emb = store.encode(texts, encoder, show_progress_bar=False)
+    assert encoder.encoded == ["delta", "beta (edited)"]
+    assert torch.equal(emb, torch.stack([encoder.vector(t) for t in texts]))
+
+
+def test_prune_drops_unreferenced_texts(tmp_path):
+    path = tmp_path / "store.pt"
+    encoder = FakeEncoder(dim=8)
+    store = EmbeddingStore(path)
+    store.encode(["alpha", "beta", "gamma"], encoder, show_progress_bar=False)
+
+    texts = ["gamma", "delta", "alpha"]
+    emb = store.encode(texts, encoder, show_progress_bar=False, prune=True)
+    store.save()
+    assert len(store) == 3
+    assert torch.equal(emb, torch.stack([encoder.vector(t) for t in texts]))
+
+    encoder.encoded.clear()
+    store = EmbeddingStore(path)
+    assert torch.equal(store.encode(texts, encoder, show_progress_bar=False), emb)
+    assert encoder.encoded == []
+
+    # The model changed: the saved store is ignored
+    assert len(EmbeddingStore(path, model_name="another-model")) == 0
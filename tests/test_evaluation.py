@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from evaluation import EvaluationHarness, csr_from_lists
+
+
+def _random_case(n_users=400, n_items=120, width=12, seed=0):
+    rng = np.random.default_rng(seed)
+    preds = np.array([rng.choice(n_items, width, replace=False) for _ in range(n_users)])
+    preds[3, 7:] = -1  # user with fewer recommendations
+    truth = [list(rng.choice(n_items, rng.integers(0, 6), replace=False)) for _ in range(n_users)]
+    female = rng.random(n_items) < 0.4
+    return preds, truth, female
+
+
+def test_evaluate_arrays_matches_run_benchmark():
+    preds, truth, female = _random_case()
+    harness = EvaluationHarness(k=10)
+    expected = harness.run_benchmark(
+        {u: [int(i) for i in row if i >= 0] for u, row in enumerate(preds)},
+        dict(enumerate(truth)),
+        {i: {"gender": "Female" if f else "Male"} for i, f in enumerate(female)},
+    )
+    # Chunks that do not divide the users evenly
+    result = harness.evaluate_arrays(preds, csr_from_lists(truth, len(female)), target_items=female, chunk_size=64)
+    assert result["users"] == len(preds)
+    assert result["NDCG@10"] == pytest.approx(expected["Mean_NDCG"])
+    assert result["CDP@10"] == pytest.approx(expected["Mean_CDP_Female_Ratio"])
+    assert result["Coverage@10"] == pytest.approx(expected["Coverage"])
+
+
+def test_evaluate_arrays_several_k():
+    preds = np.array([[4, 1, 2, 3], [0, 1, -1, -1], [5, 6, 7, 8]])
+    indptr, indices, _ = csr_from_lists([[1, 3], [9], []])
+    result = EvaluationHarness().evaluate_arrays(preds, (indptr, indices), n_items=10, ks=[1, 2, 4])
+
+    assert result["Recall@1"] == 0.0
+    assert result["Recall@2"] == pytest.approx((1 / 2 + 0) / 2)  # user 2 has no ground truth
+    assert result["Recall@4"] == pytest.approx((2 / 2 + 0) / 2)
+    # User 0: hits at ranks 2 and 4, ideal = hits at ranks 1 and 2
+    dcg = 1 / np.log2(3) + 1 / np.log2(5)
+    assert result["NDCG@4"] == pytest.approx(dcg / (1 + 1 / np.log2(3)) / 3)
+    assert result["Coverage@2"] == pytest.approx(5 / 10)
+    assert "CDP@4" not in result
+
+
+def test_evaluate_arrays_accepts_scipy_csr():
+    sparse = pytest.importorskip("scipy.sparse")
+    preds, truth, female = _random_case(n_users=50)
+    indptr, indices, n_items = csr_from_lists(truth, len(female))
+    matrix = sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(len(truth), n_items))
+    harness = EvaluationHarness(k=5)
+    assert harness.evaluate_arrays(preds, matrix) == harness.evaluate_arrays(preds, (indptr, indices, n_items))
+
+
+def test_evaluate_arrays_rejects_misaligned_input():
+    harness = EvaluationHarness(k=5)
+    with pytest.raises(ValueError):
+        harness.evaluate_arrays(np.zeros((2, 3), dtype=int), csr_from_lists([[0], [1]]))
+    with pytest.raises(ValueError):
+        harness.evaluate_arrays(np.zeros((2, 5), dtype=int), csr_from_lists([[0]]))
@@ -0,0 +1,53 @@
+import importlib.util
+
+import pytest
+import torch
+
+from models.classifier import RecSysClassifier, load_classifier_scorer
+from models.export_model import benchmark, export_all
+
+has_onnxruntime = importlib.util.find_spec("onnxruntime") is not None and importlib.util.find_spec("onnx") is not None
+
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    torch.manual_seed(0)
+    model = RecSysClassifier().eval()
+    out_dir = tmp_path_factory.mktemp("export")
+    torch.save(model.state_dict(), out_dir / "classifier.pt")
+    artifacts = export_all(model, out_dir, onnx=has_onnxruntime)
+    return model, out_dir, artifacts
+
+
+def test_exported_artifacts_match_eager(exported):
+    model, out_dir, artifacts = exported
+    inputs = torch.randn(650, 768)
+    with torch.no_grad():
+        expected = model(inputs)
+
+    eager = load_classifier_scorer(out_dir / "classifier.pt")
+    assert torch.allclose(eager(inputs), expected, atol=1e-6)
+
+    for name, path in artifacts.items():
+        scorer = load_classifier_scorer(path)
+        got = scorer(inputs)
+        assert got.shape == expected.shape, name
+        # int8 weights shift probabilities slightly; fp32 exports must match
+        atol = 2e-2 if "int8" in name else 1e-5
+        assert torch.allclose(got, expected, atol=atol), name
+
+
+@pytest.mark.skipif(not has_onnxruntime, reason="onnx / onnxruntime not installed")
+def test_onnx_artifact_is_exported(exported):
+    _, _, artifacts = exported
+    assert "classifier.onnx" in artifacts
+
+
+def test_benchmark_reports_every_scorer(exported):
+    _, out_dir, artifacts = exported
+    scorers = {"eager": load_classifier_scorer(out_dir / "classifier.pt")}
+    scorers.update({name: load_classifier_scorer(path) for name, path in artifacts.items()})
+
+    results = benchmark(scorers, batch_sizes=(50,), repeats=3)
+    assert set(results) == {(name, 50) for name in scorers}
+    assert all(ms > 0 for ms in results.values())
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import torch
+
+from models.artifacts import ArtifactBundle
+from models.filters import AttributeIndex, filter_mask
+
+
+def _catalog(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "job id": np.arange(1000, 1000 + n),
+        "work type": rng.choice(["Full-Time", "Intern", "Contract"], size=n),
+        "country": rng.choice([f"country {i}" for i in range(60)], size=n, p=[0.41] + [0.01] * 59),
+        "location": rng.choice(["Paris", "Lyon", None], size=n),
+        "companybucket": rng.choice(["small", "mid", "large"], size=n),
+    })
+
+
+def test_attribute_index_matches_pandas():
+    jobs = _catalog()
+    index = AttributeIndex(jobs["country"])
+    # One frequent country (bitmap) and many rare ones (row lists)
+    assert index.dense and index.sparse
+
+    values = ["country 0", "COUNTRY 7 ", "country 42", "nowhere"]
+    expected = jobs["country"].isin(["country 0", "country 7", "country 42"]).to_numpy()
+    got = np.unpackbits(index.packed_mask(values), count=len(jobs)).view(bool)
+    assert np.array_equal(got, expected)
+
+
+def test_filter_mask_combines_attributes():
+    jobs = _catalog()
+    bundle = ArtifactBundle(jobs, torch.randn(len(jobs), 8))
+
+    mask = bundle.filter_mask({"work_type": ["intern", "contract"], "company_bucket": ["small"], "country": None})
+    expected = (jobs["work type"].isin(["Intern", "Contract"]) & (jobs["companybucket"] == "small")).to_numpy()
+    assert np.array_equal(mask, expected)
+
+    assert bundle.filter_mask({}).all()
+    assert not bundle.filter_mask({"work_type": ["Remote"]}).any()
+    assert not filter_mask({}, 5, {"country": ["x"]}).any()
+
+
+def test_filtered_recommendations():
+    from models.base_model import recommend_from_embedding
+
+    jobs = _catalog()
+    torch.manual_seed(0)
+    job_emb = torch.nn.functional.normalize(torch.randn(len(jobs), 8), dim=1)
+    bundle = ArtifactBundle(jobs, job_emb)
+
+    allowed = jobs.index[(jobs["work type"] == "Intern") & (jobs["companybucket"] == "large")]
+    excluded = str(jobs["job id"].iloc[allowed[0]])
+    filters = {"work_type": ["Intern"], "company_bucket": ["large"]}
+
+    recos = recommend_from_embedding(job_emb[allowed[1]], top_k=1000, exclude_ids=[excluded],
+                                     hybrid_weight=0.0, bundle=bundle, filters=filters)
+    # Every allowed job except the excluded one, best match first
+    assert len(recos) == len(allowed) - 1
+    assert recos[0]["job_id"] == str(jobs["job id"].iloc[allowed[1]])
+    assert all(r["work_type"] == "Intern" and r["company_bucket"] == "large" for r in recos)
+    assert excluded not in {r["job_id"] for r in recos}
+
+    # Unfiltered: excluded jobs never come back, even when top_k exceeds what is left
+    recos = recommend_from_embedding(job_emb[0], top_k=1000, exclude_ids=[excluded], hybrid_weight=0.0, bundle=bundle)
+    assert len(recos) == len(jobs) - 1
@@ -0,0 +1,47 @@
+import pytest
+
+from benchmarks.load_test import parse_metrics, seed_database, stage_timings, summarize
+from lib.metrics import MetricsRegistry
+
+
+def test_stage_timings_from_two_scrapes():
+    registry = MetricsRegistry()
+    hist = registry.histogram("fairmatch_stage_duration_seconds", "test", ("stage",), buckets=(0.01, 0.1))
+    hist.observe(0.005, stage="cosine")
+    before = parse_metrics(registry.render())
+    for value in (0.004, 0.006, 0.05, 0.05):
+        hist.observe(value, stage="cosine")
+    hist.observe(0.2, stage="rerank")
+    after = parse_metrics(registry.render())
+
+    stages = stage_timings(before, after)
+    assert list(stages) == ["rerank", "cosine"]
+    assert stages["cosine"]["count"] == 4
+    assert stages["cosine"]["mean_ms"] == pytest.approx(27.5)
+    assert 0 < stages["cosine"]["p50_ms"] <= 10.0
+    assert stages["rerank"]["p99_ms"] == pytest.approx(100.0)  # +Inf bucket: its lower bound
+
+
+def test_summarize():
+    records = [("recommend", 10.0, None), ("recommend", 30.0, "HTTP 500"), ("login", 5.0, None)]
+    report = summarize(records, duration=2.0)
+    assert report["total"]["requests"] == 3 and report["total"]["rps"] == 1.5
+    assert report["operations"]["recommend"]["error_rate"] == 0.5
+    assert report["operations"]["recommend"]["errors"] == {"HTTP 500": 1}
+    assert report["operations"]["login"]["p99_ms"] == 5.0
+
+
+def test_seed_database_replaces_previous_run(tmp_path):
+    from sqlalchemy import create_engine, text
+
+    url = f"sqlite:///{tmp_path / 'load.db'}"
+    seed_database(url, n_users=5, interactions_per_user=3, embedded_fraction=0.5)
+    user_ids, job_ids = seed_database(url, n_users=4, interactions_per_user=3, embedded_fraction=1.0)
+    assert len(user_ids) == 4 and len(job_ids) > 0
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM users")).scalar() == 4
+        assert conn.execute(text("SELECT COUNT(*) FROM interactions")).scalar() == 12
+        assert conn.execute(text("SELECT COUNT(*) FROM users WHERE profile_embedding IS NULL")).scalar() == 0
+    engine.dispose()
@@ -0,0 +1,64 @@
+import io
+import json
+import logging
+import queue
+
+import pytest
+
+from lib.logging_setup import DROPPED_RECORDS, NonBlockingQueueHandler, SamplingFilter, configure_logging, stop_logging
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_json_records_go_through_the_queue(restore_root_logger):
+    stream = io.StringIO()
+    configure_logging(level="INFO", fmt="json", stream=stream)
+    log = logging.getLogger("routers.test")
+
+    groups = {"small": 1}
+    log.info("served %s", groups, extra={"user_id": 7, "timings_ms": {"rank": 1.5}})
+    groups["small"] = 2  # arguments are captured when the record is logged
+    log.debug("below the level")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        log.exception("failed")
+    stop_logging()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(lines) == 2
+    assert lines[0]["message"] == "served {'small': 1}"
+    assert lines[0]["level"] == "INFO" and lines[0]["logger"] == "routers.test"
+    assert lines[0]["user_id"] == 7 and lines[0]["timings_ms"] == {"rank": 1.5}
+    assert "ValueError: boom" in lines[1]["exc"]
+
+
+def test_debug_sampling():
+    keep_all, keep_none = SamplingFilter(1.0), SamplingFilter(0.0)
+    debug = logging.LogRecord("x", logging.DEBUG, "", 0, "m", (), None)
+    warning = logging.LogRecord("x", logging.WARNING, "", 0, "m", (), None)
+
+    assert keep_all.filter(debug)
+    assert not keep_none.filter(debug)
+    assert keep_none.filter(warning)
+
+    debug.sample_rate = 1.0
+    assert keep_none.filter(debug)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("x", logging.INFO, "", 0, "m", (), None)
+    before = DROPPED_RECORDS.value(reason="queue_full")
+    handler.handle(record)
+    handler.handle(record)
+    assert handler.queue.qsize() == 1
+    assert DROPPED_RECORDS.value(reason="queue_full") == before + 1
@@ -0,0 +1,66 @@
+import pytest
+
+from lib.metrics import STAGE_SECONDS, MetricsRegistry
+from lib.timing import timed
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    hist = registry.histogram("t_latency_seconds", "test", ("stage",), buckets=(0.01, 0.1))
+    for value in (0.005, 0.05, 0.05, 2.0):
+        hist.observe(value, stage="cosine")
+
+    text = registry.render()
+    assert '# TYPE t_latency_seconds histogram' in text
+    assert 't_latency_seconds_bucket{stage="cosine",le="0.01"} 1' in text
+    assert 't_latency_seconds_bucket{stage="cosine",le="0.1"} 3' in text
+    assert 't_latency_seconds_bucket{stage="cosine",le="+Inf"} 4' in text
+    assert 't_latency_seconds_count{stage="cosine"} 4' in text
+    assert hist.snapshot(stage="cosine") == (4, pytest.approx(2.105))
+
+
+def test_counter_labels_are_checked():
+    registry = MetricsRegistry()
+    counter = registry.counter("t_total", "test", ("source",))
+    counter.inc(source="stored")
+    counter.inc(2, source='say "hi"')
+    assert counter.value(source="stored") == 1
+    assert 't_total{source="say \\"hi\\""} 2' in registry.render()
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+    assert registry.counter("t_total", "test", ("source",)) is counter
+
+
+def test_timed_feeds_the_stage_histogram():
+    before = STAGE_SECONDS.snapshot(stage="test_stage")[0]
+    timings = {}
+    with timed("test_stage", timings):
+        pass
+    with timed("test_stage"):
+        pass
+    assert STAGE_SECONDS.snapshot(stage="test_stage")[0] == before + 2
+    assert timings["test_stage"] >= 0.0
+
+
+def test_recommendation_stages_reach_metrics_endpoint():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from routers import metrics
+
+    from models.base_model import recommend_from_embedding
+    from test_pipeline import _bundle
+
+    bundle = _bundle()
+    timings = {}
+    recommend_from_embedding(bundle.job_emb[3], top_k=5, hybrid_weight=0.5, bundle=bundle,
+                             candidate_k=20, exclude_ids=["3"], timings=timings)
+    assert {"cosine", "exclusion", "topk", "mlp"} <= set(timings)
+
+    app = FastAPI()
+    app.include_router(metrics.router)
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for stage in ("cosine", "exclusion", "topk", "mlp", "payload"):
+        assert f'fairmatch_stage_duration_seconds_count{{stage="{stage}"}}' in response.text
+    assert "fairmatch_candidates_bucket" in response.text
@@ -0,0 +1,50 @@
+import pandas as pd
+import torch
+
+from models.artifacts import ArtifactBundle
+
+
+class CountingClassifier:
+    """Scores every job 1.0 and records how many rows it was asked to score."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, inputs):
+        self.batch_sizes.append(inputs.size(0))
+        return torch.ones(inputs.size(0), 1)
+
+
+def _bundle(n=500, dim=16):
+    torch.manual_seed(0)
+    jobs = pd.DataFrame({"job id": range(n), "companybucket": ["small"] * n})
+    job_emb = torch.nn.functional.normalize(torch.randn(n, dim), dim=1)
+    return ArtifactBundle(jobs, job_emb, classifier=CountingClassifier())
+
+
+def test_classifier_only_scores_candidates():
+    from models.base_model import recommend_from_embedding
+
+    bundle = _bundle()
+    u_emb = bundle.job_emb[7]
+    timings = {}
+    recos = recommend_from_embedding(u_emb, top_k=10, hybrid_weight=0.5, bundle=bundle,
+                                     candidate_k=40, exclude_ids=["7"], timings=timings)
+
+    assert bundle.classifier.batch_sizes == [40]
+    assert {"candidates", "rank", "payload"} <= set(timings)
+
+    # A constant classifier score keeps the cosine order
+    cosine = bundle.job_emb @ u_emb
+    cosine[7] = -float("inf")
+    expected = torch.topk(cosine, 10).indices.tolist()
+    assert [int(r["job_id"]) for r in recos] == expected
+
+
+def test_candidate_pool_is_at_least_top_k():
+    from models.base_model import recommend_from_embedding
+
+    bundle = _bundle()
+    recos = recommend_from_embedding(bundle.job_emb[0], top_k=30, hybrid_weight=0.5, bundle=bundle, candidate_k=5)
+    assert len(recos) == 30
+    assert bundle.classifier.batch_sizes == [30]
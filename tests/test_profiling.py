@@ -0,0 +1,77 @@
+import pstats
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import lib.admin
+import lib.profiling as profiling
+from lib.profiling import PROFILE_ID_HEADER, profile_middleware, profiled
+
+
+def _slow_sum(n):
+    return sum(i * i for i in range(n))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    from routers import admin
+
+    monkeypatch.setattr(lib.admin, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path / "profiles")
+    monkeypatch.setattr(profiling, "PROFILE_KEEP", 2)
+
+    app = FastAPI()
+    app.middleware("http")(profile_middleware)
+    app.include_router(admin.router)
+
+    @app.get("/work/{n}")
+    @profiled("work")
+    def work(n: int):
+        return {"total": _slow_sum(n)}
+
+    @app.get("/async-work")
+    @profiled("async_work")
+    async def async_work():
+        return {"total": _slow_sum(1000)}
+
+    return TestClient(app)
+
+
+def test_requests_are_not_profiled_by_default(client):
+    assert client.get("/work/10").json() == {"total": 285}
+    # The flag is ignored without a valid admin token
+    response = client.get("/work/10", headers={"X-Profile": "1", "X-Admin-Token": "wrong"})
+    assert PROFILE_ID_HEADER not in response.headers
+    assert not profiling.PROFILE_DIR.exists()
+
+
+def test_profiled_request_can_be_listed_and_downloaded(client):
+    admin = {"X-Admin-Token": "secret"}
+    response = client.get("/work/1000?profile=1", headers=admin)
+    assert response.json() == {"total": 332833500}
+    profile_id = response.headers[PROFILE_ID_HEADER]
+    assert "-work-" in profile_id
+
+    stats = pstats.Stats(str(profiling.PROFILE_DIR / profile_id))
+    assert any(func[2] == "_slow_sum" for func in stats.stats)
+
+    listed = client.get("/admin/profiles", headers=admin).json()
+    assert [p["profile_id"] for p in listed] == [profile_id]
+
+    report = client.get(f"/admin/profiles/{profile_id}?format=text", headers=admin)
+    assert "_slow_sum" in report.text
+    assert client.get(f"/admin/profiles/{profile_id}?format=text&sort=time", headers=admin).status_code == 200
+    assert client.get(f"/admin/profiles/{profile_id}?format=text&sort=bogus", headers=admin).status_code == 400
+    raw = client.get(f"/admin/profiles/{profile_id}", headers=admin)
+    assert raw.content == (profiling.PROFILE_DIR / profile_id).read_bytes()
+
+    assert client.get("/admin/profiles/..%2Fsecret.prof", headers=admin).status_code == 404
+    assert client.get(f"/admin/profiles/{profile_id}").status_code == 401
+
+
+def test_async_endpoint_and_rotation(client):
+    headers = {"X-Profile": "true", "X-Admin-Token": "secret"}
+    ids = [client.get("/async-work", headers=headers).headers[PROFILE_ID_HEADER] for _ in range(3)]
+    kept = {p["profile_id"] for p in profiling.list_profiles()}
+    assert len(kept) == 2 and kept <= set(ids)
@@ -0,0 +1,58 @@
+import pytest
+import torch
+
+from models.classifier import RecSysClassifier, architecture_of
+from models.registry import ModelRegistry, RegistryError
+
+
+@pytest.fixture
+def job_emb():
+    torch.manual_seed(0)
+    return torch.nn.functional.normalize(torch.randn(50, 384), dim=1)
+
+
+def _register(registry, job_emb, **kwargs):
+    model = RecSysClassifier(hidden_dim=32, hidden_dim2=16)
+    return registry.register(model.state_dict(), architecture_of(model), job_emb,
+                             metrics={"val_loss": 0.5}, export=False, **kwargs)
+
+
+def test_register_activate_and_rollback(tmp_path, job_emb):
+    registry = ModelRegistry(tmp_path)
+    assert registry.active_version() is None
+    assert registry.load_active(job_emb) == (None, None)
+
+    v1 = _register(registry, job_emb)
+    v2 = _register(registry, job_emb)
+    v3 = _register(registry, job_emb, activate=False)
+    assert registry.versions() == [v1, v2, v3]
+    assert registry.active_version() == v2
+
+    manifest = registry.manifest(v2)
+    assert manifest["architecture"]["hidden_dim"] == 32
+    assert manifest["embedding"]["dim"] == 384
+    assert manifest["catalog"]["n_jobs"] == 50
+
+    scorer, loaded = registry.load_active(job_emb)
+    assert loaded["version"] == v2
+    assert scorer(torch.randn(4, 768)).shape == (4, 1)
+
+    registry.rollback()
+    assert registry.active_version() == v1
+
+    with pytest.raises(RegistryError):
+        registry.activate("v9999")
+
+
+def test_incompatible_model_is_rejected(tmp_path, job_emb):
+    registry = ModelRegistry(tmp_path)
+    _register(registry, job_emb)
+
+    with pytest.raises(RegistryError):
+        registry.load_active(torch.randn(50, 128))
+    with pytest.raises(RegistryError):
+        registry.load_active(job_emb, embedding_model="another-model")
+
+    # Same dimension, different catalog: served, with a warning
+    scorer, _ = registry.load_active(torch.randn(60, 384))
+    assert scorer is not None
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from benchmarks.replay import gini, run_replay, split_events
+from benchmarks.synthetic_data import generate
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    out = tmp_path_factory.mktemp("replay")
+    generate(out, seed=1, dim=16, sizes={"users": 12, "jobs": 300, "interactions": 240})
+    return out
+
+
+def test_gini():
+    assert gini([5, 5, 5, 5]) == pytest.approx(0.0)
+    assert gini([0, 0, 0, 8]) == pytest.approx(0.75)
+    assert gini([]) == 0.0
+
+
+def test_split_events_keeps_users_in_one_shard(dataset, tmp_path):
+    import pandas as pd
+
+    paths, n_events = split_events(dataset / "interactions.csv", tmp_path, n_shards=3)
+    assert n_events == 240
+    shards = [pd.read_parquet(p) for p in paths]
+    assert sum(len(s) for s in shards) == 240
+    for i, shard in enumerate(shards):
+        assert (shard["user_id"] % 3 == i).all()
+
+
+def test_replay_reports_metrics_for_sharded_users(dataset):
+    kwargs = dict(jobs_file=dataset / "jobs.parquet", job_emb_file=dataset / "job_embeddings.npy",
+                  user_emb_file=dataset / "user_embeddings.npy", fetch_k=20, final_k=5, candidate_k=40)
+    report = run_replay(dataset / "interactions.csv", workers=1, shards=2, **kwargs)
+
+    assert report["events"] == 240 and report["unknown_items"] == 0
+    assert report["users"] == len(set(np.loadtxt(dataset / "interactions.csv", delimiter=",", skiprows=1,
+                                                 usecols=1, dtype=int)))
+    assert set(report["ranking"]) == {"HitRate@5", "NDCG@5", "Recall@20", "MRR@20"}
+    assert 0.0 <= report["ranking"]["NDCG@5"] <= report["ranking"]["HitRate@5"] <= 1.0
+    assert set(report["exposure"]["by_company_bucket"]) == {"small", "mid", "large"}
+    shares = [b["impression_share"] for b in report["exposure"]["by_company_bucket"].values()]
+    assert sum(shares) == pytest.approx(1.0)
+    assert report["throughput"]["shards"] == 2 and report["throughput"]["events_per_second"] > 0
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+from models.mock_gemini_server import start_mock_server
+from models.rewrite_stage import RewriteCheckpoint, RewriteStage, TokenBucket
+
+
+def _requests():
+    base = {
+        "description": "Build web apps.",
+        "company": "Acme",
+        "benefits": "Health",
+        "responsibilities": "Code",
+        "company_profile": "{}",
+    }
+    return [
+        dict(base, job_title="Web Developer"),
+        dict(base, job_title="Data Analyst"),
+        dict(base, job_title="Web Developer"),  # exact duplicate, rewritten separately
+        dict(base, job_title="Data Engineer", description="Pipelines."),
+    ]
+
+
+def test_rewrite_stage_checkpoints_and_resumes(tmp_path):
+    server, base_url = start_mock_server()
+    checkpoint_path = tmp_path / "rewrites.jsonl"
+    try:
+        stage = RewriteStage(base_url=base_url, requests_per_minute=6000, max_workers=3,
+                             checkpoint_path=checkpoint_path)
+        results = stage.run(_requests())
+        assert results[0] == "Mock rewrite for a Web Developer role."
+        assert results[1] == "Mock rewrite for a Data Analyst role."
+        assert server.request_count == 4
+        assert len(RewriteCheckpoint(checkpoint_path).done) == 4
+
+        # A rerun with the same rows is served from the checkpoint
+        rerun = RewriteStage(base_url=base_url, requests_per_minute=6000, checkpoint_path=checkpoint_path)
+        assert rerun.run(_requests()) == results
+        assert server.request_count == 4
+        assert rerun.stats["cached"] == 4
+    finally:
+        server.shutdown()
+
+
+def test_failed_rewrites_fall_back_and_are_retried(tmp_path):
+    server, base_url = start_mock_server(fail_every=2)
+    checkpoint_path = tmp_path / "rewrites.jsonl"
+    try:
+        stage = RewriteStage(base_url=base_url, requests_per_minute=6000, max_workers=1,
+                             checkpoint_path=checkpoint_path)
+        requests = _requests()
+        results = stage.run(requests)
+        failed = [i for i, text in enumerate(results) if text == requests[i]["description"]]
+        assert stage.stats["failed"] == len(failed) > 0
+        assert len(RewriteCheckpoint(checkpoint_path).done) == len(requests) - len(failed)
+    finally:
+        server.shutdown()
+
+
+def test_token_bucket_limits_rate():
+    async def acquire_all():
+        bucket = TokenBucket(rate_per_minute=600, capacity=2)  # 10 tokens/s
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # 2 burst tokens, then 3 more at 10/s
+    assert asyncio.run(acquire_all()) >= 0.25
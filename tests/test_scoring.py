@@ -0,0 +1,75 @@
+import threading
+
+import numpy as np
+import torch
+
+from models.scoring import BLOCK_ROWS, ScoringKernel, microbenchmark
+
+
+def _emb(n, dim=16, seed=0):
+    return torch.from_numpy(np.random.default_rng(seed).standard_normal((n, dim), dtype=np.float32))
+
+
+def test_cosine_matches_torch_on_unnormalized_embeddings():
+    job_emb = _emb(300) * 3.0
+    u = _emb(1, seed=1)[0]
+    kernel = ScoringKernel(job_emb)
+
+    expected = torch.nn.functional.cosine_similarity(u.unsqueeze(0), job_emb).numpy()
+    assert np.allclose(kernel.cosine(u), expected, atol=1e-5)
+
+    rows = np.array([5, 0, 299, 42])
+    assert np.allclose(kernel.cosine(u, rows), expected[rows], atol=1e-5)
+
+
+def test_blocked_topk_matches_full_sort():
+    n = BLOCK_ROWS * 3 + 17
+    kernel = ScoringKernel(_emb(n))
+    scores = kernel.cosine(_emb(1, seed=2)[0])
+    excluded = np.random.default_rng(3).choice(n, size=100, replace=False)
+    kernel.exclude(scores, excluded)
+
+    idx, values = kernel.topk(scores, 50)
+    expected = np.argsort(-scores, kind="stable")[:50]
+    assert np.array_equal(idx, expected)
+    assert np.allclose(values, scores[expected])
+    assert not set(idx) & set(excluded)
+
+    # Fewer finite scores than k: the excluded rows are not returned
+    small = ScoringKernel(_emb(10))
+    scores = small.cosine(_emb(1, seed=4)[0])
+    small.exclude(scores, np.arange(7))
+    idx, _ = small.topk(scores, 5)
+    assert sorted(idx.tolist()) == [7, 8, 9]
+
+
+def test_classifier_inputs_and_blend():
+    job_emb = _emb(100)
+    kernel = ScoringKernel(job_emb)
+    u = _emb(1, seed=5)[0]
+    rows = np.array([3, 1, 4])
+
+    inputs = kernel.classifier_inputs(u, rows)
+    assert torch.equal(inputs, torch.cat((u.expand(3, -1), job_emb[rows]), dim=1))
+
+    scores = np.array([1.0, 0.0, 0.5], dtype=np.float32)
+    kernel.blend(scores, np.array([0.0, 1.0, 0.5], dtype=np.float32), 0.25)
+    assert np.allclose(scores, [0.75, 0.25, 0.5])
+
+
+def test_buffers_are_per_thread():
+    kernel = ScoringKernel(_emb(200))
+    u1, u2 = _emb(1, seed=6)[0], _emb(1, seed=7)[0]
+    main = kernel.cosine(u1)
+    other = {}
+    thread = threading.Thread(target=lambda: other.setdefault("scores", kernel.cosine(u2).copy()))
+    thread.start()
+    thread.join()
+    assert np.allclose(main, kernel.cosine(u1))
+    assert not np.allclose(main, other["scores"])
+
+
+def test_microbenchmark_runs():
+    results = microbenchmark(n_jobs=2000, dim=16, k=20, repeats=3)
+    assert set(results) == {"legacy (cos_sim + mask + topk)", "kernel"}
+    assert results["kernel"]["torch_alloc_bytes"] == 0
@@ -0,0 +1,71 @@
+import numpy as np
+import torch
+from sentence_transformers import util
+
+import models.similarity as similarity
+from models.similarity import blocked_topk, embedding_fingerprint, item_neighbours, sample_negatives
+
+
+def test_blocked_topk_matches_per_row_cos_sim():
+    torch.manual_seed(0)
+    queries = torch.randn(37, 16)
+    keys = torch.randn(200, 16)
+
+    values, indices = blocked_topk(queries, keys, k=5, chunk_size=8)
+
+    for i, q in enumerate(queries):
+        expected = torch.topk(util.cos_sim(q, keys)[0], k=5)
+        assert torch.equal(indices[i], expected.indices)
+        assert torch.allclose(values[i], expected.values, atol=1e-6)
+
+
+def test_sample_negatives_excludes_positives_without_duplicates():
+    rng = np.random.default_rng(0)
+    n_items = 30
+    exclude = np.stack([rng.choice(n_items, size=10, replace=False) for _ in range(500)])
+
+    negatives = sample_negatives(exclude, n_items=n_items, n_neg=10, rng=rng)
+
+    assert negatives.shape == (500, 10)
+    for row, excluded in zip(negatives, exclude):
+        assert len(set(row)) == 10
+        assert not set(row) & set(excluded)
+        assert row.min() >= 0 and row.max() < n_items
+
+
+def test_item_neighbours_exclude_the_job_itself():
+    torch.manual_seed(0)
+    job_emb = torch.randn(40, 16)
+    # Duplicate embeddings: a job's twin may rank before the job itself
+    job_emb[1] = job_emb[0]
+
+    values, indices = item_neighbours(job_emb, m=5, chunk_size=7)
+
+    assert indices.shape == values.shape == (40, 5)
+    assert not (indices == torch.arange(40).unsqueeze(1)).any()
+    assert 1 in indices[0].tolist() and 0 in indices[1].tolist()
+    for i in range(40):
+        assert len(set(indices[i].tolist())) == 5
+
+
+def test_item_neighbours_cache_follows_the_embeddings(tmp_path, monkeypatch):
+    cache = tmp_path / "neighbours.pt"
+    torch.manual_seed(0)
+    first = torch.randn(30, 8)
+    expected = item_neighbours(first, m=4)
+
+    assert all(torch.equal(a, b) for a, b in zip(item_neighbours(first, m=4, cache_path=cache), expected))
+
+    # Same embeddings, same or smaller m: served from the cache
+    calls = []
+    real_topk = similarity.blocked_topk
+    monkeypatch.setattr(similarity, "blocked_topk", lambda *a, **k: calls.append(1) or real_topk(*a, **k))
+    values, indices = item_neighbours(first, m=3, cache_path=cache)
+    assert calls == [] and torch.equal(indices, expected[1][:, :3])
+
+    # New catalog (same shape): rebuilt and re-keyed
+    second = torch.randn(30, 8)
+    values, indices = item_neighbours(second, m=4, cache_path=cache)
+    assert calls == [1]
+    assert torch.equal(indices, item_neighbours(second, m=4)[1])
+    assert torch.load(cache)["fingerprint"] == embedding_fingerprint(second)
@@ -0,0 +1,97 @@
+import csv
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+import models.sweep as sweep
+from conftest import FakeEncoder
+from models.sweep import GRID, RESULT_COLUMNS, grid_trials, hybrid_ndcg, random_trials
+
+
+def test_grid_trials_cover_the_grid():
+    trials = grid_trials()
+    assert len(trials) == np.prod([len(v) for v in GRID.values()])
+    assert len({tuple(t.values()) for t in trials}) == len(trials)
+    assert all(list(t) == list(GRID) for t in trials)
+
+    small = grid_trials({"lr": [0.1, 0.2], "batch_size": [8]})
+    assert small == [{"lr": 0.1, "batch_size": 8}, {"lr": 0.2, "batch_size": 8}]
+
+
+def test_random_trials_are_seeded():
+    trials = random_trials(25, seed=3)
+    assert trials == random_trials(25, seed=3)
+    assert trials != random_trials(25, seed=4)
+    for trial in trials:
+        assert min(GRID["lr"]) <= trial["lr"] <= max(GRID["lr"])
+        assert all(trial[k] in GRID[k] for k in GRID if k != "lr")
+
+
+class FixedScores(torch.nn.Module):
+    def __init__(self, scores):
+        super().__init__()
+        self.scores = torch.tensor(scores)
+
+    def forward(self, inputs):
+        return self.scores.unsqueeze(1)
+
+
+def test_hybrid_ndcg_hand_computed():
+    # Rows 0-2: users, rows 3-5: jobs. User 2 has no like and is not scored.
+    features = torch.tensor([[1.0, 0.0], [0.0, 1.0], [1.0, 1.0], [1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+    pairs = torch.tensor([[0, 3], [0, 4], [0, 5], [1, 3], [1, 4], [2, 3]])
+    labels = torch.tensor([[0.0], [1.0], [0.0], [1.0], [0.0], [0.0]])
+    model = FixedScores([0.0, 0.9, 0.8, 0.9, 0.2, 0.5])
+
+    # Cosine only: user 0 ranks its like 3rd (1 / log2(4)), user 1 2nd (1 / log2(3))
+    expected = (1 / np.log2(4) + 1 / np.log2(3)) / 2
+    assert hybrid_ndcg(model, features, pairs, labels, hybrid_weight=0.0) == pytest.approx(expected)
+    # Half and half: user 0 scores 0.5, 0.45, 0.754 and user 1 0.45, 0.6, same ranks
+    assert hybrid_ndcg(model, features, pairs, labels, hybrid_weight=0.5) == pytest.approx(expected)
+    # Classifier only: both likes ranked first
+    assert hybrid_ndcg(model, features, pairs, labels, hybrid_weight=1.0) == pytest.approx(1.0)
+    # No like at all
+    assert hybrid_ndcg(model, features, pairs, torch.zeros(6, 1), hybrid_weight=0.5) == 0.0
+
+
+def test_run_trial_with_no_epochs(monkeypatch):
+    features = torch.randn(10, 4)
+    pairs = torch.stack((torch.arange(20) % 4, 4 + torch.arange(20) % 6), dim=1)
+    y = (torch.arange(20) % 2).float().unsqueeze(1)
+    monkeypatch.setattr(sweep, "_data", {"features": features, "pairs": pairs, "y": y,
+                                         "train_idx": torch.arange(4, 20), "val_idx": torch.arange(4)})
+    params = {"lr": 1e-3, "batch_size": 8, "hidden_dim": 8, "hidden_dim2": 4, "dropout": 0.0, "hybrid_weight": 0.2}
+
+    result = sweep.run_trial(0, params, epochs=0, patience=3, warmup_epochs=3, shared_losses={},
+                             lock=threading.Lock())
+    assert result["status"] == "complete" and result["epochs_run"] == 0
+
+
+def test_run_sweep_writes_results(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    users = pd.DataFrame({"id": np.arange(8), "gender": ["f", "m"] * 4})
+    jobs = pd.DataFrame({"jobid": [f"j{i}" for i in range(12)]})
+    job_emb = torch.randn(12, 16)
+    interactions = pd.DataFrame({
+        "user_id": rng.integers(0, 8, 120),
+        "item_id": rng.choice(jobs["jobid"], 120),
+        "action": rng.choice(["like", "pass"], 120),
+    })
+    monkeypatch.setattr(sweep, "load_training_frames", lambda: (interactions, users, jobs, job_emb))
+    monkeypatch.setattr(sweep, "get_st_model", lambda: FakeEncoder(dim=16))
+
+    trials = [dict(t, batch_size=32) for t in random_trials(2, seed=0)]
+    out = tmp_path / "sweep" / "results.csv"
+    results = sweep.run_sweep(trials, epochs=1, workers=1, out_path=out)
+
+    assert sorted(r["trial"] for r in results) == [0, 1]
+    with open(out, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == RESULT_COLUMNS
+    assert len(rows) == 2
+    assert all(row["status"] == "complete" and row["epochs_run"] == "1" for row in rows)
+    # Sorted by validation loss
+    assert float(rows[0]["val_loss"]) <= float(rows[1]["val_loss"])
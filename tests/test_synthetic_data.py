@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic_data import (INTERACTION_COLUMNS, JOB_COLUMNS, USER_COLUMNS, chunk_rows, dataset_sizes,
+                                       generate)
+
+
+def test_chunk_rows_respects_the_ceiling():
+    assert chunk_rows(1000, max_memory_mb=10) == 10 * 1024 * 1024 // 1000
+    assert chunk_rows(1000, max_memory_mb=10, resident_bytes=5 * 1024 * 1024) == 5 * 1024 * 1024 // 1000
+    with pytest.raises(ValueError):
+        chunk_rows(1000, max_memory_mb=10, resident_bytes=10 * 1024 * 1024)
+
+
+def test_generate_matches_exports_and_is_reproducible(tmp_path, monkeypatch):
+    import benchmarks.synthetic_data as synthetic_data
+
+    # 1 MB forces several chunks per file
+    monkeypatch.setattr(synthetic_data, "MIN_CHUNK", 10)
+    sizes = {"users": 50, "jobs": 300, "interactions": 3000}
+    manifest = generate(tmp_path / "a", seed=3, dim=16, sizes=sizes, max_memory_mb=1)
+    assert manifest["rows"] == {"jobs.parquet": 300, "users.csv": 50, "interactions.csv": 3000,
+                                "job_embeddings.npy": 300, "user_embeddings.npy": 50}
+
+    jobs = pd.read_parquet(tmp_path / "a" / "jobs.parquet")
+    users = pd.read_csv(tmp_path / "a" / "users.csv")
+    interactions = pd.read_csv(tmp_path / "a" / "interactions.csv")
+    assert list(jobs.columns) == JOB_COLUMNS and jobs["job id"].is_unique
+    assert list(users.columns) == USER_COLUMNS and list(users["id"]) == list(range(1, 51))
+    assert list(interactions.columns) == INTERACTION_COLUMNS
+    assert interactions["item_id"].between(0, 299).all() and interactions["user_id"].between(1, 50).all()
+    assert set(interactions["action"]) == {"like", "pass"}
+    assert interactions["timestamp"].is_monotonic_increasing
+
+    job_emb = np.load(tmp_path / "a" / "job_embeddings.npy")
+    assert job_emb.shape == (300, 16) and np.allclose(np.linalg.norm(job_emb, axis=1), 1.0, atol=1e-5)
+    assert (tmp_path / "a" / "job_embeddings.pt").exists()
+
+    generate(tmp_path / "b", seed=3, dim=16, sizes=sizes, max_memory_mb=1)
+    for name in ("users.csv", "interactions.csv", "job_embeddings.npy"):
+        assert (tmp_path / "a" / name).read_bytes() == (tmp_path / "b" / name).read_bytes()
+
+
+def test_clustered_embeddings_follow_domains(tmp_path):
+    generate(tmp_path, seed=0, dim=32, sizes={"users": 200, "jobs": 400, "interactions": 100})
+    jobs = pd.read_parquet(tmp_path / "jobs.parquet", columns=["job title"])
+    emb = np.load(tmp_path / "job_embeddings.npy")
+    same = jobs["job title"].to_numpy() == jobs["job title"].iloc[0]
+    sims = emb[1:] @ emb[0]
+    assert sims[same[1:]].mean() > sims[~same[1:]].mean() + 0.2
+
+
+def test_dataset_sizes():
+    assert dataset_sizes(10)["interactions"] == 10_000_000
+    assert dataset_sizes(0.0)["users"] == 1
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from models.text_normalization import (
+    build_profile,
+    build_profile_series,
+    clean_text,
+    clean_text_series,
+    extract_min_experience,
+    extract_min_experience_series,
+)
+
+processed_dir = Path(__file__).parent.parent / "backend" / "Processed"
+
+
+def test_clean_text_matches_row_wise_on_edge_cases():
+    col = pd.Series([
+        "  Hello\nWorld \r\n  ",
+        "café crème brûlée",
+        "tabs\tand\x0bvertical\x0cfeeds\x1cfile sep",
+        None,
+        np.nan,
+        "",
+        42,
+        "——",
+    ], dtype=object)
+    expected = col.apply(clean_text).tolist()
+    assert clean_text_series(col).tolist() == expected
+
+
+def test_clean_text_matches_row_wise_on_jobs_sample():
+    jobs = pd.read_parquet(processed_dir / "jobs_sample.parquet").head(200)
+    for col in ["job description", "benefits", "skills", "responsibilities", "company profile"]:
+        expected = jobs[col].apply(clean_text).tolist()
+        assert clean_text_series(jobs[col]).tolist() == expected, col
+
+
+def test_extract_min_experience_matches_row_wise():
+    col = pd.Series(["0 to 11 Years", " 2 to 5 Years", "5 Years", "abc", None, "3to4", "-1 to 2 Years"])
+    expected = col.apply(extract_min_experience).astype("float64")
+    result = extract_min_experience_series(col)
+    assert np.allclose(result, expected, equal_nan=True)
+
+    jobs = pd.read_parquet(processed_dir / "jobs_sample.parquet")
+    expected = jobs["experience"].apply(extract_min_experience).astype("float64")
+    assert np.allclose(extract_min_experience_series(jobs["experience"]), expected, equal_nan=True)
+
+
+def test_build_profile_matches_row_wise():
+    students = pd.read_parquet(processed_dir / "students.parquet")
+    students.loc[students.index[0], "Projects"] = None
+    expected = students.apply(build_profile, axis=1).apply(clean_text).tolist()
+    assert clean_text_series(build_profile_series(students)).tolist() == expected
@@ -0,0 +1,262 @@
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+import models.training as training
+from conftest import FakeEncoder
+from models.training import FastInteractionLoader, assemble_training_data, build_user_profile_text
+
+DIM = 384
+
+
+@pytest.fixture
+def frames():
+    rng = np.random.default_rng(0)
+    users = pd.DataFrame({
+        "id": [1, 2, 3, 4, 5, 6],
+        "gender": ["f", "m", None, "f", "m", "f"],
+        "age": [21, 22, 23, np.nan, 25, 26],
+        "interested_domain": ["data", "web", "ml", "data", None, "ops"],
+        "projects": ["a", "b", "c", "d", "e", "f"],
+        "python_level": ["high", "low", "mid", "high", "low", None],
+        "sql_level": ["low"] * 6,
+        "java_level": ["mid"] * 6,
+    })
+    # 12 catalog rows but only 10 embeddings: the last two jobs cannot be scored
+    jobs = pd.DataFrame({"jobid": [f"j{i}" for i in range(12)]})
+    job_emb = torch.nn.functional.normalize(torch.randn(10, DIM), dim=1)
+    n = 80
+    interactions = pd.DataFrame({
+        # user 99 and job "missing" are not in the index
+        "user_id": rng.choice([1, 2, 3, 4, 5, 6, 99], n),
+        "item_id": rng.choice([f"j{i}" for i in range(12)] + ["missing"], n),
+        "action": rng.choice(["like", "pass", "apply"], n),
+    })
+    return interactions, users, jobs, job_emb
+
+
+def _per_row_reference(interactions, users, jobs, job_emb, encoder):
+    """The original construction: one encode per user, one Python iteration per interaction."""
+    interactions = interactions[interactions["action"].isin(["like", "pass"])].copy()
+    interactions["label"] = interactions["action"].apply(lambda x: 1.0 if x == "like" else 0.0)
+    user_emb_map = {row["id"]: encoder.encode(build_user_profile_text(row)) for _, row in users.iterrows()}
+    job_id_to_idx = {jid: idx for idx, jid in enumerate(jobs["jobid"])}
+
+    X_user, X_job, y = [], [], []
+    for _, row in interactions.iterrows():
+        uid, jid = row["user_id"], row["item_id"]
+        if uid in user_emb_map and jid in job_id_to_idx and job_id_to_idx[jid] < len(job_emb):
+            X_user.append(user_emb_map[uid])
+            X_job.append(job_emb[job_id_to_idx[jid]])
+            y.append(row["label"])
+    return torch.stack(X_user), torch.stack(X_job), torch.tensor(y, dtype=torch.float32).unsqueeze(1)
+
+
+# -------------------------
+# assemble_training_data
+# -------------------------
+def test_assembly_matches_per_row_construction(frames):
+    interactions, users, jobs, job_emb = frames
+    encoder = FakeEncoder()
+    X_user, X_job, y_ref = _per_row_reference(interactions, users, jobs, job_emb, encoder)
+
+    features, pairs, y = assemble_training_data(interactions, users, jobs, job_emb, encoder)
+    assert features.shape == (len(users) + len(job_emb), DIM)
+    assert pairs.shape == (len(y_ref), 2)
+    assert torch.equal(y, y_ref)
+    assert torch.equal(features[pairs[:, 0]], X_user)
+    assert torch.equal(features[pairs[:, 1]], X_job)
+    # Some interactions were dropped: unknown user or job, or a job without embedding
+    assert len(y) < (interactions["action"] != "apply").sum()
+
+
+def test_assembly_without_matches(frames):
+    interactions, users, jobs, job_emb = frames
+    interactions = interactions.assign(user_id=99)
+    assert assemble_training_data(interactions, users, jobs, job_emb, FakeEncoder()) is None
+
+
+def test_profile_text_reads_the_export_columns(frames):
+    _, users, _, _ = frames
+    text = build_user_profile_text(users.iloc[0])
+    assert "skills python high, sql low, java mid." in text
+
+
+def test_timings_are_printed_on_early_exit(frames, monkeypatch, capsys):
+    interactions, users, jobs, job_emb = frames
+    monkeypatch.setattr(training, "load_training_frames",
+                        lambda source, db_url: (interactions.assign(user_id=99), users, jobs, job_emb))
+    monkeypatch.setattr(training, "get_st_model", FakeEncoder)
+    training.train_model(epochs=1)
+
+    out = capsys.readouterr().out
+    assert "No valid samples found" in out
+    assert "Phase timings:" in out and "encode_users" in out
+
+
+# -------------------------
+# FastInteractionLoader
+# -------------------------
+def _loader_data(n=10, n_users=3, n_jobs=4, dim=2):
+    features = torch.arange((n_users + n_jobs) * dim, dtype=torch.float32).view(-1, dim)
+    pairs = torch.stack((torch.arange(n) % n_users, n_users + torch.arange(n) % n_jobs), dim=1)
+    # The label is the sample index, to trace every sample through the batches
+    labels = torch.arange(n, dtype=torch.float32).unsqueeze(1)
+    return features, pairs, labels
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_loader_yields_every_row_once(shuffle):
+    features, pairs, labels = _loader_data()
+    loader = FastInteractionLoader(features, pairs, labels, batch_size=4, shuffle=shuffle,
+                                   generator=torch.Generator().manual_seed(0))
+    batches = list(loader)
+
+    # The last partial batch is kept
+    assert len(loader) == 3
+    assert [len(batch_labels) for _, batch_labels in batches] == [4, 4, 2]
+
+    seen = torch.cat([batch_labels for _, batch_labels in batches]).squeeze(1).long()
+    assert sorted(seen.tolist()) == list(range(10))
+    if not shuffle:
+        assert seen.tolist() == list(range(10))
+
+    # Each input row is the user embedding followed by the job embedding of its sample
+    for inputs, batch_labels in batches:
+        rows = pairs[batch_labels.squeeze(1).long()]
+        assert inputs.shape == (len(batch_labels), 4)
+        assert torch.equal(inputs, torch.cat((features[rows[:, 0]], features[rows[:, 1]]), dim=1))
+
+
+def test_seeded_shuffle_is_reproducible():
+    def epochs(seed, n_epochs=3):
+        loader = FastInteractionLoader(*_loader_data(), batch_size=4, shuffle=True,
+                                       generator=torch.Generator().manual_seed(seed))
+        return [torch.cat([labels for _, labels in loader]).squeeze(1).tolist() for _ in range(n_epochs)]
+
+    first = epochs(seed=7)
+    assert epochs(seed=7) == first
+    # A new permutation every epoch
+    assert first[0] != first[1]
+
+
+# -------------------------
+# Checkpoints, resume and early stopping
+# -------------------------
+class FakeRegistry:
+    def __init__(self):
+        self.registered = []
+
+    def register(self, state_dict, architecture, job_emb, metrics=None, training=None, activate=True):
+        self.registered.append({"state_dict": state_dict, "metrics": metrics, "training": training})
+        return f"v{len(self.registered):04d}"
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def trainer(frames, monkeypatch):
+    """train_model on the synthetic frames, recording the losses of every epoch."""
+    registry = FakeRegistry()
+    losses = []
+    interrupt_at = {"epoch": None}
+    train_one_epoch, evaluate = training.train_one_epoch, training.evaluate
+
+    def record_train(*args):
+        if len(losses) == interrupt_at["epoch"]:
+            raise Interrupted
+        losses.append(train_one_epoch(*args))
+        return losses[-1]
+
+    def record_val(*args):
+        val_loss, acc = evaluate(*args)
+        losses[-1] = (losses[-1], val_loss)
+        return val_loss, acc
+
+    monkeypatch.setattr(training, "load_training_frames", lambda source, db_url: frames)
+    monkeypatch.setattr(training, "get_st_model", FakeEncoder)
+    monkeypatch.setattr(training, "ModelRegistry", lambda: registry)
+    monkeypatch.setattr(training, "train_one_epoch", record_train)
+    monkeypatch.setattr(training, "evaluate", record_val)
+    return registry, losses, interrupt_at
+
+
+def _last_weights(checkpoint):
+    return torch.load(checkpoint, weights_only=False)["model"]
+
+
+def test_resume_matches_an_uninterrupted_run(tmp_path, trainer):
+    registry, losses, interrupt_at = trainer
+    kwargs = dict(epochs=4, batch_size=8, patience=10, seed=3)
+
+    training.train_model(checkpoint=tmp_path / "full" / "last.pt", **kwargs)
+    full_losses, full_weights = list(losses), _last_weights(tmp_path / "full" / "last.pt")
+    assert len(full_losses) == 4 and len(registry.registered) == 1
+
+    # Killed during the third epoch, then resumed from the epoch-2 checkpoint
+    losses.clear()
+    interrupt_at["epoch"] = 2
+    with pytest.raises(Interrupted):
+        training.train_model(checkpoint=tmp_path / "resumed" / "last.pt", **kwargs)
+    interrupt_at["epoch"] = None
+    training.train_model(checkpoint=tmp_path / "resumed" / "last.pt", resume=True, **kwargs)
+
+    assert losses == full_losses
+    resumed_weights = _last_weights(tmp_path / "resumed" / "last.pt")
+    assert all(torch.equal(full_weights[name], resumed_weights[name]) for name in full_weights)
+    first, resumed = registry.registered
+    assert first["metrics"] == resumed["metrics"]
+    assert all(torch.equal(first["state_dict"][name], resumed["state_dict"][name]) for name in full_weights)
+
+
+def test_training_stops_after_patience(tmp_path, trainer):
+    registry, losses, _ = trainer
+    # lr=0: the val loss never improves after the first epoch
+    training.train_model(epochs=10, batch_size=8, lr=0.0, patience=2, checkpoint=tmp_path / "last.pt")
+
+    assert len(losses) == 3
+    assert registry.registered[0]["metrics"]["epochs_run"] == 3
+    assert torch.load(tmp_path / "last.pt", weights_only=False)["bad_epochs"] == 2
+
+
+def test_resume_refuses_changed_data(tmp_path, trainer, frames, capsys):
+    registry, losses, _ = trainer
+    interactions, _, _, _ = frames
+    training.train_model(epochs=2, batch_size=8, checkpoint=tmp_path / "last.pt")
+
+    # Same number of samples, different labels: the stored split no longer applies
+    flipped = interactions["action"].map({"like": "pass", "pass": "like", "apply": "apply"})
+    interactions["action"] = flipped
+    training.train_model(epochs=4, batch_size=8, checkpoint=tmp_path / "last.pt", resume=True)
+
+    assert len(losses) == 2 and len(registry.registered) == 1
+    assert "different training data" in capsys.readouterr().out
+
+
+def test_resuming_a_registered_run_does_nothing(tmp_path, trainer):
+    registry, losses, _ = trainer
+    training.train_model(epochs=2, batch_size=8, checkpoint=tmp_path / "last.pt")
+    assert torch.load(tmp_path / "last.pt", weights_only=False)["version"] == "v0001"
+
+    training.train_model(epochs=2, batch_size=8, checkpoint=tmp_path / "last.pt", resume=True)
+    assert len(losses) == 2 and len(registry.registered) == 1
+
+    # More epochs than the finished run: training continues from the checkpoint
+    training.train_model(epochs=3, batch_size=8, checkpoint=tmp_path / "last.pt", resume=True)
+    assert len(losses) == 3 and len(registry.registered) == 2
+
+
+def test_registered_training_source(tmp_path, trainer, monkeypatch):
+    registry, _, _ = trainer
+    training.train_model(epochs=1, batch_size=8, checkpoint=tmp_path / "csv" / "last.pt")
+    assert registry.registered[-1]["training"]["source"] == "csv"
+    assert registry.registered[-1]["training"]["interactions"] == training.interactions_path.name
+
+    monkeypatch.setattr(training, "high_water_mark", lambda: 1234)
+    training.train_model(epochs=1, batch_size=8, checkpoint=tmp_path / "db" / "last.pt", source="db")
+    assert registry.registered[-1]["training"]["source"] == "db"
+    assert registry.registered[-1]["training"]["high_water_mark"] == 1234
+    assert "interactions" not in registry.registered[-1]["training"]
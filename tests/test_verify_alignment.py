@@ -1,26 +1,102 @@
+import json
 
 import pandas as pd
+import pytest
 import torch
-from pathlib import Path
-
-processed_dir = Path("c:/Code/RecSys-Project-FairMatch/backend/Processed")
-
-def verify_alignment():
-    print("Verifying data alignment...")
-    try:
-        jobs_sample = pd.read_parquet(processed_dir / "jobs_sample.parquet")
-        print(f"jobs_sample.parquet rows: {len(jobs_sample)}")
-        
-        emb = torch.load(processed_dir / "job_embeddings.pt")
-        print(f"job_embeddings.pt shape: {emb.shape}")
-        
-        if len(jobs_sample) == emb.shape[0]:
-            print("SUCCESS: Row counts match!")
-        else:
-            print(f"FAILURE: Mismatch! {len(jobs_sample)} vs {emb.shape[0]}")
-            
-    except Exception as e:
-        print(f"Error: {e}")
-
-if __name__ == "__main__":
-    verify_alignment()
+
+from models.artifacts import load_bundle
+from models.bundle_builder import (
+    SERVING_COLUMNS,
+    BundleError,
+    build_bundle,
+    processed_dir,
+    stale_sources,
+    verify_bundle,
+)
+
+jobs_path = processed_dir / "jobs_sample.parquet"
+job_emb_path = processed_dir / "job_embeddings.pt"
+
+requires_data = pytest.mark.skipif(
+    not (jobs_path.exists() and job_emb_path.exists()), reason="Processed data not available"
+)
+
+
+@requires_data
+def test_processed_catalog_is_aligned():
+    jobs_sample = pd.read_parquet(jobs_path)
+    emb = torch.load(job_emb_path)
+    assert len(jobs_sample) == emb.shape[0]
+
+
+@requires_data
+def test_bundle_roundtrip(tmp_path):
+    out = tmp_path / "bundle"
+    manifest = build_bundle(jobs_path, job_emb_path, out)
+    assert verify_bundle(out, full=True) == manifest
+
+    bundle = load_bundle(registry_path=tmp_path / "registry", bundle_path=out)
+    original = pd.read_parquet(jobs_path)
+    assert list(bundle.jobs.columns) == [c for c in SERVING_COLUMNS if c in original.columns]
+    assert len(bundle) == len(original)
+    assert torch.equal(bundle.job_emb, torch.load(job_emb_path))
+    first_id = str(original["job id"].iloc[3])
+    assert bundle.rows_for_ids([first_id]).tolist() == [3]
+
+    # Rebuilding replaces the bundle in place
+    build_bundle(jobs_path, job_emb_path, out)
+    assert verify_bundle(out)["n_jobs"] == len(original)
+
+
+def test_misaligned_sources_are_rejected(tmp_path):
+    pd.DataFrame({"job id": [1, 2, 3]}).to_parquet(tmp_path / "jobs.parquet")
+    torch.save(torch.zeros(2, 4), tmp_path / "emb.pt")
+    with pytest.raises(BundleError):
+        build_bundle(tmp_path / "jobs.parquet", tmp_path / "emb.pt", tmp_path / "bundle")
+
+
+def test_tampered_bundle_is_rejected(tmp_path):
+    pd.DataFrame({"job id": range(10), "job title": ["t"] * 10}).to_parquet(tmp_path / "jobs.parquet")
+    torch.save(torch.randn(10, 4), tmp_path / "emb.pt")
+    out = tmp_path / "bundle"
+    build_bundle(tmp_path / "jobs.parquet", tmp_path / "emb.pt", out)
+
+    # Same size, different bytes: only the full (hashing) check sees it
+    emb_file = out / "job_embeddings.pt"
+    data = bytearray(emb_file.read_bytes())
+    data[-20] ^= 0xFF
+    emb_file.write_bytes(bytes(data))
+    verify_bundle(out)
+    with pytest.raises(BundleError):
+        verify_bundle(out, full=True)
+
+    manifest_path = out / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["n_jobs"] = 11
+    manifest_path.write_text(json.dumps(manifest))
+    with pytest.raises(BundleError):
+        verify_bundle(out)
+
+
+def test_stale_bundle_is_detected(tmp_path, caplog):
+    jobs_file, emb_file, out = tmp_path / "jobs.parquet", tmp_path / "emb.pt", tmp_path / "bundle"
+    pd.DataFrame({"job id": range(10), "job title": ["t"] * 10}).to_parquet(jobs_file)
+    torch.save(torch.randn(10, 4), emb_file)
+    manifest = build_bundle(jobs_file, emb_file, out)
+    assert stale_sources(manifest, jobs_file, emb_file) == []
+    # Sources not deployed next to the bundle are not checked
+    assert stale_sources(manifest, tmp_path / "missing.parquet", emb_file) == []
+
+    pd.DataFrame({"job id": range(12), "job title": ["t"] * 12}).to_parquet(jobs_file)
+    assert stale_sources(manifest, jobs_file, emb_file) == ["jobs"]
+
+    # Still served (the bundle is consistent), with a warning
+    with caplog.at_level("WARNING", logger="models.artifacts"):
+        bundle = load_bundle(jobs_file, emb_file, registry_path=tmp_path / "registry", bundle_path=out)
+    assert len(bundle) == 10
+    assert "older than jobs" in caplog.text
+
+    # Manifests without source state: source mtimes against created_at
+    del manifest["source_state"]
+    manifest["created_at"] = "2000-01-01T00:00:00+00:00"
+    assert stale_sources(manifest, jobs_file, emb_file) == ["jobs", "job_emb"]